@@ -1,6 +1,5 @@
 import json
 import os
-import csv
 from datetime import datetime, timedelta
 from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session
 from flask_session import Session
@@ -10,9 +9,22 @@ import uuid
 import requests
 # Import the log generation functions and data generators
 from generate_logs import create_data_view_so_7_11, generate_discover_sessions_for_type
-from data_generators import DATA_GENERATORS
+from data_generators import DATA_GENERATORS, schema_for
 import streaming as _streaming
+from connections import DEFAULT_HTTP, close_sessions, es_session, kibana_session
+from ingest import (DEFAULT_BULK_MAX_MB, DEFAULT_BULK_MB, DEFAULT_BULK_MIN_MB,
+                    DEFAULT_BULK_TARGET_LATENCY, DEFAULT_DEAD_LETTER_DIR, DEFAULT_ENGINE, DEFAULT_MAX_RETRIES,
+                    DEFAULT_QUEUE_SIZE, DEFAULT_RETRY_BASE, DEFAULT_RETRY_BUDGET,
+                    DEFAULT_RETRY_MAX, DEFAULT_SENDERS, create_index, open_indexer)
 from scenarios import SCENARIOS, generate_scenario_entries
+from pools import DEFAULT_POOL_SIZE, DEFAULT_REFRESH_EVERY, configure_pools
+from serializers import bulk_body
+from seeding import parse_seed
+from log_lines import supports_style
+from replay import list_datasets, replay
+from sharding import DEFAULT_WORKERS, generate_shards, resolve_workers
+from sinks import (COMPRESSIONS, DEFAULT_FORMAT, DEFAULT_ROW_GROUP_SIZE, FORMATS, OUTPUT_DIR,
+                   RollingSink, is_output_file, output_options, rolling_options)
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'your-secret-key-change-this')
@@ -36,15 +48,39 @@ DEFAULT_CONFIG = {
     },
     'log_generation': {
         'default_entries': 1000,
-        'max_entries': 1000000
-    }
+        'max_entries': 1000000,
+        'pool_size': DEFAULT_POOL_SIZE,
+        'pool_refresh_every': DEFAULT_REFRESH_EVERY,
+        'workers': DEFAULT_WORKERS,
+        'full_traces': False,
+        'ordered': False,
+        'output_format': DEFAULT_FORMAT,
+        'compression': None,
+        'row_group_size': DEFAULT_ROW_GROUP_SIZE,
+        'max_file_rows': 0,
+        'max_file_mb': 0,
+        'ingest_senders': DEFAULT_SENDERS,
+        'ingest_queue_size': DEFAULT_QUEUE_SIZE,
+        'ingest_engine': DEFAULT_ENGINE,
+        'bulk_mb': DEFAULT_BULK_MB,
+        'bulk_adaptive': False,
+        'bulk_min_mb': DEFAULT_BULK_MIN_MB,
+        'bulk_max_mb': DEFAULT_BULK_MAX_MB,
+        'bulk_target_latency': DEFAULT_BULK_TARGET_LATENCY,
+        'bulk_max_retries': DEFAULT_MAX_RETRIES,
+        'bulk_retry_base': DEFAULT_RETRY_BASE,
+        'bulk_retry_max': DEFAULT_RETRY_MAX,
+        'bulk_retry_budget': DEFAULT_RETRY_BUDGET,
+        'dead_letter_dir': DEFAULT_DEAD_LETTER_DIR
+    },
+    'http': dict(DEFAULT_HTTP)
 }
 
 # Global variables for tracking operations
 operation_status = {}
 operation_lock = threading.Lock()
 
-CHUNK_SIZE = 5_000  # entries per bulk-ingest / CSV-write batch
+CHUNK_SIZE = 5_000  # entries per generated shard / file-write batch (bulk requests: bulk_mb)
 ENABLE_CLEANUP_ROUTES = os.environ.get('ENABLE_CLEANUP_ROUTES', '0').lower() in ('1', 'true', 'yes')
 
 def _load_file_config():
@@ -55,7 +91,7 @@ def _load_file_config():
         try:
             with open(CONFIG_FILE, 'r') as f:
                 file_cfg = json.load(f)
-            for section in ('elasticsearch', 'kibana', 'log_generation'):
+            for section in ('elasticsearch', 'kibana', 'log_generation', 'http'):
                 if section in file_cfg:
                     cfg[section].update(file_cfg[section])
         except (json.JSONDecodeError, OSError):
@@ -96,8 +132,9 @@ def save_config(config):
     with open(CONFIG_FILE, 'w') as f:
         json.dump(config, f, indent=2)
 
-def update_operation_status(operation_id, status, message=None, progress=None):
-    """Update operation status with thread safety"""
+def update_operation_status(operation_id, status, message=None, progress=None, **details):
+    """Update operation status with thread safety; ``details`` (e.g. ``bulk``) are kept
+    alongside until replaced."""
     with operation_lock:
         if operation_id not in operation_status:
             operation_status[operation_id] = {}
@@ -105,7 +142,8 @@ def update_operation_status(operation_id, status, message=None, progress=None):
             'status': status,
             'message': message,
             'progress': progress,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now().isoformat(),
+            **details
         })
 
 @app.route('/')
@@ -132,6 +170,7 @@ def config():
             kb_pw = request.form.get('kibana_password', '').strip()
             new_config = {
                 'elasticsearch': {
+                    **existing['elasticsearch'],
                     'host': _form_or_file('es_host', 'elasticsearch', 'host'),
                     'username': _form_or_file('es_username', 'elasticsearch', 'username'),
                     'password': (existing['elasticsearch']['password']
@@ -139,6 +178,7 @@ def config():
                                  else (es_pw if es_pw else existing['elasticsearch']['password']))
                 },
                 'kibana': {
+                    **existing['kibana'],
                     'host': _form_or_file('kibana_host', 'kibana', 'host'),
                     'username': _form_or_file('kibana_username', 'kibana', 'username'),
                     'password': (existing['kibana']['password']
@@ -146,11 +186,14 @@ def config():
                                  else (kb_pw if kb_pw else existing['kibana']['password']))
                 },
                 'log_generation': {
+                    **existing['log_generation'],
                     'default_entries': int(request.form.get('default_entries', 1000)),
                     'max_entries': int(request.form.get('max_entries', 1000000))
-                }
+                },
+                'http': existing['http'],
             }
             save_config(new_config)
+            close_sessions()  # drop connections made with the old settings
             flash('Configuration saved successfully!', 'success')
             return redirect(url_for('config'))
         except Exception as e:
@@ -160,33 +203,11 @@ def config():
     env_overrides = get_env_overrides()
     return render_template('config.html', config=current_config, env_overrides=env_overrides)
 
-def _check_index_response(resp):
-    """Raise if the index-creation response indicates a real error.
-    A 200 means created; a 400 with resource_already_exists_exception is fine."""
-    if resp.status_code == 200:
-        return
-    if resp.status_code == 400:
-        try:
-            body = resp.json()
-            error = body.get("error", {})
-            error_type = error.get("type") if isinstance(error, dict) else None
-            if not error_type:
-                root_cause = error.get("root_cause", []) if isinstance(error, dict) else []
-                if root_cause and isinstance(root_cause[0], dict):
-                    error_type = root_cause[0].get("type")
-            if error_type in ("resource_already_exists_exception", "index_already_exists_exception"):
-                return
-        except ValueError:
-            pass
-    raise Exception(f"Index creation error: {resp.text[:300]}")
-
-
 def validate_es_connection(config):
     """Return (True, '') or (False, error_message)."""
     try:
-        resp = requests.get(
+        resp = es_session(config).get(
             f"{config['elasticsearch']['host']}/_cluster/health",
-            auth=(config['elasticsearch']['username'], config['elasticsearch']['password']),
             timeout=5
         )
         if resp.status_code == 200:
@@ -238,6 +259,8 @@ def generate():
 
             data_type = request.form.get('data_type', 'unstructured_logs')
             generate_csv = request.form.get('generate_csv') == 'on'
+            output_format = request.form.get('output_format') or output_options(config)[0]
+            compression = request.form.get('compression') or output_options(config)[1]
             ingest_to_es = request.form.get('ingest_to_es') == 'on'
             create_kibana_objects = request.form.get('create_kibana_objects') == 'on'
 
@@ -253,24 +276,46 @@ def generate():
                 flash('Invalid data type selected', 'error')
                 return render_template('generate.html', config=config, data_generators=DATA_GENERATORS)
 
+            if output_format not in FORMATS:
+                flash('Invalid output format selected', 'error')
+                return render_template('generate.html', config=config, data_generators=DATA_GENERATORS)
+            if compression is not None and compression not in COMPRESSIONS[output_format]:
+                flash(f'{output_format} files do not support {compression} compression', 'error')
+                return render_template('generate.html', config=config, data_generators=DATA_GENERATORS)
+            if generate_csv:
+                types = list(DATA_GENERATORS) if data_type == 'all' else [data_type]
+                unsupported = [dt for dt in types if not supports_style(schema_for(dt), output_format)]
+                if unsupported:
+                    flash(f'{output_format} lines cannot be written for {", ".join(unsupported)}; '
+                          f'choose network_traffic or apm_data', 'error')
+                    return render_template('generate.html', config=config, data_generators=DATA_GENERATORS)
+            config['log_generation']['output_format'] = output_format
+            config['log_generation']['compression'] = compression
+
             if ingest_to_es or create_kibana_objects:
                 ok, err = validate_es_connection(config)
                 if not ok:
                     flash(f'Cannot reach Elasticsearch: {err}. Check Settings before generating.', 'error')
                     return render_template('generate.html', config=config, data_generators=DATA_GENERATORS)
 
+            try:
+                seed = parse_seed(request.form.get('seed'))
+            except ValueError:
+                flash('Seed must be a non-negative integer', 'error')
+                return render_template('generate.html', config=config, data_generators=DATA_GENERATORS)
+
             start_date, end_date = _resolve_date_range(request.form)
             operation_id = str(uuid.uuid4())
 
             if data_type == 'all':
                 thread = threading.Thread(target=run_all_generation, args=(
                     operation_id, num_entries, generate_csv, ingest_to_es,
-                    create_kibana_objects, config, start_date, end_date
+                    create_kibana_objects, config, start_date, end_date, seed
                 ))
             else:
                 thread = threading.Thread(target=run_log_generation, args=(
                     operation_id, num_entries, data_type, generate_csv,
-                    ingest_to_es, create_kibana_objects, config, start_date, end_date
+                    ingest_to_es, create_kibana_objects, config, start_date, end_date, seed
                 ))
             thread.start()
 
@@ -307,11 +352,7 @@ def test_connection():
     # Test Elasticsearch
     try:
         es_url = f"{config['elasticsearch']['host']}/_cluster/health"
-        response = requests.get(
-            es_url,
-            auth=(config['elasticsearch']['username'], config['elasticsearch']['password']),
-            timeout=10
-        )
+        response = es_session(config).get(es_url, timeout=10)
         if response.status_code == 200:
             results['elasticsearch'] = {'status': 'success', 'message': 'Connection successful'}
         else:
@@ -322,11 +363,7 @@ def test_connection():
     # Test Kibana
     try:
         kibana_url = f"{config['kibana']['host']}/api/status"
-        response = requests.get(
-            kibana_url,
-            auth=(config['kibana']['username'], config['kibana']['password']),
-            timeout=10
-        )
+        response = kibana_session(config).get(kibana_url, timeout=10)
         if response.status_code == 200:
             results['kibana'] = {'status': 'success', 'message': 'Connection successful'}
         else:
@@ -338,94 +375,104 @@ def test_connection():
 
 def _run_generation_pipeline(operation_id, data_type, num_entries, start_date, end_date,
                              generate_csv, ingest_to_es, config,
-                             progress_base=5, progress_range=75):
-    """Generate entries in CHUNK_SIZE batches, streaming to CSV and/or ES to keep memory bounded."""
-    gen_class = DATA_GENERATORS[data_type]['generator']
-    gen = gen_class(start_date=start_date, end_date=end_date)
+                             progress_base=5, progress_range=75, seed=None):
+    """Generate entries in CHUNK_SIZE shards, streaming to a file and/or ES to keep memory bounded.
+
+    With ``generate_csv`` the shards go to a RollingSink in
+    ``log_generation.output_format`` (CSV, Parquet, Arrow or _bulk NDJSON; see sinks.py),
+    named ``<data_type>-NNN`` and split into parts per ``max_file_rows`` /
+    ``max_file_mb``.
+    With ``log_generation.workers`` > 1 the shards are generated in a process
+    pool; they still arrive here in order, so the file and bulk sinks are unchanged.
+    With a ``seed`` the output is the same for any worker count.
+    With ``ingest_to_es`` the shards' bulk bodies go to a BulkIndexer, which regroups
+    them into ``log_generation.bulk_mb`` requests and keeps ``ingest_senders`` of them
+    in flight while generation continues; progress then follows the documents
+    Elasticsearch has acknowledged, and the status carries the bulk sizes (``bulk``).
+    Rejected documents are retried or dead-lettered rather than failing the job.
+
+    Returns ``(sink, ingested)``, where ``sink`` is the finished RollingSink or None.
+    """
     index_name = DATA_GENERATORS[data_type]['index_pattern']
+    workers = resolve_workers(config.get('log_generation', {}).get('workers', DEFAULT_WORKERS))
 
-    es_host = es_user = es_pass = None
     if ingest_to_es:
-        es_host = config['elasticsearch']['host']
-        es_user = config['elasticsearch']['username']
-        es_pass = config['elasticsearch']['password']
-        mapping = get_mapping_for_data_type(data_type)
-        resp = requests.put(
-            f"{es_host}/{index_name}",
-            auth=(es_user, es_pass),
-            headers={"Content-Type": "application/json"},
-            json={"settings": {"number_of_shards": 1, "number_of_replicas": 0},
-                  "mappings": mapping},
-            timeout=30,
-        )
-        _check_index_response(resp)
+        create_index(config, index_name, get_mapping_for_data_type(data_type))
 
-    csv_path = None
-    csv_file = csv_writer = None
+    sink = None
+    write_bulk = False
     if generate_csv:
-        os.makedirs("output_csv", exist_ok=True)
-        existing = [f for f in os.listdir("output_csv")
-                    if f.startswith(f"{data_type}-") and f.endswith(".csv")]
-        csv_path = os.path.join("output_csv", f"{data_type}-{len(existing) + 1:03d}.csv")
+        output_format, compression, row_group_size = output_options(config)
+        max_rows, max_bytes = rolling_options(config)
+        sink = RollingSink.claim(data_type, schema_for(data_type), output_format, compression,
+                                 row_group_size=row_group_size,
+                                 max_rows=max_rows, max_bytes=max_bytes,
+                                 meta={'data_type': data_type})
+        write_bulk = output_format == 'bulk'
 
-    chunk = []
-    total_ingested = 0
+    update_operation_status(operation_id, 'running',
+        f'Generating {num_entries} entries'
+        + (f' on {workers} workers...' if workers > 1 else '...'), progress_base)
+
+    generated = 0
+    acked = 0
+    report_lock = threading.Lock()  # report() runs on this thread and on the senders
+
+    def report():
+        with report_lock:
+            done = acked if ingest_to_es else generated
+            message = f'Generated {generated}/{num_entries} entries'
+            details = {}
+            if indexer:
+                message += (f', {acked} acknowledged by Elasticsearch'
+                            f' ({indexer.sender.describe()})')
+                details['bulk'] = indexer.sender.stats()
+            update_operation_status(operation_id, 'running', message + '...',
+                                    progress_base + int((done / num_entries) * progress_range),
+                                    **details)
+
+    def on_ack(count):
+        nonlocal acked
+        acked = count
+        report()
+
+    indexer = open_indexer(config, index_name, on_ack=on_ack) if ingest_to_es else None
     try:
-        for i in range(num_entries):
-            if i % 1000 == 0:
-                pct = progress_base + int((i / num_entries) * progress_range)
-                update_operation_status(operation_id, 'running',
-                    f'Generated {i}/{num_entries} entries...', pct)
-            chunk.append(gen.generate_entry())
-
-            if len(chunk) >= CHUNK_SIZE or i == num_entries - 1:
-                if generate_csv:
-                    flattened_chunk = [flatten_dict(e) for e in chunk]
-                    if csv_writer is None:
-                        fieldnames = sorted({k for row in flattened_chunk for k in row})
-                        csv_file = open(csv_path, 'w', newline='', encoding='utf-8')
-                        csv_writer = csv.DictWriter(csv_file, fieldnames=fieldnames,
-                                                    extrasaction='ignore')
-                        csv_writer.writeheader()
-                    for row in flattened_chunk:
-                        csv_writer.writerow(row)
-
-                if ingest_to_es:
-                    bulk_lines = []
-                    for entry in chunk:
-                        bulk_lines.append(json.dumps({"index": {}}))
-                        bulk_lines.append(json.dumps(entry))
-                    resp2 = requests.post(
-                        f"{es_host}/{index_name}/_bulk",
-                        auth=(es_user, es_pass),
-                        headers={"Content-Type": "application/x-ndjson"},
-                        data="\n".join(bulk_lines) + "\n",
-                        timeout=60,
-                    )
-                    if resp2.status_code != 200:
-                        raise Exception(f"Bulk ingest HTTP error: {resp2.text[:500]}")
-                    bulk_result = resp2.json()
-                    if bulk_result.get("errors"):
-                        failed_items = [item for item in bulk_result.get("items", [])
-                                        if item.get("index", {}).get("error")]
-                        sample = failed_items[0]["index"]["error"] if failed_items else {}
-                        raise Exception(
-                            f"Bulk ingest: {len(failed_items)}/{len(chunk)} docs failed. "
-                            f"Error: {sample.get('type')}: {sample.get('reason', '')[:200]}"
-                        )
-                    total_ingested += len(chunk)
-
-                chunk = []
-    finally:
-        if csv_file:
-            csv_file.close()
+        shards = generate_shards(data_type, num_entries, start_date, end_date, config,
+                                 CHUNK_SIZE, workers=workers,
+                                 columns=generate_csv and not write_bulk,
+                                 bulk=ingest_to_es or write_bulk, seed=seed)
+        for shard in shards:
+            if write_bulk:
+                sink.write_bulk(shard.bulk, shard.count, timestamps=shard.timestamps)
+            elif sink:
+                sink.write_columns(shard.columns)
+            if indexer:
+                indexer.submit(shard.bulk, shard.count)  # blocks while the senders are behind
+            generated += shard.count
+            report()
+        total_ingested = indexer.close() if indexer else 0
+        if indexer and indexer.sender.dead_letter.count:
+            dead_letter = indexer.sender.dead_letter
+            update_operation_status(operation_id, 'running',
+                f'{dead_letter.count} documents were rejected by Elasticsearch and written '
+                f'to {dead_letter.path}', progress_base + progress_range,
+                bulk=indexer.sender.stats())
+    except BaseException:
+        if indexer:
+            indexer.abort()
+        if sink:
+            sink.abort()
+        raise
+    if sink:
+        sink.close()
 
-    return csv_path, total_ingested
+    return sink, total_ingested
 
 
 def run_log_generation(operation_id, num_entries, data_type, generate_csv,
                        ingest_to_es, create_kibana_objects, config,
-                       start_date=None, end_date=None):
+                       start_date=None, end_date=None, seed=None):
     """Background task for single data-type generation."""
     try:
         update_operation_status(operation_id, 'running', 'Starting data generation...', 0)
@@ -434,15 +481,19 @@ def run_log_generation(operation_id, num_entries, data_type, generate_csv,
         if end_date is None:
             end_date = datetime.now()
 
-        csv_path, total_ingested = _run_generation_pipeline(
+        sink, total_ingested = _run_generation_pipeline(
             operation_id, data_type, num_entries, start_date, end_date,
             generate_csv, ingest_to_es, config,
-            progress_base=5, progress_range=75,
+            progress_base=5, progress_range=75, seed=seed,
         )
 
         msg_parts = []
-        if generate_csv and csv_path:
-            msg_parts.append(f'CSV: {csv_path}')
+        if sink:
+            if len(sink.parts) > 1:
+                msg_parts.append(f'{sink.format.upper()}: {len(sink.parts)} parts, '
+                                 f'manifest {sink.manifest_path}')
+            else:
+                msg_parts.append(f'{sink.format.upper()}: {sink.path}')
         if ingest_to_es:
             msg_parts.append(f'Ingested {total_ingested} docs')
 
@@ -463,7 +514,8 @@ def run_log_generation(operation_id, num_entries, data_type, generate_csv,
 
 
 def run_all_generation(operation_id, num_entries, generate_csv, ingest_to_es,
-                       create_kibana_objects, config, start_date=None, end_date=None):
+                       create_kibana_objects, config, start_date=None, end_date=None,
+                       seed=None):
     """Background task: generate all 8 data types sequentially."""
     if start_date is None:
         start_date = datetime.now() - timedelta(days=365)
@@ -485,6 +537,7 @@ def run_all_generation(operation_id, num_entries, generate_csv, ingest_to_es,
                 operation_id, data_type, num_entries, start_date, end_date,
                 generate_csv, ingest_to_es, config,
                 progress_base=base_pct, progress_range=int(90 / len(types)),
+                seed=seed,
             )
             if create_kibana_objects:
                 create_kibana_objects_for_data_type(
@@ -500,182 +553,21 @@ def run_all_generation(operation_id, num_entries, generate_csv, ingest_to_es,
         update_operation_status(operation_id, 'completed',
             f'All {len(types)} data types generated successfully!', 100)
 
-def flatten_dict(d, parent_key='', sep='.'):
-    """Flatten nested dictionaries for CSV output"""
-    items = []
-    for k, v in d.items():
-        new_key = f"{parent_key}{sep}{k}" if parent_key else k
-        if isinstance(v, dict):
-            items.extend(flatten_dict(v, new_key, sep=sep).items())
-        elif isinstance(v, list):
-            # Convert lists to JSON strings for CSV
-            items.append((new_key, json.dumps(v)))
-        else:
-            items.append((new_key, v))
-    return dict(items)
-
-def ingest_data_to_es(entries, index_name, data_type, config):
-    """Ingest data entries into Elasticsearch in CHUNK_SIZE batches."""
-    es_host = config['elasticsearch']['host']
-    es_user = config['elasticsearch']['username']
-    es_pass = config['elasticsearch']['password']
-    index_url = f"{es_host}/{index_name}"
-
-    mapping = get_mapping_for_data_type(data_type)
-    resp = requests.put(
-        index_url,
-        auth=(es_user, es_pass),
-        headers={"Content-Type": "application/json"},
-        json={"settings": {"number_of_shards": 1, "number_of_replicas": 0},
-              "mappings": mapping},
-        timeout=30,
-    )
-    _check_index_response(resp)
-
-    for i in range(0, len(entries), CHUNK_SIZE):
-        chunk = entries[i:i + CHUNK_SIZE]
-        bulk_lines = []
-        for entry in chunk:
-            bulk_lines.append(json.dumps({"index": {}}))
-            bulk_lines.append(json.dumps(entry))
-        resp2 = requests.post(
-            f"{index_url}/_bulk",
-            auth=(es_user, es_pass),
-            headers={"Content-Type": "application/x-ndjson"},
-            data="\n".join(bulk_lines) + "\n",
-            timeout=60,
-        )
-        if resp2.status_code != 200:
-            raise Exception(f"Bulk ingest HTTP error: {resp2.text[:500]}")
-        bulk_result = resp2.json()
-        if bulk_result.get("errors"):
-            failed_items = [item for item in bulk_result.get("items", [])
-                            if item.get("index", {}).get("error")]
-            sample = failed_items[0]["index"]["error"] if failed_items else {}
-            raise Exception(
-                f"Bulk ingest: {len(failed_items)}/{len(chunk)} documents failed. "
-                f"Error: {sample.get('type')}: {sample.get('reason', '')[:200]}"
-            )
+def ingest_data_to_es(entries, index_name, data_type, config, on_ack=None):
+    """Ingest data entries into Elasticsearch in ``bulk_mb``-sized requests, several in
+    flight at once (see ingest.py). Returns the number of documents acknowledged."""
+    create_index(config, index_name, get_mapping_for_data_type(data_type))
+    with open_indexer(config, index_name, on_ack=on_ack) as indexer:
+        for i in range(0, len(entries), CHUNK_SIZE):
+            chunk = entries[i:i + CHUNK_SIZE]
+            indexer.submit(bulk_body(chunk), len(chunk))
+    return indexer.acked
 
 def get_mapping_for_data_type(data_type):
-    """Get appropriate Elasticsearch mapping for data type"""
-    mappings = {
-        "unstructured_logs": {
-            "properties": {
-                "@timestamp": {"type": "date"},
-                "log.level": {"type": "keyword"},
-                "source": {"type": "keyword"},
-                "message": {"type": "text"}
-            }
-        },
-        "structured_logs": {
-            "properties": {
-                "@timestamp": {"type": "date"},
-                "service.name": {"type": "keyword"},
-                "service.version": {"type": "keyword"},
-                "log.level": {"type": "keyword"},
-                "environment": {"type": "keyword"},
-                "host.name": {"type": "keyword"},
-                "trace.id": {"type": "keyword"},
-                "span.id": {"type": "keyword"},
-                "user.id": {"type": "keyword"},
-                "http.method": {"type": "keyword"},
-                "http.status_code": {"type": "integer"},
-                "http.response_time_ms": {"type": "integer"},
-                "message": {"type": "text"}
-            }
-        },
-        "distributed_traces": {
-            "properties": {
-                "@timestamp": {"type": "date"},
-                "trace.id": {"type": "keyword"},
-                "span.id": {"type": "keyword"},
-                "span.parent_id": {"type": "keyword"},
-                "span.name": {"type": "keyword"},
-                "service.name": {"type": "keyword"},
-                "operation.name": {"type": "keyword"},
-                "span.kind": {"type": "keyword"},
-                "span.status": {"type": "keyword"},
-                "duration.ms": {"type": "integer"},
-                "span.start_time": {"type": "date"},
-                "span.end_time": {"type": "date"}
-            }
-        },
-        "metrics": {
-            "properties": {
-                "@timestamp": {"type": "date"},
-                "metric.type": {"type": "keyword"},
-                "metric.name": {"type": "keyword"},
-                "metric.value": {"type": "double"},
-                "service.name": {"type": "keyword"},
-                "host.name": {"type": "keyword"},
-                "environment": {"type": "keyword"}
-            }
-        },
-        "security_events": {
-            "properties": {
-                "@timestamp": {"type": "date"},
-                "event.type": {"type": "keyword"},
-                "event.id": {"type": "keyword"},
-                "event.severity": {"type": "keyword"},
-                "event.action": {"type": "keyword"},
-                "event.outcome": {"type": "keyword"},
-                "source.ip": {"type": "ip"},
-                "destination.ip": {"type": "ip"},
-                "user.name": {"type": "keyword"},
-                "host.name": {"type": "keyword"}
-            }
-        },
-        "alerts": {
-            "properties": {
-                "@timestamp": {"type": "date"},
-                "alert.name": {"type": "keyword"},
-                "alert.state": {"type": "keyword"},
-                "alert.severity": {"type": "keyword"},
-                "alert.id": {"type": "keyword"},
-                "alert.started_at": {"type": "date"},
-                "alert.resolved_at": {"type": "date"},
-                "metric.value": {"type": "double"},
-                "metric.threshold": {"type": "double"}
-            }
-        },
-        "network_traffic": {
-            "properties": {
-                "@timestamp": {"type": "date"},
-                "flow.id": {"type": "keyword"},
-                "network.protocol": {"type": "keyword"},
-                "source.ip": {"type": "ip"},
-                "destination.ip": {"type": "ip"},
-                "source.port": {"type": "integer"},
-                "destination.port": {"type": "integer"},
-                "network.bytes": {"type": "long"},
-                "network.packets": {"type": "integer"},
-                "network.direction": {"type": "keyword"},
-                "event.action": {"type": "keyword"}
-            }
-        },
-        "apm_data": {
-            "properties": {
-                "@timestamp": {"type": "date"},
-                "transaction.id": {"type": "keyword"},
-                "transaction.type": {"type": "keyword"},
-                "transaction.name": {"type": "keyword"},
-                "service.name": {"type": "keyword"},
-                "service.version": {"type": "keyword"},
-                "transaction.duration.ms": {"type": "integer"},
-                "transaction.result": {"type": "keyword"},
-                "user.id": {"type": "keyword"},
-                "trace.id": {"type": "keyword"},
-                "span.id": {"type": "keyword"},
-                "http.method": {"type": "keyword"},
-                "http.status_code": {"type": "integer"},
-                "error.type": {"type": "keyword"},
-                "error.message": {"type": "text"}
-            }
-        }
-    }
-    
-    return mappings.get(data_type, {"properties": {"@timestamp": {"type": "date"}}})
+    """Get appropriate Elasticsearch mapping for data type (from its generator's schema)"""
+    if data_type in DATA_GENERATORS:
+        return schema_for(data_type).mapping()
+    return {"properties": {"@timestamp": {"type": "date"}}}
 
 def create_kibana_objects_for_data_type(data_type, index_name, config):
     """Create Kibana data view, Discover sessions, and dashboard for the given data type."""
@@ -699,9 +591,8 @@ def import_kibana_objects_improved(objects, config):
 
     try:
         with open(temp_path, 'rb') as f:
-            resp = requests.post(
+            resp = kibana_session(config).post(
                 f"{config['kibana']['host']}/api/saved_objects/_import?overwrite=true",
-                auth=(config['kibana']['username'], config['kibana']['password']),
                 headers={"kbn-xsrf": "true"},
                 files={"file": ("saved_objects.ndjson", f, "application/ndjson")},
             )
@@ -732,9 +623,8 @@ def cleanup_es():
     for data_type, meta in DATA_GENERATORS.items():
         index = meta['index_pattern']
         try:
-            resp = requests.delete(
+            resp = es_session(config).delete(
                 f"{config['elasticsearch']['host']}/{index}",
-                auth=(config['elasticsearch']['username'], config['elasticsearch']['password']),
                 timeout=10
             )
             results[index] = 'deleted' if resp.status_code in (200, 404) else f"error {resp.status_code}"
@@ -744,21 +634,81 @@ def cleanup_es():
 
 @app.route('/api/cleanup/csv', methods=['POST'])
 def cleanup_csv():
-    """Delete all CSV files from output_csv/. Disabled unless ENABLE_CLEANUP_ROUTES=true."""
+    """Delete generated output from output_csv/: CSV/Parquet/Arrow files, .ndjson bulk
+    datasets, .log files and manifests (not dead letters). Disabled unless
+    ENABLE_CLEANUP_ROUTES=true."""
     if not ENABLE_CLEANUP_ROUTES:
         return jsonify({'error': 'Cleanup routes are disabled. Set ENABLE_CLEANUP_ROUTES=true to enable.'}), 403
     deleted, errors = [], []
-    csv_dir = 'output_csv'
-    if os.path.exists(csv_dir):
-        for fname in os.listdir(csv_dir):
-            if fname.endswith('.csv'):
+    if os.path.exists(OUTPUT_DIR):
+        for fname in os.listdir(OUTPUT_DIR):
+            if is_output_file(fname):
                 try:
-                    os.remove(os.path.join(csv_dir, fname))
+                    os.remove(os.path.join(OUTPUT_DIR, fname))
                     deleted.append(fname)
                 except OSError as e:
                     errors.append(str(e))
     return jsonify({'deleted': deleted, 'errors': errors})
 
+# ---------------------------------------------------------------------------
+# Bulk dataset replay
+# ---------------------------------------------------------------------------
+
+@app.route('/api/datasets')
+def list_bulk_datasets():
+    """Stored _bulk NDJSON datasets (output_format "bulk") that can be replayed."""
+    return jsonify(list_datasets(OUTPUT_DIR))
+
+
+@app.route('/api/replay', methods=['POST'])
+def replay_dataset():
+    data = request.get_json(force=True, silent=True) or {}
+    manifest = data.get('manifest')
+    index = (data.get('index') or '').strip() or None
+    config = load_config()
+
+    known = {d['manifest'] for d in list_datasets(OUTPUT_DIR)}
+    if manifest not in known:
+        return jsonify({'error': f'Unknown dataset: {manifest}'}), 400
+    try:
+        loops = int(data.get('loops') or 1)
+        rate = float(data.get('rate')) if data.get('rate') else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Loops and rate must be numbers'}), 400
+    if loops < 1 or (rate is not None and rate <= 0):
+        return jsonify({'error': 'Loops must be at least 1 and the rate positive'}), 400
+    ok, err = validate_es_connection(config)
+    if not ok:
+        return jsonify({'error': f'Cannot reach Elasticsearch: {err}'}), 503
+
+    operation_id = str(uuid.uuid4())
+    thread = threading.Thread(target=_run_replay_task,
+                              args=(operation_id, manifest, index, config, loops, rate))
+    thread.start()
+    return jsonify({'operation_id': operation_id})
+
+
+def _run_replay_task(operation_id, manifest, index, config, loops=1, rate=None):
+    """Background task: stream a stored bulk dataset to Elasticsearch."""
+    try:
+        update_operation_status(operation_id, 'running', f'Replaying {manifest}...', 0)
+
+        def progress(sent, total):
+            pct = int(sent / total * 99) if total else None
+            update_operation_status(operation_id, 'running',
+                f'Sent {sent}/{total} docs...' if total else f'Sent {sent} docs...', pct)
+
+        sent, dead_letter = replay(manifest, config, index=index, progress=progress,
+                                   loops=loops, rate=rate)
+        message = f'Replayed {sent} docs from {os.path.basename(manifest)}'
+        if dead_letter.count:
+            message += (f'; {dead_letter.count} rejected by Elasticsearch '
+                        f'and written to {dead_letter.path}')
+        update_operation_status(operation_id, 'completed', message, 100)
+    except Exception as e:
+        update_operation_status(operation_id, 'error', f'Replay error: {e}', None)
+
+
 # ---------------------------------------------------------------------------
 # Streaming API
 # ---------------------------------------------------------------------------
@@ -778,12 +728,16 @@ def stream_start():
 
     if data_type not in DATA_GENERATORS:
         return jsonify({'error': f'Unknown data type: {data_type}'}), 400
+    try:
+        seed = parse_seed(data.get('seed'))
+    except ValueError:
+        return jsonify({'error': 'Seed must be a non-negative integer'}), 400
 
     ok, err = validate_es_connection(config)
     if not ok:
         return jsonify({'error': f'Cannot reach Elasticsearch: {err}'}), 503
 
-    ok, err = _streaming.start_streaming(data_type, rate, config, max_events)
+    ok, err = _streaming.start_streaming(data_type, rate, config, max_events, seed=seed)
     if not ok:
         return jsonify({'error': err}), 409
     return jsonify({'status': 'started', 'data_type': data_type, 'rate_per_min': rate})
@@ -812,10 +766,17 @@ def run_scenario():
     ingest_es      = bool(data.get('ingest_to_es', False))
     create_kibana  = bool(data.get('create_kibana_objects', False))
     date_range     = data.get('date_range', '7d')
+    output_format  = data.get('output_format') or None
     config = load_config()
 
     if scenario_name not in SCENARIOS:
         return jsonify({'error': f'Unknown scenario: {scenario_name}'}), 400
+    if output_format is not None and output_format not in FORMATS:
+        return jsonify({'error': f'Unknown output format: {output_format}'}), 400
+    try:
+        seed = parse_seed(data.get('seed'))
+    except ValueError:
+        return jsonify({'error': 'Seed must be a non-negative integer'}), 400
 
     if ingest_es or create_kibana:
         ok, err = validate_es_connection(config)
@@ -831,27 +792,44 @@ def run_scenario():
     thread = threading.Thread(
         target=_run_scenario_task,
         args=(operation_id, scenario_name, num_entries, ingest_es, create_kibana,
-              config, start_date, end_date),
+              config, start_date, end_date, seed, output_format),
     )
     thread.start()
     return jsonify({'operation_id': operation_id})
 
 
 def _run_scenario_task(operation_id, scenario_name, num_entries,
-                       ingest_es, create_kibana, config, start_date, end_date):
+                       ingest_es, create_kibana, config, start_date, end_date, seed=None,
+                       output_format=None):
+    """Background task for a scenario; ``output_format`` also writes one file per data type."""
     try:
         meta = SCENARIOS[scenario_name]
         update_operation_status(operation_id, 'running',
             f"Generating scenario '{meta['name']}'...", 0)
 
-        results = generate_scenario_entries(scenario_name, num_entries, start_date, end_date)
+        configure_pools(config)
+        results = generate_scenario_entries(scenario_name, num_entries, start_date, end_date,
+                                            seed=seed)
         total = sum(len(v) for v in results.values())
+        _, compression, row_group_size = output_options(config)
+        max_rows, max_bytes = rolling_options(config)
+        paths = []
 
         for idx, (data_type, entries) in enumerate(results.items()):
             pct = int((idx / len(results)) * 85)
             update_operation_status(operation_id, 'running',
                 f"[{idx+1}/{len(results)}] Ingesting {data_type} ({len(entries)} entries)...", pct)
 
+            # Access log lines only exist for the data types with HTTP requests
+            if output_format and supports_style(schema_for(data_type), output_format):
+                with RollingSink.claim(f"{scenario_name}-{data_type}", schema_for(data_type),
+                                       output_format, compression,
+                                       row_group_size=row_group_size,
+                                       max_rows=max_rows, max_bytes=max_bytes,
+                                       meta={'data_type': data_type,
+                                             'scenario': scenario_name}) as sink:
+                    sink.write_rows(entries)
+                paths.append(sink.path)
             if ingest_es:
                 index_name = DATA_GENERATORS[data_type]['index_pattern']
                 ingest_data_to_es(entries, index_name, data_type, config)
@@ -861,7 +839,8 @@ def _run_scenario_task(operation_id, scenario_name, num_entries,
 
         update_operation_status(operation_id, 'completed',
             f"Scenario '{meta['name']}' complete — {total} total entries across "
-            f"{len(results)} data types.", 100)
+            f"{len(results)} data types."
+            + (f" Files in {OUTPUT_DIR}/ ({len(paths)})." if paths else ""), 100)
     except Exception as e:
         update_operation_status(operation_id, 'error', f'Scenario error: {e}', None)
 
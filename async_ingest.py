@@ -0,0 +1,239 @@
+"""Asyncio ``_bulk`` ingestion on one shared event loop.
+
+The threaded BulkIndexer (ingest.py) ties up a thread per request in flight.
+With ``log_generation.ingest_engine`` set to ``"asyncio"``, bulk requests run
+as coroutines on a single event loop instead, over one aiohttp session per
+cluster, so any number of generation jobs and streams multiplex their
+requests on one thread and one connection pool.
+
+The loop never generates data. Generation jobs keep producing on their own
+threads and hand each body to the loop (``LoopIndexer``), blocking while its
+queue is full; coroutines that generate, like the streaming worker, run the
+generator in the loop's executor (``in_executor``).
+
+Needs ``pip install aiohttp``.
+"""
+
+import asyncio
+import atexit
+import threading
+
+from connections import http_options, ssl_context
+from ingest import NDJSON_HEADERS, BulkBatcher
+
+_loop = None
+_loop_lock = threading.Lock()
+_sessions = {}  # only touched from the loop thread
+
+
+def _aiohttp():
+    try:
+        import aiohttp
+    except ImportError as exc:
+        raise ImportError("The asyncio ingest engine needs aiohttp: pip install aiohttp") from exc
+    return aiohttp
+
+
+def get_loop():
+    """The shared event loop, started on a daemon thread on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _aiohttp()  # fail here, in the caller, rather than inside the loop
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, daemon=True, name="ingest-loop").start()
+            atexit.register(close_sessions)
+        return _loop
+
+
+def close_sessions():
+    """Close every aiohttp session on the shared loop (registered to run at exit)."""
+    if _loop is not None and _loop.is_running():
+        run(_close_sessions())
+
+
+async def _close_sessions():
+    sessions = list(_sessions.values())
+    _sessions.clear()
+    for session in sessions:
+        await session.close()
+
+
+def run(coro):
+    """Run ``coro`` on the shared loop and wait for its result (from any other thread)."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop()).result()
+
+
+def spawn(coro):
+    """Schedule ``coro`` on the shared loop; returns a concurrent.futures.Future."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
+
+
+async def in_executor(func, *args):
+    """Run a blocking ``func(*args)`` (e.g. a generator batch) off the loop."""
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+def get_session(config):
+    """The shared aiohttp session for the configured Elasticsearch cluster.
+
+    Call from the loop; the settings are those of connections.py's ``http`` section.
+    """
+    aiohttp = _aiohttp()
+    es = config["elasticsearch"]
+    options = http_options(config)
+    key = (es["host"], es.get("username"), es.get("password"), tuple(sorted(options.items())))
+    session = _sessions.get(key)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=int(options["pool_maxsize"]),
+                                         ssl=ssl_context(options),
+                                         force_close=not options["keep_alive"])
+        auth = aiohttp.BasicAuth(es["username"], es["password"] or "") if es.get("username") else None
+        session = _sessions[key] = aiohttp.ClientSession(
+            connector=connector, auth=auth,
+            timeout=aiohttp.ClientTimeout(total=options["timeout"]))
+    return session
+
+
+async def send(sender, session, body, docs, timeout=None):
+    """ingest.BulkSender.send() over an aiohttp ``session``: POST ``body`` until
+    each document is accepted or dead-lettered; returns the number accepted."""
+    aiohttp = _aiohttp()
+    kwargs = {"timeout": aiohttp.ClientTimeout(total=timeout)} if timeout else {}
+    steps = sender.attempts(body, docs)
+    reply = None
+    while True:
+        try:
+            action, value = steps.send(reply)
+        except StopIteration as done:
+            return done.value
+        if action == "post":
+            try:
+                async with session.post(sender.url, data=value, headers=NDJSON_HEADERS,
+                                        **kwargs) as resp:
+                    reply = resp.status, await resp.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                reply = None, b""
+        else:
+            await asyncio.sleep(value)
+            reply = True
+
+
+class AsyncBulkIndexer:
+    """The coroutine counterpart of ingest.BulkIndexer: ``senders`` tasks post
+    the bodies awaited into a bounded queue through ``sender`` (a BulkSender).
+    Create it with ``await open(...)`` on the loop; ``acked``, ``on_ack`` and
+    the error handling are as there. Bodies are sent as submitted; LoopIndexer
+    sizes them before they get here.
+    """
+
+    def __init__(self, session, sender, senders, queue_size, on_ack=None):
+        self.sender = sender
+        self.on_ack = on_ack
+        self.acked = 0
+        self.error = None
+        self._session = session
+        self._queue = asyncio.Queue(maxsize=queue_size or 2 * senders)
+        self._stopped = False
+        self._finished = False
+        self._tasks = [asyncio.create_task(self._send_loop()) for _ in range(senders)]
+
+    @classmethod
+    async def open(cls, config, sender, senders, queue_size=None, on_ack=None):
+        return cls(get_session(config), sender, senders, queue_size, on_ack=on_ack)
+
+    async def submit(self, body, docs):
+        if self._stopped:
+            self._raise()
+            raise RuntimeError("AsyncBulkIndexer has been aborted")
+        await self._queue.put((body, docs))
+
+    async def close(self):
+        await self._finish()
+        self._raise()
+        return self.acked
+
+    async def abort(self):
+        """Drop queued bodies and cancel the requests in flight or backing off."""
+        self._stopped = True
+        self._finished = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _finish(self):
+        if self._finished:
+            return
+        self._finished = True
+        for _ in self._tasks:
+            await self._queue.put(None)
+        await asyncio.gather(*self._tasks)
+
+    def _raise(self):
+        if self.error is not None:
+            raise self.error
+
+    async def _send_loop(self):
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            if self._stopped:
+                continue
+            body, docs = item
+            try:
+                accepted = await send(self.sender, self._session, body, docs)
+            except Exception as exc:
+                if self.error is None:
+                    self.error = exc
+                self._stopped = True
+                continue
+            self.acked += accepted
+            if self.on_ack:
+                self.on_ack(self.acked)
+
+
+class LoopIndexer:
+    """An AsyncBulkIndexer on the shared loop, driven from a producer thread
+    with the same blocking interface as ingest.BulkIndexer. Bodies are regrouped
+    to the sizer's target on the calling thread, not on the loop."""
+
+    def __init__(self, config, sender, senders, queue_size=None, on_ack=None):
+        get_loop()
+        self.sender = sender
+        self._batcher = BulkBatcher(sender.sizer)
+        self._indexer = run(AsyncBulkIndexer.open(config, sender, senders, queue_size, on_ack))
+
+    @property
+    def sizer(self):
+        return self.sender.sizer
+
+    @property
+    def acked(self):
+        return self._indexer.acked
+
+    def submit(self, body, docs):
+        for item in self._batcher.feed(body, docs):
+            run(self._indexer.submit(*item))
+
+    def close(self):
+        try:
+            for item in self._batcher.flush():
+                run(self._indexer.submit(*item))
+        except BaseException:
+            self.abort()
+            raise
+        return run(self._indexer.close())
+
+    def abort(self):
+        run(self._indexer.abort())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
@@ -6,7 +6,13 @@ Install:
 Usage:
     ldg generate --type unstructured_logs --entries 5000 --ingest
     ldg generate --type all --entries 1000 --ingest --dashboards
-    ldg scenario  --name deployment_failure --entries 500 --ingest
+    ldg generate --type metrics --entries 100000 --csv --seed 42 --end 2025-01-01
+    ldg generate --type all --entries 1000000 --format parquet --compression zstd
+    ldg generate --type apm_data --entries 1000000 --format bulk --max-file-mb 256
+    ldg generate --type network_traffic --entries 1000000 --format access --log-file /var/log/ldg/access.log
+    ldg scenario  --name deployment_failure --entries 500 --ingest --format parquet
+    ldg replay    output_csv/apm_data-cli-001.manifest.json --index apm-replay
+    ldg replay    output_csv/apm_data-cli-001.manifest.json --loop 0 --rate 50000
     ldg stream    --type apm_data --rate 120
     ldg stop
     ldg status
@@ -16,7 +22,6 @@ Usage:
 
 import sys
 import json
-import csv as _csv_mod
 import os
 import time
 import datetime
@@ -65,7 +70,7 @@ def _load_cfg(es_host=None, es_user=None, es_pass=None,
     return cfg
 
 
-def _parse_date_range(date_range: str) -> tuple:
+def _parse_date_range(date_range: str, end: datetime.datetime | None = None) -> tuple:
     deltas = {
         "24h":       datetime.timedelta(hours=24),
         "7d":        datetime.timedelta(days=7),
@@ -73,7 +78,7 @@ def _parse_date_range(date_range: str) -> tuple:
         "90d":       datetime.timedelta(days=90),
         "last_year": datetime.timedelta(days=365),
     }
-    end = datetime.datetime.now()
+    end = end or datetime.datetime.now()
     return end - deltas[date_range], end
 
 
@@ -97,21 +102,72 @@ def cli():
 @click.option("--entries", default=1000, show_default=True,
               help="Number of entries to generate.")
 @click.option("--csv/--no-csv", default=False, help="Write output to a CSV file.")
+@click.option("--format", "file_format", default=None,
+              type=click.Choice(["csv", "parquet", "arrow", "bulk", "log", "syslog", "access"]),
+              help="Write output to a file in this format (--csv is --format csv); "
+                   "bulk = _bulk NDJSON for `ldg replay`; log/syslog/access = text log lines.")
+@click.option("--compression", default=None,
+              help="gzip/zstd for CSV (.csv.gz / .csv.zst); Parquet/Arrow codec, e.g. zstd, "
+                   "snappy, lz4. 'none' disables it (default: from config).")
+@click.option("--max-file-rows", default=None, type=click.IntRange(min=0),
+              help="Start a new part file every N rows (0 = one file; default: from config).")
+@click.option("--max-file-mb", default=None, type=click.FloatRange(min=0),
+              help="Start a new part file once a part reaches N MB (default: from config).")
+@click.option("--log-file", default=None, type=click.Path(dir_okay=False),
+              help="Append text log lines (--format log/syslog/access, default log) to this "
+                   "file for a shipper to tail; it is rotated at --max-file-mb.")
+@click.option("--log-backups", default=5, show_default=True, type=click.IntRange(min=1),
+              help="Rotated copies of --log-file to keep (FILE.1 … FILE.N).")
 @click.option("--ingest/--no-ingest", default=False, help="Ingest into Elasticsearch.")
 @click.option("--dashboards/--no-dashboards", default=False,
               help="Create Kibana data views and dashboards.")
 @click.option("--date-range", default="last_year", show_default=True,
               type=click.Choice(["24h", "7d", "30d", "90d", "last_year"]),
               help="Timestamp range for generated data.")
+@click.option("--end", "end_date", default=None, type=click.DateTime(),
+              help="End of the time range (default: now). Pin it with --seed for repeatable data.")
+@click.option("--seed", default=None, type=click.IntRange(min=0),
+              help="Random seed; the same seed and range reproduce the same data.")
+@click.option("--full-traces/--sampled-spans", default=None,
+              help="distributed_traces: emit every span of each trace (default: from config).")
+@click.option("--ordered/--unordered", default=None,
+              help="Emit entries in ascending @timestamp order (default: from config).")
 @_with_es_opts
-def cmd_generate(data_type, entries, csv, ingest, dashboards, date_range,
+def cmd_generate(data_type, entries, csv, file_format, compression, max_file_rows, max_file_mb,
+                 log_file, log_backups, ingest, dashboards, date_range, end_date, seed, full_traces, ordered,
                  es_host, es_user, es_pass, kibana_host, kibana_user, kibana_pass):
     """Generate synthetic observability data."""
-    from data_generators import DATA_GENERATORS
+    from data_generators import DATA_GENERATORS, schema_for
+    from ingest import create_index, open_indexer
+    from serializers import bulk_body
+    from sharding import TIMESTAMP_PATH, iter_batches
+    from log_lines import LOG_STYLES, line_renderer
+    from sinks import RollingSink, RotatingLogFile, TextSink, output_options, rolling_options
     import app as _app
 
     cfg = _load_cfg(es_host, es_user, es_pass, kibana_host, kibana_user, kibana_pass)
-    start_dt, end_dt = _parse_date_range(date_range)
+    start_dt, end_dt = _parse_date_range(date_range, end_date)
+    if log_file:
+        file_format = file_format or "log"
+        if file_format not in LOG_STYLES:
+            click.echo("--log-file takes --format log, syslog or access", err=True)
+            sys.exit(1)
+        if compression not in (None, "none"):
+            click.echo("--log-file is written uncompressed, for shippers to tail", err=True)
+            sys.exit(1)
+    if full_traces is not None:
+        cfg["log_generation"]["full_traces"] = full_traces
+    if ordered is not None:
+        cfg["log_generation"]["ordered"] = ordered
+    if compression is not None:
+        cfg["log_generation"]["compression"] = compression
+    if max_file_rows is not None:
+        cfg["log_generation"]["max_file_rows"] = max_file_rows
+    if max_file_mb is not None:
+        cfg["log_generation"]["max_file_mb"] = max_file_mb
+    file_format = file_format or ("csv" if csv else None)
+    _, compression, row_group_size = output_options(cfg)
+    max_rows, max_bytes = rolling_options(cfg)
 
     all_types = list(DATA_GENERATORS.keys())
     types = all_types if data_type == "all" else [data_type]
@@ -125,26 +181,55 @@ def cmd_generate(data_type, entries, csv, ingest, dashboards, date_range,
         index_name = DATA_GENERATORS[dt]["index_pattern"]
         click.echo(f"  {dt} ({entries} entries)...", nl=False)
         try:
-            gen_class = DATA_GENERATORS[dt]["generator"]
-            gen = gen_class(start_date=start_dt, end_date=end_dt)
-            all_entries = [gen.generate_entry() for _ in range(entries)]
-
-            if csv:
-                os.makedirs("output_csv", exist_ok=True)
-                path = os.path.join("output_csv", f"{dt}-cli.csv")
-                from app import flatten_dict
-                flat = [flatten_dict(e) for e in all_entries]
-                fieldnames = sorted({k for row in flat for k in row})
-                with open(path, "w", newline="", encoding="utf-8") as fh:
-                    writer = _csv_mod.DictWriter(fh, fieldnames=fieldnames,
-                                                 extrasaction="ignore")
-                    writer.writeheader()
-                    writer.writerows(flat)
-                click.echo(f" csv:{path}", nl=False)
+            # Same shards and streams as the web UI, so a seed reproduces its output.
+            # Each shard goes to the file and to the bulk senders as it is produced.
+            sink = indexer = None
+            schema = schema_for(dt)
+            if file_format in LOG_STYLES:
+                line_renderer(schema, file_format)  # fail before opening any file or sender
+            if ingest:
+                create_index(cfg, index_name, _app.get_mapping_for_data_type(dt))
+                indexer = open_indexer(cfg, index_name)
+            if log_file:
+                sink = TextSink(log_file, schema, file_format,
+                                fileobj=RotatingLogFile(log_file, max_bytes, log_backups))
+            elif file_format:
+                sink = RollingSink.claim(f"{dt}-cli", schema, file_format, compression,
+                                         row_group_size=row_group_size,
+                                         max_rows=max_rows, max_bytes=max_bytes,
+                                         meta={"data_type": dt})
+            try:
+                for batch in iter_batches(dt, entries, start_dt, end_dt, cfg,
+                                          _app.CHUNK_SIZE, seed=seed):
+                    # one body for both the bulk file and the senders
+                    body = bulk_body(batch.to_rows()) if indexer or file_format == "bulk" else None
+                    if file_format == "bulk":
+                        sink.write_bulk(body, len(batch),
+                                        timestamps=batch.select([TIMESTAMP_PATH], missing=None)[0])
+                    elif sink:
+                        sink.write_columns(batch.select(schema.paths, missing=None))
+                    if indexer:
+                        indexer.submit(body, len(batch))
+                ingested = indexer.close() if indexer else 0
+            except BaseException:
+                if indexer:
+                    indexer.abort()
+                if sink:
+                    (sink.close if log_file else sink.abort)()
+                raise
+            if log_file:
+                sink.close()
+                click.echo(f" {file_format}:{log_file} (+{sink.rows} lines)", nl=False)
+            elif sink:
+                sink.close()
+                parts = f" ({len(sink.parts)} parts)" if len(sink.parts) > 1 else ""
+                click.echo(f" {file_format}:{sink.path}{parts}", nl=False)
 
             if ingest:
-                _app.ingest_data_to_es(all_entries, index_name, dt, cfg)
-                click.echo(f" ingested:{entries}", nl=False)
+                click.echo(f" ingested:{ingested}", nl=False)
+                dead_letter = indexer.sender.dead_letter
+                if dead_letter.count:
+                    click.echo(f" dead-lettered:{dead_letter.count} ({dead_letter.path})", nl=False)
 
             if dashboards:
                 _create_kibana_objects(dt, index_name, cfg)
@@ -165,17 +250,29 @@ def cmd_generate(data_type, entries, csv, ingest, dashboards, date_range,
 @click.option("--entries", default=500, show_default=True,
               help="Entries per data type.")
 @click.option("--ingest/--no-ingest", default=False, help="Ingest into Elasticsearch.")
+@click.option("--format", "file_format", default=None,
+              type=click.Choice(["csv", "parquet", "arrow", "bulk", "log", "syslog", "access"]),
+              help="Also write each data type to a file in this format.")
+@click.option("--compression", default=None,
+              help="File compression, as for generate (default: from config).")
 @click.option("--dashboards/--no-dashboards", default=False,
               help="Create Kibana data views and dashboards.")
 @click.option("--date-range", default="7d", show_default=True,
               type=click.Choice(["24h", "7d", "30d"]),
               help="Time window for the scenario.")
+@click.option("--end", "end_date", default=None, type=click.DateTime(),
+              help="End of the time window (default: now). Pin it with --seed for repeatable data.")
+@click.option("--seed", default=None, type=click.IntRange(min=0),
+              help="Random seed; the same seed and window reproduce the same scenario.")
 @_with_es_opts
-def cmd_scenario(name, entries, ingest, dashboards, date_range,
-                 es_host, es_user, es_pass, kibana_host, kibana_user, kibana_pass):
+def cmd_scenario(name, entries, ingest, file_format, compression, dashboards, date_range,
+                 end_date, seed, es_host, es_user, es_pass, kibana_host, kibana_user, kibana_pass):
     """Generate a pre-built correlated scenario across multiple data types."""
-    from data_generators import DATA_GENERATORS
+    from data_generators import DATA_GENERATORS, schema_for
     from scenarios import SCENARIOS, generate_scenario_entries
+    from pools import configure_pools
+    from log_lines import supports_style
+    from sinks import RollingSink, output_options, rolling_options
     import app as _app
 
     if name not in SCENARIOS:
@@ -184,18 +281,30 @@ def cmd_scenario(name, entries, ingest, dashboards, date_range,
         sys.exit(1)
 
     cfg = _load_cfg(es_host, es_user, es_pass, kibana_host, kibana_user, kibana_pass)
-    start_dt, end_dt = _parse_date_range(date_range)
+    start_dt, end_dt = _parse_date_range(date_range, end_date)
+    configure_pools(cfg)
 
     meta = SCENARIOS[name]
     click.echo(f"\nScenario: {meta['name']}")
     click.echo(f"  {meta['description']}\n")
 
-    results = generate_scenario_entries(name, entries, start_dt, end_dt)
+    results = generate_scenario_entries(name, entries, start_dt, end_dt, seed=seed)
+    if compression is not None:
+        cfg["log_generation"]["compression"] = compression
+    _, compression, row_group_size = output_options(cfg)
+    max_rows, max_bytes = rolling_options(cfg)
 
     for dt, type_entries in results.items():
         index_name = DATA_GENERATORS[dt]["index_pattern"]
         click.echo(f"  {dt}: {len(type_entries)} entries", nl=False)
         try:
+            if file_format and supports_style(schema_for(dt), file_format):
+                with RollingSink.claim(f"{name}-{dt}-cli", schema_for(dt), file_format,
+                                       compression, row_group_size=row_group_size,
+                                       max_rows=max_rows, max_bytes=max_bytes,
+                                       meta={"data_type": dt, "scenario": name}) as sink:
+                    sink.write_rows(type_entries)
+                click.echo(f" {file_format}:{sink.path}", nl=False)
             if ingest:
                 _app.ingest_data_to_es(type_entries, index_name, dt, cfg)
                 click.echo(f" ingested", nl=False)
@@ -207,6 +316,51 @@ def cmd_scenario(name, entries, ingest, dashboards, date_range,
             click.echo(f" ✗ {exc}", err=True)
 
 
+# ---------------------------------------------------------------------------
+# replay
+# ---------------------------------------------------------------------------
+
+@cli.command("replay")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--index", default=None,
+              help="Target index (default: the data type's index from the manifest).")
+@click.option("--bulk-mb", default=None, type=click.FloatRange(min=0.01),
+              help="Size of each _bulk request body (default: bulk_mb from config, 5).")
+@click.option("--loop", "loops", default=1, show_default=True, type=click.IntRange(min=0),
+              help="Send the dataset this many times (0 = until Ctrl+C).")
+@click.option("--rate", default=None, type=click.FloatRange(min=0, min_open=True),
+              help="Target rate in docs/s (default: as fast as ES accepts).")
+@_with_es_opts
+def cmd_replay(path, index, bulk_mb, loops, rate,
+               es_host, es_user, es_pass, kibana_host, kibana_user, kibana_pass):
+    """Send a stored _bulk NDJSON dataset (manifest or .ndjson file) to Elasticsearch."""
+    from replay import replay
+    cfg = _load_cfg(es_host, es_user, es_pass, kibana_host, kibana_user, kibana_pass)
+
+    started = time.monotonic()
+    sent_so_far = 0
+
+    def progress(sent, total):
+        nonlocal sent_so_far
+        sent_so_far = sent
+        click.echo(f"\r  {sent:>10} / {total or '?'} docs", nl=False)
+
+    dead_letter = None
+    try:
+        sent, dead_letter = replay(path, cfg, index=index,
+                                   max_bytes=int(bulk_mb * 1024 * 1024) if bulk_mb else None,
+                                   progress=progress, loops=loops, rate=rate)
+    except KeyboardInterrupt:
+        sent = sent_so_far
+    except Exception as exc:
+        click.echo(f"\n ✗ {exc}", err=True)
+        sys.exit(1)
+    elapsed = max(time.monotonic() - started, 1e-9)
+    click.echo(f"\n  Replayed {sent} docs in {elapsed:.1f}s ({sent / elapsed:,.0f} docs/s) ✓")
+    if dead_letter and dead_letter.count:
+        click.echo(f"  {dead_letter.count} docs rejected by Elasticsearch: {dead_letter.path}")
+
+
 # ---------------------------------------------------------------------------
 # stream / stop / status
 # ---------------------------------------------------------------------------
@@ -218,14 +372,16 @@ def cmd_scenario(name, entries, ingest, dashboards, date_range,
               help="Target events per minute.")
 @click.option("--max", "max_events", default=0,
               help="Stop after this many events (0 = unlimited).")
+@click.option("--seed", default=None, type=click.IntRange(min=0),
+              help="Random seed for the generated field values.")
 @_with_es_opts
-def cmd_stream(data_type, rate, max_events,
+def cmd_stream(data_type, rate, max_events, seed,
                es_host, es_user, es_pass, kibana_host, kibana_user, kibana_pass):
     """Stream data continuously to Elasticsearch at a target rate."""
     import streaming
     cfg = _load_cfg(es_host, es_user, es_pass, kibana_host, kibana_user, kibana_pass)
 
-    ok, err = streaming.start_streaming(data_type, rate, cfg, max_events)
+    ok, err = streaming.start_streaming(data_type, rate, cfg, max_events, seed=seed)
     if not ok:
         click.echo(f"Error: {err}", err=True)
         sys.exit(1)
@@ -314,14 +470,17 @@ def cmd_dashboard(data_type, es_host, es_user, es_pass,
 
 @cli.command("cleanup")
 @click.option("--es", "clean_es", is_flag=True, help="Delete Elasticsearch indices.")
-@click.option("--csv", "clean_csv", is_flag=True, help="Delete CSV files from output_csv/.")
+@click.option("--csv", "clean_csv", is_flag=True,
+              help="Delete generated CSV/Parquet/Arrow, .ndjson and .log files and "
+                   "manifests from output_csv/ (dead letters are kept).")
 @click.option("--yes", is_flag=True, help="Skip confirmation prompt.")
 @_with_es_opts
 def cmd_cleanup(clean_es, clean_csv, yes,
                 es_host, es_user, es_pass, kibana_host, kibana_user, kibana_pass):
-    """Remove test data from Elasticsearch and/or local CSV files."""
-    import requests as _req
+    """Remove test data from Elasticsearch and/or local output files."""
+    from connections import es_session
     from data_generators import DATA_GENERATORS
+    from sinks import OUTPUT_DIR, is_output_file
 
     if not clean_es and not clean_csv:
         click.echo("Specify --es, --csv, or both.")
@@ -329,7 +488,7 @@ def cmd_cleanup(clean_es, clean_csv, yes,
 
     if not yes:
         what = " + ".join(filter(None, [
-            "ES indices" if clean_es else "", "CSV files" if clean_csv else "",
+            "ES indices" if clean_es else "", "output files" if clean_csv else "",
         ]))
         click.confirm(f"Delete {what}?", abort=True)
 
@@ -337,30 +496,29 @@ def cmd_cleanup(clean_es, clean_csv, yes,
 
     if clean_es:
         es = cfg["elasticsearch"]
+        session = es_session(cfg)
         for dt, meta in DATA_GENERATORS.items():
             index = meta["index_pattern"]
             click.echo(f"  DELETE {index}...", nl=False)
             try:
-                r = _req.delete(f"{es['host']}/{index}",
-                                auth=(es["username"], es["password"]), timeout=10)
+                r = session.delete(f"{es['host']}/{index}", timeout=10)
                 click.echo(" deleted" if r.status_code in (200, 404) else f" {r.status_code}")
             except Exception as exc:
                 click.echo(f" error: {exc}", err=True)
 
     if clean_csv:
-        csv_dir = "output_csv"
-        if not os.path.exists(csv_dir):
-            click.echo("No output_csv/ directory found.")
+        if not os.path.exists(OUTPUT_DIR):
+            click.echo(f"No {OUTPUT_DIR}/ directory found.")
         else:
             removed = 0
-            for fname in os.listdir(csv_dir):
-                if fname.endswith(".csv"):
+            for fname in os.listdir(OUTPUT_DIR):
+                if is_output_file(fname):
                     try:
-                        os.remove(os.path.join(csv_dir, fname))
+                        os.remove(os.path.join(OUTPUT_DIR, fname))
                         removed += 1
                     except OSError as exc:
                         click.echo(f"  Could not remove {fname}: {exc}", err=True)
-            click.echo(f"  {removed} CSV file(s) removed.")
+            click.echo(f"  {removed} file(s) removed.")
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,228 @@
+"""Column-oriented batches of generated documents.
+
+Generators assemble a batch field by field anyway, so ColumnBatch keeps it
+that way: one column (a list or NumPy array) per field instead of one dict per
+document. A 5,000-row chunk is then a few dozen lists rather than 5,000 dicts
+(plus nested dicts), and sinks can serialize straight from the columns.
+
+Columns are keyed by path tuples, e.g. ``("resource.attributes", "host.name")``
+for ``doc["resource.attributes"]["host.name"]``; a field's flat (CSV) name is
+the path joined with dots. Fields that only some rows have are *sparse*: rows
+without the field hold the ``MISSING`` sentinel, which is distinct from an
+explicit ``None`` value.
+"""
+
+import json
+
+import numpy as np
+
+
+class _Missing:
+    __slots__ = ()
+
+    def __repr__(self):
+        return "MISSING"
+
+    def __reduce__(self):
+        return "MISSING"
+
+
+MISSING = _Missing()  # placeholder for "this row has no such field"
+
+
+def _as_list(column):
+    return column.tolist() if isinstance(column, np.ndarray) else column
+
+
+class ColumnBatch:
+    """``n`` documents stored as ``{path: column}``."""
+
+    def __init__(self, columns=None, n=None):
+        self.columns = {}
+        self.sparse = set()
+        if n is None:
+            n = len(next(iter(columns.values()))) if columns else 0
+        self.n = n
+        for key, column in (columns or {}).items():
+            self._add((key,), column)
+
+    def __len__(self):
+        return self.n
+
+    def _add(self, path, column):
+        if isinstance(column, ColumnBatch):
+            for sub_path, sub_column in column.columns.items():
+                self.columns[path + sub_path] = sub_column
+                if sub_path in column.sparse:
+                    self.sparse.add(path + sub_path)
+        else:
+            self.columns[path] = column
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def fill(self, idx, columns):
+        """Set ``columns`` for the rows in ``idx`` only, leaving other rows MISSING."""
+        if not len(idx):
+            return
+        for key, column in columns.items():
+            if isinstance(column, ColumnBatch):
+                self.fill(idx, {(key,) + p: c for p, c in column.columns.items()})
+                continue
+            path = key if isinstance(key, tuple) else (key,)
+            target = self.columns.get(path)
+            if target is None:
+                target = [MISSING] * self.n
+                self.columns[path] = target
+                self.sparse.add(path)
+            elif isinstance(target, np.ndarray):
+                target = self.columns[path] = target.tolist()
+            for i, value in zip(idx, _as_list(column)):
+                target[i] = value
+
+    @classmethod
+    def from_rows(cls, rows, paths=()):
+        """Build a batch from document dicts (fields absent from a row become MISSING).
+
+        ``paths`` (e.g. ``Schema.paths``) pre-allocates a fixed column layout;
+        fields outside it are still collected, after the given ones.
+        """
+        batch = cls(n=len(rows))
+        for path in paths:
+            batch.columns[path] = [MISSING] * batch.n
+        for i, row in enumerate(rows):
+            for path, value in _walk(row, ()):
+                column = batch.columns.get(path)
+                if column is None:
+                    column = batch.columns[path] = [MISSING] * batch.n
+                column[i] = value
+        for path, column in batch.columns.items():
+            if MISSING in column:
+                batch.sparse.add(path)
+        return batch
+
+    # ------------------------------------------------------------------
+    # Consuming
+    # ------------------------------------------------------------------
+
+    def names(self):
+        """Flat (dotted) field names, in column order."""
+        return [".".join(path) for path in self.columns]
+
+    def to_rows(self):
+        """Materialise one nested dict per document, fields in column order."""
+        rows = [{} for _ in range(self.n)]
+        run_keys, run_columns = [], []
+
+        def flush():
+            if run_keys:
+                for row, values in zip(rows, zip(*run_columns)):
+                    row.update(zip(run_keys, values))
+                run_keys.clear()
+                run_columns.clear()
+
+        for path, column in self.columns.items():
+            values = _as_list(column)
+            if len(path) == 1 and path not in self.sparse:
+                run_keys.append(path[0])
+                run_columns.append(values)
+                continue
+            flush()
+            parents, leaf = path[:-1], path[-1]
+            for row, value in zip(rows, values):
+                if value is MISSING:
+                    continue
+                target = row
+                for key in parents:
+                    target = target.setdefault(key, {})
+                target[leaf] = value
+        flush()
+        return rows
+
+    def select(self, paths, missing=""):
+        """Columns for ``paths`` (e.g. ``Schema.paths``) as lists, in that order.
+
+        Absent values, and whole columns the batch does not have, come out as
+        ``missing``. Unlike flat_columns() nothing is scanned or expanded, so
+        this is the fast way to feed a fixed layout such as a CSV row.
+        """
+        blank = None
+        selected = []
+        for path in paths:
+            column = self.columns.get(path)
+            if column is None:
+                if blank is None:
+                    blank = [missing] * self.n
+                selected.append(blank)
+                continue
+            column = _as_list(column)
+            if path in self.sparse:
+                column = [missing if v is MISSING else v for v in column]
+            selected.append(column)
+        return selected
+
+    def flat_columns(self):
+        """``{dotted_name: list}`` with nested dicts expanded and lists JSON-encoded.
+
+        Rows without a field hold MISSING, as in the batch itself.
+        """
+        flat = {}
+        for path, column in self.columns.items():
+            values = _as_list(column)
+            name = ".".join(path)
+            if any(isinstance(v, (dict, list)) for v in values):
+                for i, value in enumerate(values):
+                    for sub_path, sub_value in _walk(value, ()) if isinstance(value, dict) \
+                            else [((), value)]:
+                        sub_name = ".".join((name,) + sub_path)
+                        target = flat.get(sub_name)
+                        if target is None:
+                            target = flat[sub_name] = [MISSING] * self.n
+                        target[i] = json.dumps(sub_value) if isinstance(sub_value, list) \
+                            else sub_value
+            else:
+                flat[name] = values
+        return flat
+
+    def to_arrays(self):
+        """``{dotted_name: numpy.ndarray}``; sparse or mixed columns become object arrays."""
+        arrays = {}
+        for name, values in self.flat_columns().items():
+            if isinstance(values, np.ndarray):
+                arrays[name] = values
+                continue
+            if any(v is MISSING for v in values):
+                values = [None if v is MISSING else v for v in values]
+                arrays[name] = np.array(values, dtype=object)
+            else:
+                try:
+                    arrays[name] = np.asarray(values)
+                except (TypeError, ValueError):
+                    arrays[name] = np.array(values, dtype=object)
+        return arrays
+
+    def to_arrow(self):
+        """Return a ``pyarrow.RecordBatch`` with one column per dotted field name.
+
+        Requires the optional ``pyarrow`` package.
+        """
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("Arrow output requires pyarrow (pip install pyarrow)") from e
+        names, arrays = [], []
+        for name, values in self.flat_columns().items():
+            names.append(name)
+            arrays.append(pa.array([None if v is MISSING else v for v in values]))
+        return pa.RecordBatch.from_arrays(arrays, names=names)
+
+
+def _walk(value, prefix):
+    """Yield ``(path, leaf)`` pairs for a nested dict."""
+    for key, sub in value.items():
+        path = prefix + (key,)
+        if isinstance(sub, dict):
+            yield from _walk(sub, path)
+        else:
+            yield path, sub
@@ -0,0 +1,111 @@
+"""Pooled, keep-alive HTTP sessions shared by every Elasticsearch and Kibana call.
+
+A plain ``requests.post`` opens a new TCP (and TLS) connection per call. One
+``requests.Session`` per cluster and credentials instead keeps a pool of
+open connections, so bulk requests, index setup, Kibana imports and the
+streaming thread all reuse them, across chunks and across jobs. Sessions are
+created on first use and cached for the life of the process.
+
+Settings come from the ``http`` section of the config:
+
+    ==============  =======  ==================================================
+    key             default  meaning
+    ==============  =======  ==================================================
+    pool_maxsize    10       connections kept open per host
+    timeout         60       seconds, for requests that do not pass their own
+    keep_alive      true     false sends ``Connection: close`` on every request
+    verify_certs    true     verify TLS certificates
+    ca_certs        null     CA bundle (PEM path) for self-signed clusters
+    ==============  =======  ==================================================
+"""
+
+import ssl
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_HTTP = {
+    "pool_maxsize": 10,
+    "timeout": 60,
+    "keep_alive": True,
+    "verify_certs": True,
+    "ca_certs": None,
+}
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def http_options(config):
+    """The ``http`` config section with defaults filled in."""
+    return {**DEFAULT_HTTP, **((config or {}).get("http") or {})}
+
+
+def tls_verify(options):
+    """``requests``' ``verify`` value: False, True, or a CA bundle path."""
+    if not options["verify_certs"]:
+        return False
+    return options["ca_certs"] or True
+
+
+def ssl_context(options):
+    """An SSLContext for these options, for the clients that do not use ``requests``."""
+    context = ssl.create_default_context(cafile=options["ca_certs"])
+    if not options["verify_certs"]:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+class Session(requests.Session):
+    """A requests.Session with a default timeout and a sized connection pool."""
+
+    def __init__(self, username=None, password=None, options=None):
+        super().__init__()
+        options = {**DEFAULT_HTTP, **(options or {})}
+        self.timeout = options["timeout"]
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=int(options["pool_maxsize"]))
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+        self.verify = tls_verify(options)
+        if username:
+            self.auth = (username, password)
+        if not options["keep_alive"]:
+            self.headers["Connection"] = "close"
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def get_session(host, username=None, password=None, options=None):
+    """The shared session for ``host`` with these credentials and ``http`` options."""
+    options = {**DEFAULT_HTTP, **(options or {})}
+    key = (host, username, password, tuple(sorted(options.items())))
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _sessions[key] = Session(username, password, options)
+        return session
+
+
+def es_session(config):
+    """The shared session for the configured Elasticsearch cluster."""
+    es = config["elasticsearch"]
+    return get_session(es["host"], es.get("username"), es.get("password"), http_options(config))
+
+
+def kibana_session(config):
+    """The shared session for the configured Kibana."""
+    kb = config["kibana"]
+    return get_session(kb["host"], kb.get("username"), kb.get("password"), http_options(config))
+
+
+def close_sessions():
+    """Close every pooled connection (e.g. after the settings change)."""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
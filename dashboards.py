@@ -13,7 +13,7 @@ import os
 import tempfile
 import uuid
 
-import requests
+from connections import kibana_session
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -622,8 +622,6 @@ def create_kibana_dashboard(data_type: str, index_name: str, config: dict) -> No
         return
 
     kibana_host = config["kibana"]["host"]
-    kibana_user = config["kibana"]["username"]
-    kibana_pass = config["kibana"]["password"]
 
     with tempfile.NamedTemporaryFile(mode="w", suffix=".ndjson", delete=False,
                                      encoding="utf-8") as fh:
@@ -632,9 +630,8 @@ def create_kibana_dashboard(data_type: str, index_name: str, config: dict) -> No
 
     try:
         with open(tmp, "rb") as fh:
-            resp = requests.post(
+            resp = kibana_session(config).post(
                 f"{kibana_host}/api/saved_objects/_import?overwrite=true",
-                auth=(kibana_user, kibana_pass),
                 headers={"kbn-xsrf": "true"},
                 files={"file": ("dashboard.ndjson", fh, "application/ndjson")},
                 timeout=30,
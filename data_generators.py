@@ -1,33 +1,172 @@
-import random
 import datetime
-from faker import Faker
+import numpy as np
 
-fake = Faker()
+from columns import ColumnBatch
+from ids import IdFactory
+from message_templates import MessageTemplate, compile_templates
+from pools import POOLS
+from sampling import WeightedChoice
+from schemas import Schema
+from seeding import python_random, seed_int, seed_sequence
+from timestamps import ascending_quantiles, format_ms, format_ms_batch, to_epoch_ms
 
 class DataTypeGenerator:
-    """Base class for all data type generators"""
+    """Base class for all data type generators.
 
-    def __init__(self, start_date=None, end_date=None):
+    ``seed`` (an int or ``numpy.random.SeedSequence``) makes output
+    reproducible; ``None`` draws fresh entropy. All randomness goes through
+    ``self.rng`` (NumPy), ``self.random`` (a private ``random.Random``), the ID
+    factory fed from ``self.rng`` and — when seeded — seeded Faker pools.
+
+    ``weights`` overrides the built-in weighted distributions by name, e.g.
+    ``{"log.level": {"ERROR": 0.3}}`` (see _weighted()).
+
+    With ``ordered=True`` generate_columns()/generate_batch() return entries
+    in ascending time order. Each call covers ``time_slice``, a (lo, hi)
+    range of quantiles of the timestamp distribution; a sharded job gives
+    shard k the slice holding its share of the entries, so consecutive
+    shards continue where the previous one stopped and the whole job comes
+    out ordered without ever being sorted.
+
+    Subclasses declare every field they can emit, with its Elasticsearch
+    type, in ``SCHEMA``.
+    """
+
+    SCHEMA = Schema([("@timestamp", "date")])
+
+    def __init__(self, start_date=None, end_date=None, seed=None, ordered=False, weights=None):
         self.end_date = end_date or datetime.datetime.now()
         self.start_date = start_date or (self.end_date - datetime.timedelta(days=365))
+        self.start_ms = to_epoch_ms(self.start_date)
+        self.end_ms = to_epoch_ms(self.end_date)
+        self.seed = seed_sequence(seed)
+        # Pools are shared by every stream spawned from the same root seed
+        self.pool_seed = None if seed is None else seed_int(self.seed.entropy, "pools")
+        self.ordered = ordered
+        self.time_slice = (0.0, 1.0)
+        self.weight_overrides = weights or {}
+        self.reseed(self.seed)
+
+    def reseed(self, seq, pool_epoch=0):
+        """Restart every random stream from SeedSequence ``seq``.
+
+        Sharded jobs call this at the start of each shard, so a shard's output
+        depends only on its own sequence and not on what ran before it.
+        """
+        self.rng = np.random.default_rng(seq)
+        self.random = python_random(seq)
+        self.ids = IdFactory(self.rng.bytes)
+        self.pool_epoch = pool_epoch
 
     def random_timestamp(self, start=None, end=None):
         start = start or self.start_date
         end = end or self.end_date
-        return start + datetime.timedelta(seconds=random.randint(0, int((end - start).total_seconds())))
+        return start + datetime.timedelta(seconds=self.random.randint(0, int((end - start).total_seconds())))
+
+    def random_epoch_ms(self, start_ms=None, end_ms=None):
+        """Like random_timestamp(), but as integer epoch milliseconds."""
+        start_ms = self.start_ms if start_ms is None else start_ms
+        end_ms = self.end_ms if end_ms is None else end_ms
+        return start_ms + self.random.randint(0, max(0, end_ms - start_ms) // 1000) * 1000
+
+    def generate_entry(self):
+        raise NotImplementedError
+
+    def generate_batch(self, n):
+        """Return a list of ``n`` entries."""
+        return self.generate_columns(n).to_rows()
+
+    def generate_columns(self, n):
+        """Return ``n`` entries as a ColumnBatch.
+
+        Subclasses override this to draw each field for the whole batch with a
+        single NumPy operation; the fallback simply loops over generate_entry().
+        """
+        return ColumnBatch.from_rows([self.generate_entry() for _ in range(n)], self.SCHEMA.paths)
+
+    # ------------------------------------------------------------------
+    # Vectorised helpers for generate_columns()
+    # ------------------------------------------------------------------
+
+    def _batch_epoch_ms(self, n):
+        """int64 array of ``n`` epoch-ms timestamps, whole-second offsets into the range.
+
+        In ordered mode they ascend through the current ``time_slice``.
+        """
+        if self.ordered:
+            return self._quantile_ms(ascending_quantiles(self.rng, n, *self.time_slice))
+        span = max(0, self.end_ms - self.start_ms) // 1000
+        return self.start_ms + self.rng.integers(0, span, n, endpoint=True) * 1000
+
+    def _quantile_ms(self, q):
+        """Map quantiles of the timestamp distribution to epoch ms (non-decreasing in ``q``)."""
+        span = max(0, self.end_ms - self.start_ms) // 1000
+        return self.start_ms + np.minimum(q * (span + 1), span).astype(np.int64) * 1000
+
+    def _batch_choice(self, options, n):
+        return [options[i] for i in self.rng.integers(0, len(options), n).tolist()]
+
+    def _weighted(self, name, options, weights):
+        """Build the WeightedChoice for distribution ``name``, applying config overrides."""
+        dist = WeightedChoice(options, weights)
+        if name in self.weight_overrides:
+            dist = dist.reweighted(self.weight_overrides[name])
+        return dist
+
+    def _batch_pick(self, option_lists):
+        """Pick one element uniformly from each list (one list per row)."""
+        u = self.rng.random(len(option_lists)).tolist()
+        return [opts[int(x * len(opts))] for opts, x in zip(option_lists, u)]
+
+    def _batch_randint(self, low, high, n):
+        """Inclusive integer range, like self.random.randint(low, high)."""
+        return self.rng.integers(low, high, n, endpoint=True).tolist()
+
+    def _batch_uniform(self, low, high, n, ndigits=3):
+        return np.round(self.rng.uniform(low, high, n), ndigits).tolist()
+
+    def _batch_versions(self, major_max, n):
+        majors = self._batch_randint(1, major_max, n)
+        minors = self._batch_randint(0, 9, n)
+        patches = self._batch_randint(0, 9, n)
+        return [f"{a}.{b}.{c}" for a, b, c in zip(majors, minors, patches)]
+
+    def _pool(self, provider):
+        """Draw one value from the Faker pool for ``provider``."""
+        return POOLS.draw(provider, self.random, self.pool_seed, self.pool_epoch)
+
+    def _batch_pool(self, provider, n):
+        """Draw ``n`` values from the Faker pool for ``provider``."""
+        return POOLS.draw_batch(provider, n, self.rng, self.pool_seed, self.pool_epoch)
 
 class UnstructuredLogsGenerator(DataTypeGenerator):
     """Original unstructured logs generator"""
 
-    def __init__(self, start_date=None, end_date=None):
-        super().__init__(start_date=start_date, end_date=end_date)
+    SCHEMA = Schema([
+        ("@timestamp", "date"),
+        ("log.level", "keyword"),
+        ("source", "keyword"),
+        ("message", "text"),
+    ])
+
+    def __init__(self, start_date=None, end_date=None, seed=None, ordered=False, weights=None):
+        super().__init__(start_date=start_date, end_date=end_date, seed=seed, ordered=ordered,
+                         weights=weights)
         total_secs = max(1, int((self.end_date - self.start_date).total_seconds()))
         n_spikes = min(12, max(1, total_secs // 3600))
-        self.error_spike_dates = [
-            self.start_date + datetime.timedelta(seconds=int(total_secs * i / (n_spikes + 1)))
+        self.error_spike_ms = [
+            self.start_ms + int(total_secs * i / (n_spikes + 1)) * 1000
             for i in range(1, n_spikes + 1)
         ]
+        # Ordered mode samples the same 90% uniform / 10% spike-hour mixture
+        # through its inverse CDF, which is piecewise linear between these points
+        spikes = np.array(self.error_spike_ms, dtype=np.int64)
+        points = np.unique(np.concatenate(([self.start_ms, self.end_ms], spikes, spikes + 3_600_000)))
+        uniform = np.clip((points - self.start_ms) / max(1, self.end_ms - self.start_ms), 0, 1)
+        in_spike = np.clip((points[:, None] - spikes) / 3_600_000, 0, 1).mean(axis=1)
+        self._spike_cdf = (0.9 * uniform + 0.1 * in_spike, points)
         self.log_levels = ["INFO", "WARN", "ERROR", "DEBUG"]
+        self.level_dist = self._weighted("log.level", self.log_levels, [0.7, 0.1, 0.1, 0.1])
         self.sources = ["AuthService", "PaymentService", "DatabaseService", "NotificationService", "CacheService"]
         self.messages = {
             "AuthService": {
@@ -66,77 +205,192 @@ class UnstructuredLogsGenerator(DataTypeGenerator):
                 ]
             }
         }
+        self.gateway_responses = ["SUCCESS", "TIMEOUT", "INVALID_CARD", "NETWORK_ERROR"]
+
+        # Placeholder producers: only the fields a template references are generated
+        self.placeholders = {
+            "user": lambda: self._pool("user_name"),
+            "ip_address": lambda: self._pool("ipv4"),
+            "session_id": lambda: self.ids.uuid4(),
+            "transaction_id": lambda: self.ids.uuid4(),
+            "order_id": lambda: self.random.randint(100000, 999999),
+            "amount": lambda: self.random.randint(10, 5000),
+            "latency": lambda: self.random.randint(100, 2000),
+            "gateway_response": lambda: self.random.choice(self.gateway_responses),
+        }
+        self.batch_placeholders = {
+            "user": lambda n: self._batch_pool("user_name", n),
+            "ip_address": lambda n: self._batch_pool("ipv4", n),
+            "session_id": lambda n: self.ids.batch("uuid4", n),
+            "transaction_id": lambda n: self.ids.batch("uuid4", n),
+            "order_id": lambda n: self._batch_randint(100000, 999999, n),
+            "amount": lambda n: self._batch_randint(10, 5000, n),
+            "latency": lambda n: self._batch_randint(100, 2000, n),
+            "gateway_response": lambda n: self._batch_choice(self.gateway_responses, n),
+        }
+        self.generic_templates = [MessageTemplate("Generic log message")]
+        self.templates = compile_templates(self.messages)
+        incomplete = MessageTemplate("Incomplete log message.")
+        for by_level in self.templates.values():
+            for level, compiled in by_level.items():
+                by_level[level] = [
+                    incomplete if t.missing(self.placeholders) else t for t in compiled
+                ]
+
+    def _templates_for(self, source, level):
+        return self.templates.get(source, {}).get(level, self.generic_templates)
     
     def generate_entry(self):
-        if random.random() < 0.10:
-            timestamp = random.choice(self.error_spike_dates) + datetime.timedelta(seconds=random.randint(0, 3600))
+        if self.random.random() < 0.10:
+            timestamp = self.random.choice(self.error_spike_ms) + self.random.randint(0, 3600) * 1000
             level = "ERROR"
         else:
-            timestamp = self.random_timestamp()
-            level = random.choices(self.log_levels, weights=[0.7, 0.1, 0.1, 0.1])[0]
-        
-        source = random.choice(self.sources)
-        tmpl_list = self.messages.get(source, {}).get(level, ["Generic log message"])
-        tmpl = random.choice(tmpl_list)
-        
-        msg_data = {
-            "user": fake.user_name(),
-            "ip_address": fake.ipv4(),
-            "session_id": fake.uuid4(),
-            "transaction_id": fake.uuid4(),
-            "order_id": fake.random_int(min=100000, max=999999),
-            "amount": fake.random_int(min=10, max=5000),
-            "latency": fake.random_int(min=100, max=2000),
-            "gateway_response": random.choice(["SUCCESS", "TIMEOUT", "INVALID_CARD", "NETWORK_ERROR"])
-        }
+            timestamp = self.random_epoch_ms()
+            level = self.level_dist.draw(self.random)
         
-        try:
-            message = tmpl.format(**msg_data)
-        except KeyError:
-            message = "Incomplete log message."
+        source = self.random.choice(self.sources)
+        tmpl = self.random.choice(self._templates_for(source, level))
+        message = tmpl.render_with(self.placeholders)
         
         return {
-            "@timestamp": timestamp.isoformat() + "Z",
+            "@timestamp": format_ms(timestamp),
             "log.level": level,
             "source": source,
             "message": message
         }
 
+    def _quantile_ms(self, q):
+        cdf, points = self._spike_cdf
+        ms = np.interp(q, cdf, points)
+        return self.start_ms + ((ms - self.start_ms) // 1000).astype(np.int64) * 1000
+
+    def _spike_share(self, timestamps):
+        """Probability that an entry at each timestamp came from an error spike."""
+        spikes = np.array(self.error_spike_ms, dtype=np.int64)
+        t = timestamps[:, None]
+        covering = ((t >= spikes) & (t <= spikes + 3_600_000)).sum(axis=1)
+        spike_density = 0.1 * covering / (len(spikes) * 3_600_000)
+        in_range = (timestamps >= self.start_ms) & (timestamps <= self.end_ms)
+        uniform_density = np.where(in_range, 0.9 / max(1, self.end_ms - self.start_ms), 0.0)
+        return spike_density / (spike_density + uniform_density)
+
+    def generate_columns(self, n):
+        rng = self.rng
+        if self.ordered:
+            timestamps = self._batch_epoch_ms(n)
+            spike_idx = np.flatnonzero(rng.random(n) < self._spike_share(timestamps))
+        else:
+            spike = rng.random(n) < 0.10
+            spike_idx = np.flatnonzero(spike)
+
+            timestamps = self._batch_epoch_ms(n)
+            if len(spike_idx):
+                spike_ms = np.array(self.error_spike_ms, dtype=np.int64)
+                picks = spike_ms[rng.integers(0, len(spike_ms), len(spike_idx))]
+                timestamps[spike_idx] = picks + rng.integers(0, 3600, len(spike_idx), endpoint=True) * 1000
+
+        levels = self.level_dist.draw_batch(self.rng, n)
+        for i in spike_idx.tolist():
+            levels[i] = "ERROR"
+        sources = self._batch_choice(self.sources, n)
+        templates = self._batch_pick([
+            self._templates_for(source, level) for source, level in zip(sources, levels)
+        ])
+
+        # Render each template once per group so every placeholder is one column draw
+        by_template = {}
+        for i, tmpl in enumerate(templates):
+            by_template.setdefault(tmpl, []).append(i)
+        messages = [None] * n
+        for tmpl, idx in by_template.items():
+            for i, message in zip(idx, tmpl.render_batch(self.batch_placeholders, len(idx))):
+                messages[i] = message
+
+        return ColumnBatch({
+            "@timestamp": format_ms_batch(timestamps),
+            "log.level": levels,
+            "source": sources,
+            "message": messages,
+        })
+
 class StructuredLogsGenerator(DataTypeGenerator):
     """JSON structured logs with consistent fields"""
+
+    SCHEMA = Schema([
+        ("@timestamp", "date"),
+        ("service.name", "keyword"),
+        ("service.version", "keyword"),
+        ("log.level", "keyword"),
+        ("environment", "keyword"),
+        ("host.name", "keyword"),
+        ("process.pid", "integer"),
+        ("trace.id", "keyword"),
+        ("span.id", "keyword"),
+        ("user.id", "keyword"),
+        ("request.id", "keyword"),
+        ("http.method", "keyword"),
+        ("http.status_code", "integer"),
+        ("http.response_time_ms", "integer"),
+        ("message", "text"),
+    ])
     
-    def __init__(self, start_date=None, end_date=None):
-        super().__init__(start_date=start_date, end_date=end_date)
+    def __init__(self, start_date=None, end_date=None, seed=None, ordered=False, weights=None):
+        super().__init__(start_date=start_date, end_date=end_date, seed=seed, ordered=ordered,
+                         weights=weights)
         self.services = ["user-api", "order-service", "inventory-service", "notification-service", "analytics-service"]
         self.environments = ["production", "staging", "development"]
         self.log_levels = ["INFO", "WARN", "ERROR", "DEBUG"]
+        self.level_dist = self._weighted("log.level", self.log_levels, [0.6, 0.2, 0.1, 0.1])
+        self.status_dist = self._weighted("http.status_code",
+                                          [200, 201, 400, 401, 403, 404, 500, 502, 503],
+                                          [40, 10, 8, 5, 3, 8, 10, 5, 5])
     
     def generate_entry(self):
-        service = random.choice(self.services)
-        timestamp = self.random_timestamp()
-        level = random.choices(self.log_levels, weights=[0.6, 0.2, 0.1, 0.1])[0]
+        service = self.random.choice(self.services)
+        timestamp = self.random_epoch_ms()
+        level = self.level_dist.draw(self.random)
         
         base_entry = {
-            "@timestamp": timestamp.isoformat() + "Z",
+            "@timestamp": format_ms(timestamp),
             "service.name": service,
-            "service.version": f"{fake.random_int(1, 5)}.{fake.random_int(0, 9)}.{fake.random_int(0, 9)}",
+            "service.version": f"{self.random.randint(1, 5)}.{self.random.randint(0, 9)}.{self.random.randint(0, 9)}",
             "log.level": level,
-            "environment": random.choice(self.environments),
-            "host.name": fake.hostname(),
-            "process.pid": fake.random_int(1000, 99999),
-            "trace.id": fake.uuid4(),
-            "span.id": fake.uuid4()[:16],
-            "user.id": fake.uuid4(),
-            "request.id": fake.uuid4(),
-            "http.method": random.choice(["GET", "POST", "PUT", "DELETE", "PATCH"]),
-            "http.status_code": random.choices([200, 201, 400, 401, 403, 404, 500, 502, 503], 
-                                             weights=[40, 10, 8, 5, 3, 8, 10, 5, 5])[0],
-            "http.response_time_ms": fake.random_int(10, 2000),
+            "environment": self.random.choice(self.environments),
+            "host.name": self._pool("hostname"),
+            "process.pid": self.random.randint(1000, 99999),
+            "trace.id": self.ids.trace_id(),
+            "span.id": self.ids.span_id(),
+            "user.id": self.ids.uuid4(),
+            "request.id": self.ids.uuid4(),
+            "http.method": self.random.choice(["GET", "POST", "PUT", "DELETE", "PATCH"]),
+            "http.status_code": self.status_dist.draw(self.random),
+            "http.response_time_ms": self.random.randint(10, 2000),
             "message": self._generate_message(service, level)
         }
         
         return base_entry
-    
+
+    def generate_columns(self, n):
+        services = self._batch_choice(self.services, n)
+        levels = self.level_dist.draw_batch(self.rng, n)
+        return ColumnBatch({
+            "@timestamp": format_ms_batch(self._batch_epoch_ms(n)),
+            "service.name": services,
+            "service.version": self._batch_versions(5, n),
+            "log.level": levels,
+            "environment": self._batch_choice(self.environments, n),
+            "host.name": self._batch_pool("hostname", n),
+            "process.pid": self._batch_randint(1000, 99999, n),
+            "trace.id": self.ids.batch("trace", n),
+            "span.id": self.ids.batch("span", n),
+            "user.id": self.ids.batch("uuid4", n),
+            "request.id": self.ids.batch("uuid4", n),
+            "http.method": self._batch_choice(["GET", "POST", "PUT", "DELETE", "PATCH"], n),
+            "http.status_code": self.status_dist.draw_batch(self.rng, n),
+            "http.response_time_ms": self._batch_randint(10, 2000, n),
+            "message": [self._generate_message(s, l) for s, l in zip(services, levels)],
+        })
+
     def _generate_message(self, service, level):
         messages = {
             "user-api": {
@@ -154,13 +408,47 @@ class StructuredLogsGenerator(DataTypeGenerator):
         }
         
         service_messages = messages.get(service, {"INFO": ["Generic info message"], "WARN": ["Generic warning"], "ERROR": ["Generic error"], "DEBUG": ["Generic debug"]})
-        return random.choice(service_messages.get(level, ["Generic message"]))
+        return self.random.choice(service_messages.get(level, ["Generic message"]))
 
 class DistributedTracesGenerator(DataTypeGenerator):
-    """OpenTelemetry-style distributed tracing data"""
+    """OpenTelemetry-style distributed tracing data.
+
+    By default every entry is one span sampled from its own 3-9 span trace.
+    With ``full_traces=True`` every span of each trace is emitted (parents
+    before children), spans count towards the entry total, and child spans
+    nest inside their parent's time range, so trace waterfalls join up.
+    """
+
+    SCHEMA = Schema([
+        ("@timestamp", "date"),
+        ("trace.id", "keyword"),
+        ("span.id", "keyword"),
+        ("span.parent_id", "keyword"),
+        ("span.name", "keyword"),
+        ("service.name", "keyword"),
+        ("operation.name", "keyword"),
+        ("span.kind", "keyword"),
+        ("span.status", "keyword"),
+        ("duration.ms", "integer"),
+        ("span.start_time", "date"),
+        ("span.end_time", "date"),
+        (("resource.attributes", "service.version"), "keyword"),
+        (("resource.attributes", "deployment.environment"), "keyword"),
+        (("resource.attributes", "host.name"), "keyword"),
+        ("payment.amount", "integer"),
+        ("payment.currency", "keyword"),
+        ("order.id", "keyword"),
+        ("order.total", "integer"),
+        ("user.id", "keyword"),
+        ("user.email", "keyword"),
+    ])
     
-    def __init__(self, start_date=None, end_date=None):
-        super().__init__(start_date=start_date, end_date=end_date)
+    def __init__(self, start_date=None, end_date=None, seed=None, full_traces=False,
+                 ordered=False, weights=None):
+        super().__init__(start_date=start_date, end_date=end_date, seed=seed, ordered=ordered,
+                         weights=weights)
+        self.full_traces = full_traces
+        self.status_dist = self._weighted("span.status", ["OK", "ERROR", "TIMEOUT"], [85, 10, 5])
         self.services = ["frontend", "user-service", "order-service", "payment-service", "inventory-service", "notification-service"]
         self.operations = {
             "frontend": ["page_load", "user_click", "form_submit", "api_call"],
@@ -170,50 +458,218 @@ class DistributedTracesGenerator(DataTypeGenerator):
             "inventory-service": ["check_stock", "reserve_items", "update_inventory", "release_reservation"],
             "notification-service": ["send_email", "send_sms", "send_push", "log_notification"]
         }
+
+    def reseed(self, seq, pool_epoch=0):
+        super().reseed(seq, pool_epoch)
+        self._pending = []  # spans of the current trace not yet returned by generate_entry()
     
     def generate_entry(self):
-        trace_id = fake.uuid4()
-        root_span = self._generate_span(trace_id, None, "frontend", "page_load", is_root=True)
+        if self.full_traces:
+            if not self._pending:
+                self._pending = self.generate_trace()[::-1]
+            return self._pending.pop()
+
+        trace_id = self.ids.trace_id()
+        root_start = self.random_epoch_ms()
+        root_span = self._generate_span(trace_id, None, "frontend", "page_load",
+                                        root_start, self.random.randint(100, 5000), is_root=True)
         
         # Generate child spans
-        spans = [root_span]
-        for _ in range(random.randint(2, 8)):
-            parent_span = random.choice(spans)
-            service = random.choice(self.services[1:])  # Skip frontend for child spans
-            operation = random.choice(self.operations[service])
-            child_span = self._generate_span(trace_id, parent_span["span.id"], service, operation,
-                                              parent_start=parent_span["@timestamp"])
-            spans.append(child_span)
-        
-        return random.choice(spans)  # Return one span from the trace
-    
-    def _generate_span(self, trace_id, parent_span_id, service, operation, is_root=False, parent_start=None):
-        if parent_start and not is_root:
-            # Parse ISO string back to datetime so child starts after parent
-            if isinstance(parent_start, str):
-                parent_start = datetime.datetime.fromisoformat(parent_start.rstrip('Z'))
-            start_time = self.random_timestamp(start=parent_start)
-        else:
-            start_time = self.random_timestamp()
-        duration_ms = fake.random_int(1, 1000) if not is_root else fake.random_int(100, 5000)
-        end_time = start_time + datetime.timedelta(milliseconds=duration_ms)
+        spans = [(root_span, root_start)]
+        for _ in range(self.random.randint(2, 8)):
+            parent_span, parent_start = self.random.choice(spans)
+            service = self.random.choice(self.services[1:])  # Skip frontend for child spans
+            operation = self.random.choice(self.operations[service])
+            start_ms = self.random_epoch_ms(start_ms=parent_start)
+            spans.append((self._generate_span(trace_id, parent_span["span.id"], service, operation,
+                                              start_ms, self.random.randint(1, 1000)), start_ms))
+        
+        return self.random.choice(spans)[0]  # Return one span from the trace
+
+    def generate_trace(self):
+        """Return every span of one new 3-9 span trace, parents before children."""
+        trace_id = self.ids.trace_id()
+        start_ms = self.random_epoch_ms()
+        duration_ms = self.random.randint(100, 5000)
+        spans = [self._generate_span(trace_id, None, "frontend", "page_load",
+                                     start_ms, duration_ms, is_root=True)]
+        timing = [(start_ms, duration_ms)]
+        for position in range(1, self.random.randint(3, 9)):
+            parent = self.random.randrange(position)
+            parent_start, parent_duration = timing[parent]
+            offset = self.random.randrange(parent_duration)
+            start_ms = parent_start + offset
+            duration_ms = min(self.random.randint(1, 1000), parent_duration - offset)
+            service = self.random.choice(self.services[1:])
+            operation = self.random.choice(self.operations[service])
+            spans.append(self._generate_span(trace_id, spans[parent]["span.id"], service, operation,
+                                             start_ms, duration_ms))
+            timing.append((start_ms, duration_ms))
+        return spans
+
+    def generate_columns(self, n):
+        if n <= 0:
+            return ColumnBatch(n=0)
+        if self.full_traces:
+            return self._batch_full_traces(n)
+
+        # Same distribution as generate_entry(): each row is a uniformly chosen
+        # span of a 3-9 span trace. Instead of building the whole trace, pick the
+        # span's position, walk its random-recursive-tree ancestry to get its
+        # depth, and apply one "start after parent" step per ancestor. Ordered
+        # mode skips the steps (they would reorder rows) and uses the ordered
+        # timestamps as span starts.
+        rng = self.rng
+        trace_len = rng.integers(3, 9, n, endpoint=True)
+        position = np.floor(rng.random(n) * trace_len).astype(np.int64)
+        is_root = position == 0
+
+        depth = np.zeros(n, dtype=np.int64)
+        cur = position.copy()
+        while True:
+            active = cur > 0
+            if not active.any():
+                break
+            cur[active] = np.floor(rng.random(int(active.sum())) * cur[active]).astype(np.int64)
+            depth[active] += 1
+
+        start = self._batch_epoch_ms(n)
+        if not self.ordered:
+            for step in range(1, int(depth.max(initial=0)) + 1):
+                idx = np.flatnonzero(depth >= step)
+                remaining = np.maximum(self.end_ms - start[idx], 0) // 1000
+                start[idx] += rng.integers(0, remaining, endpoint=True) * 1000
+
+        duration_ms = np.where(is_root, rng.integers(100, 5000, n, endpoint=True),
+                               rng.integers(1, 1000, n, endpoint=True))
+        child_idx = np.flatnonzero(~is_root)
+        return self._batch_spans(n, is_root, start, duration_ms,
+                                 trace_ids=self.ids.batch("trace", n),
+                                 span_ids=self.ids.batch("span", n),
+                                 parent_ids=self.ids.batch("span", len(child_idx)))
+
+    def _batch_full_traces(self, n):
+        """Whole traces of 3-9 spans, exactly ``n`` spans in all.
+
+        The last trace is sized to what is left of the batch (its neighbour gives
+        or takes spans to keep both within 3-9), so no trace is cut short at a
+        shard boundary; only a batch of fewer than 3 spans holds a smaller one.
+        Spans are laid out trace by trace in creation order, so a span's parent
+        always precedes it. Timing is
+        computed one tree level (position) at a time across all traces. In
+        ordered mode traces follow each other by root start time, and each
+        trace's spans stay together behind their root.
+        """
+        rng = self.rng
+        sizes = rng.integers(3, 9, n // 3 + 1, endpoint=True)
+        ends = np.cumsum(sizes)
+        n_traces = int(np.searchsorted(ends, n)) + 1
+        sizes = sizes[:n_traces]
+        sizes[-1] -= ends[n_traces - 1] - n
+        if n_traces > 1 and sizes[-1] < 3:
+            if sizes[-2] + sizes[-1] <= 9:
+                sizes[-2] += sizes[-1]
+                n_traces -= 1
+                sizes = sizes[:n_traces]
+            else:
+                sizes[-2] -= 3 - sizes[-1]
+                sizes[-1] = 3
+
+        first = np.repeat(np.cumsum(sizes) - sizes, sizes)  # row of each span's root
+        position = np.arange(n) - first
+        parent = first + np.floor(rng.random(n) * position).astype(np.int64)
+        is_root = position == 0
+
+        start = np.empty(n, dtype=np.int64)
+        duration_ms = np.empty(n, dtype=np.int64)
+        start[is_root] = self._batch_epoch_ms(n_traces)
+        duration_ms[is_root] = rng.integers(100, 5000, n_traces, endpoint=True)
+        for level in range(1, int(sizes.max())):
+            idx = np.flatnonzero(position == level)
+            p = parent[idx]
+            offset = np.floor(rng.random(len(idx)) * duration_ms[p]).astype(np.int64)
+            start[idx] = start[p] + offset
+            duration_ms[idx] = np.minimum(rng.integers(1, 1000, len(idx), endpoint=True),
+                                          duration_ms[p] - offset)
+
+        trace_ids = self.ids.batch("trace", n_traces)
+        span_ids = self.ids.batch("span", n)
+        return self._batch_spans(n, is_root, start, duration_ms,
+                                 trace_ids=[trace_ids[t] for t in np.repeat(np.arange(n_traces), sizes).tolist()],
+                                 span_ids=span_ids,
+                                 parent_ids=[span_ids[i] for i in parent[~is_root].tolist()])
+
+    def _batch_spans(self, n, is_root, start, duration_ms, trace_ids, span_ids, parent_ids):
+        """Assemble span documents from per-row structure and timing arrays."""
+        child_services = self._batch_choice(self.services[1:], n)
+        services = ["frontend" if r else s for r, s in zip(is_root.tolist(), child_services)]
+        operations = self._batch_pick([
+            self.operations[s] if not r else ["page_load"] for r, s in zip(is_root.tolist(), services)
+        ])
+        start_iso = format_ms_batch(start)
+        kinds = self._batch_choice(["client", "server", "internal"], n)
+
+        resources = ColumnBatch({
+            "service.version": self._batch_versions(3, n),
+            "deployment.environment": self._batch_choice(["production", "staging", "development"], n),
+            "host.name": self._batch_pool("hostname", n),
+        })
+        spans = ColumnBatch({
+            "@timestamp": start_iso,
+            "trace.id": trace_ids,
+            "span.id": span_ids,
+            "span.name": [f"{s}.{o}" for s, o in zip(services, operations)],
+            "service.name": services,
+            "operation.name": operations,
+            "span.kind": ["server" if r else k for r, k in zip(is_root.tolist(), kinds)],
+            "span.status": self.status_dist.draw_batch(self.rng, n),
+            "duration.ms": duration_ms.tolist(),
+            "span.start_time": start_iso,
+            "span.end_time": format_ms_batch(start + duration_ms),
+            "resource.attributes": resources,
+        })
+
+        spans.fill(np.flatnonzero(~is_root).tolist(), {
+            "span.parent_id": parent_ids,
+        })
+        payment_idx = [i for i, o in enumerate(operations) if "payment" in o]
+        order_idx = [i for i, o in enumerate(operations) if "payment" not in o and "order" in o]
+        user_idx = [i for i, o in enumerate(operations)
+                    if "payment" not in o and "order" not in o and "user" in o]
+        spans.fill(payment_idx, {
+            "payment.amount": self._batch_randint(10, 1000, len(payment_idx)),
+            "payment.currency": self._batch_choice(["USD", "EUR", "GBP"], len(payment_idx)),
+        })
+        spans.fill(order_idx, {
+            "order.id": self.ids.batch("uuid4", len(order_idx)),
+            "order.total": self._batch_randint(50, 500, len(order_idx)),
+        })
+        spans.fill(user_idx, {
+            "user.id": self.ids.batch("uuid4", len(user_idx)),
+            "user.email": self._batch_pool("email", len(user_idx)),
+        })
+        return spans
+
+    def _generate_span(self, trace_id, parent_span_id, service, operation, start_ms, duration_ms,
+                       is_root=False):
+        start_iso = format_ms(start_ms)
         
         span = {
-            "@timestamp": start_time.isoformat() + "Z",
+            "@timestamp": start_iso,
             "trace.id": trace_id,
-            "span.id": fake.uuid4()[:16],
+            "span.id": self.ids.span_id(),
             "span.name": f"{service}.{operation}",
             "service.name": service,
             "operation.name": operation,
-            "span.kind": "server" if is_root else random.choice(["client", "server", "internal"]),
-            "span.status": random.choices(["OK", "ERROR", "TIMEOUT"], weights=[85, 10, 5])[0],
+            "span.kind": "server" if is_root else self.random.choice(["client", "server", "internal"]),
+            "span.status": self.status_dist.draw(self.random),
             "duration.ms": duration_ms,
-            "span.start_time": start_time.isoformat() + "Z",
-            "span.end_time": end_time.isoformat() + "Z",
+            "span.start_time": start_iso,
+            "span.end_time": format_ms(start_ms + duration_ms),
             "resource.attributes": {
-                "service.version": f"{fake.random_int(1, 3)}.{fake.random_int(0, 9)}.{fake.random_int(0, 9)}",
-                "deployment.environment": random.choice(["production", "staging", "development"]),
-                "host.name": fake.hostname()
+                "service.version": f"{self.random.randint(1, 3)}.{self.random.randint(0, 9)}.{self.random.randint(0, 9)}",
+                "deployment.environment": self.random.choice(["production", "staging", "development"]),
+                "host.name": self._pool("hostname")
             }
         }
         
@@ -222,36 +678,76 @@ class DistributedTracesGenerator(DataTypeGenerator):
         
         # Add operation-specific attributes
         if "payment" in operation:
-            span["payment.amount"] = fake.random_int(10, 1000)
-            span["payment.currency"] = random.choice(["USD", "EUR", "GBP"])
+            span["payment.amount"] = self.random.randint(10, 1000)
+            span["payment.currency"] = self.random.choice(["USD", "EUR", "GBP"])
         elif "order" in operation:
-            span["order.id"] = fake.uuid4()
-            span["order.total"] = fake.random_int(50, 500)
+            span["order.id"] = self.ids.uuid4()
+            span["order.total"] = self.random.randint(50, 500)
         elif "user" in operation:
-            span["user.id"] = fake.uuid4()
-            span["user.email"] = fake.email()
+            span["user.id"] = self.ids.uuid4()
+            span["user.email"] = self._pool("email")
         
         return span
 
 class MetricsGenerator(DataTypeGenerator):
     """Time series metrics data"""
-    
-    def __init__(self, start_date=None, end_date=None):
-        super().__init__(start_date=start_date, end_date=end_date)
+
+    SCHEMA = Schema([
+        ("@timestamp", "date"),
+        ("metric.type", "keyword"),
+        ("metric.name", "keyword"),
+        ("metric.value", "double"),
+        ("service.name", "keyword"),
+        ("host.name", "keyword"),
+        ("environment", "keyword"),
+        (("labels", "method"), "keyword"),
+        (("labels", "status"), "keyword"),
+        (("metric.buckets", "0.1"), "long"),
+        (("metric.buckets", "0.5"), "long"),
+        (("metric.buckets", "1.0"), "long"),
+        (("metric.buckets", "5.0"), "long"),
+        (("metric.buckets", "10.0"), "long"),
+        (("metric.quantiles", "0.5"), "double"),
+        (("metric.quantiles", "0.9"), "double"),
+        (("metric.quantiles", "0.95"), "double"),
+        (("metric.quantiles", "0.99"), "double"),
+        ("metric.count", "long"),
+        ("metric.sum", "long"),
+    ])
+
+    COUNTERS = {
+        "frontend": ["page_views_total", "button_clicks_total", "form_submissions_total"],
+        "api-gateway": ["requests_total", "errors_total", "rate_limit_hits_total"],
+        "user-service": ["logins_total", "registrations_total", "password_resets_total"],
+        "order-service": ["orders_created_total", "orders_completed_total", "orders_cancelled_total"],
+        "database": ["queries_total", "connections_total", "deadlocks_total"]
+    }
+
+    GAUGES = {
+        "frontend": ["active_users", "page_load_time_seconds"],
+        "api-gateway": ["active_connections", "queue_size"],
+        "user-service": ["active_sessions", "cache_hit_ratio"],
+        "order-service": ["pending_orders", "processing_time_seconds"],
+        "database": ["active_connections", "cpu_usage_percent", "memory_usage_bytes"]
+    }
+
+    def __init__(self, start_date=None, end_date=None, seed=None, ordered=False, weights=None):
+        super().__init__(start_date=start_date, end_date=end_date, seed=seed, ordered=ordered,
+                         weights=weights)
         self.metric_types = ["counter", "gauge", "histogram", "summary"]
         self.services = ["frontend", "api-gateway", "user-service", "order-service", "database"]
         
     def generate_entry(self):
-        service = random.choice(self.services)
-        metric_type = random.choice(self.metric_types)
-        timestamp = self.random_timestamp()
+        service = self.random.choice(self.services)
+        metric_type = self.random.choice(self.metric_types)
+        timestamp = self.random_epoch_ms()
         
         base_metric = {
-            "@timestamp": timestamp.isoformat() + "Z",
+            "@timestamp": format_ms(timestamp),
             "metric.type": metric_type,
             "service.name": service,
-            "host.name": fake.hostname(),
-            "environment": random.choice(["production", "staging", "development"])
+            "host.name": self._pool("hostname"),
+            "environment": self.random.choice(["production", "staging", "development"])
         }
         
         if metric_type == "counter":
@@ -264,44 +760,104 @@ class MetricsGenerator(DataTypeGenerator):
             base_metric.update(self._generate_summary_metric(service))
         
         return base_metric
-    
+
+    def generate_columns(self, n):
+        services = self._batch_choice(self.services, n)
+        metric_types = self._batch_choice(self.metric_types, n)
+        batch = ColumnBatch({
+            "@timestamp": format_ms_batch(self._batch_epoch_ms(n)),
+            "metric.type": metric_types,
+            "service.name": services,
+            "host.name": self._batch_pool("hostname", n),
+            "environment": self._batch_choice(["production", "staging", "development"], n),
+        })
+        groups = {t: [] for t in self.metric_types}
+        for i, t in enumerate(metric_types):
+            groups[t].append(i)
+
+        idx = groups["counter"]
+        names = self._batch_pick([self.COUNTERS[services[i]] for i in idx])
+        methods = self._batch_choice(["GET", "POST", "PUT", "DELETE"], len(idx))
+        statuses = self._batch_choice(["success", "error"], len(idx))
+        batch.fill(idx, {
+            "metric.name": names,
+            "metric.value": self._batch_randint(1, 1000, len(idx)),
+            "labels": ColumnBatch({
+                "method": [m if "requests" in name else None for name, m in zip(names, methods)],
+                "status": [s if "total" in name else None for name, s in zip(names, statuses)],
+            }),
+        })
+
+        idx = groups["gauge"]
+        names = self._batch_pick([self.GAUGES[services[i]] for i in idx])
+        k = len(idx)
+        percent = self._batch_randint(0, 100, k)
+        byte_values = self._batch_randint(1000000, 8000000000, k)  # 1MB to 8GB
+        seconds = self._batch_uniform(0.1, 10.0, k)
+        other = self._batch_randint(0, 1000, k)
+        values = []
+        for j, name in enumerate(names):
+            if "percent" in name:
+                values.append(percent[j])
+            elif "bytes" in name:
+                values.append(byte_values[j])
+            elif "seconds" in name:
+                values.append(seconds[j])
+            else:
+                values.append(other[j])
+        batch.fill(idx, {"metric.name": names, "metric.value": values})
+
+        idx = groups["histogram"]
+        k = len(idx)
+        batch.fill(idx, {
+            "metric.name": ["response_time_histogram"] * k,
+            "metric.buckets": ColumnBatch({
+                "0.1": self._batch_randint(0, 100, k),
+                "0.5": self._batch_randint(100, 500, k),
+                "1.0": self._batch_randint(500, 800, k),
+                "5.0": self._batch_randint(800, 950, k),
+                "10.0": self._batch_randint(950, 1000, k),
+            }),
+            "metric.count": self._batch_randint(1000, 10000, k),
+            "metric.sum": self._batch_randint(5000, 50000, k),
+        })
+
+        idx = groups["summary"]
+        k = len(idx)
+        batch.fill(idx, {
+            "metric.name": ["request_duration_summary"] * k,
+            "metric.quantiles": ColumnBatch({
+                "0.5": self._batch_uniform(0.1, 2.0, k),
+                "0.9": self._batch_uniform(2.0, 5.0, k),
+                "0.95": self._batch_uniform(5.0, 8.0, k),
+                "0.99": self._batch_uniform(8.0, 15.0, k),
+            }),
+            "metric.count": self._batch_randint(1000, 10000, k),
+            "metric.sum": self._batch_randint(5000, 50000, k),
+        })
+        return batch
+
     def _generate_counter_metric(self, service):
-        counters = {
-            "frontend": ["page_views_total", "button_clicks_total", "form_submissions_total"],
-            "api-gateway": ["requests_total", "errors_total", "rate_limit_hits_total"],
-            "user-service": ["logins_total", "registrations_total", "password_resets_total"],
-            "order-service": ["orders_created_total", "orders_completed_total", "orders_cancelled_total"],
-            "database": ["queries_total", "connections_total", "deadlocks_total"]
-        }
-        
-        metric_name = random.choice(counters[service])
+        metric_name = self.random.choice(self.COUNTERS[service])
         return {
             "metric.name": metric_name,
-            "metric.value": fake.random_int(1, 1000),
+            "metric.value": self.random.randint(1, 1000),
             "labels": {
-                "method": random.choice(["GET", "POST", "PUT", "DELETE"]) if "requests" in metric_name else None,
-                "status": random.choice(["success", "error"]) if "total" in metric_name else None
+                "method": self.random.choice(["GET", "POST", "PUT", "DELETE"]) if "requests" in metric_name else None,
+                "status": self.random.choice(["success", "error"]) if "total" in metric_name else None
             }
         }
     
     def _generate_gauge_metric(self, service):
-        gauges = {
-            "frontend": ["active_users", "page_load_time_seconds"],
-            "api-gateway": ["active_connections", "queue_size"],
-            "user-service": ["active_sessions", "cache_hit_ratio"],
-            "order-service": ["pending_orders", "processing_time_seconds"],
-            "database": ["active_connections", "cpu_usage_percent", "memory_usage_bytes"]
-        }
-        
-        metric_name = random.choice(gauges[service])
+        metric_name = self.random.choice(self.GAUGES[service])
         if "percent" in metric_name:
-            value = fake.random_int(0, 100)
+            value = self.random.randint(0, 100)
         elif "bytes" in metric_name:
-            value = fake.random_int(1000000, 8000000000)  # 1MB to 8GB
+            value = self.random.randint(1000000, 8000000000)  # 1MB to 8GB
         elif "seconds" in metric_name:
-            value = round(random.uniform(0.1, 10.0), 3)
+            value = round(self.random.uniform(0.1, 10.0), 3)
         else:
-            value = fake.random_int(0, 1000)
+            value = self.random.randint(0, 1000)
         
         return {
             "metric.name": metric_name,
@@ -312,53 +868,86 @@ class MetricsGenerator(DataTypeGenerator):
         return {
             "metric.name": "response_time_histogram",
             "metric.buckets": {
-                "0.1": fake.random_int(0, 100),
-                "0.5": fake.random_int(100, 500),
-                "1.0": fake.random_int(500, 800),
-                "5.0": fake.random_int(800, 950),
-                "10.0": fake.random_int(950, 1000)
+                "0.1": self.random.randint(0, 100),
+                "0.5": self.random.randint(100, 500),
+                "1.0": self.random.randint(500, 800),
+                "5.0": self.random.randint(800, 950),
+                "10.0": self.random.randint(950, 1000)
             },
-            "metric.count": fake.random_int(1000, 10000),
-            "metric.sum": fake.random_int(5000, 50000)
+            "metric.count": self.random.randint(1000, 10000),
+            "metric.sum": self.random.randint(5000, 50000)
         }
     
     def _generate_summary_metric(self, service):
         return {
             "metric.name": "request_duration_summary",
             "metric.quantiles": {
-                "0.5": round(random.uniform(0.1, 2.0), 3),
-                "0.9": round(random.uniform(2.0, 5.0), 3),
-                "0.95": round(random.uniform(5.0, 8.0), 3),
-                "0.99": round(random.uniform(8.0, 15.0), 3)
+                "0.5": round(self.random.uniform(0.1, 2.0), 3),
+                "0.9": round(self.random.uniform(2.0, 5.0), 3),
+                "0.95": round(self.random.uniform(5.0, 8.0), 3),
+                "0.99": round(self.random.uniform(8.0, 15.0), 3)
             },
-            "metric.count": fake.random_int(1000, 10000),
-            "metric.sum": fake.random_int(5000, 50000)
+            "metric.count": self.random.randint(1000, 10000),
+            "metric.sum": self.random.randint(5000, 50000)
         }
 
 class SecurityEventsGenerator(DataTypeGenerator):
     """SIEM-style security events"""
+
+    SCHEMA = Schema([
+        ("@timestamp", "date"),
+        ("event.type", "keyword"),
+        ("event.id", "keyword"),
+        ("event.severity", "keyword"),
+        ("event.action", "keyword"),
+        ("event.outcome", "keyword"),
+        ("source.ip", "ip"),
+        ("source.port", "integer"),
+        ("destination.ip", "ip"),
+        ("destination.port", "integer"),
+        ("user.name", "keyword"),
+        ("user.agent", "keyword"),
+        ("host.name", "keyword"),
+        ("agent.name", "keyword"),
+        ("agent.version", "keyword"),
+        ("authentication.method", "keyword"),
+        ("geo.country", "keyword"),
+        ("geo.city", "keyword"),
+        ("network.protocol", "keyword"),
+        ("network.bytes", "long"),
+        ("threat.indicator", "keyword"),
+        ("file.name", "keyword"),
+        ("file.path", "keyword"),
+        ("file.hash.sha256", "keyword"),
+        ("malware.name", "keyword"),
+        ("message", "text"),
+    ])
     
-    def __init__(self, start_date=None, end_date=None):
-        super().__init__(start_date=start_date, end_date=end_date)
+    def __init__(self, start_date=None, end_date=None, seed=None, ordered=False, weights=None):
+        super().__init__(start_date=start_date, end_date=end_date, seed=seed, ordered=ordered,
+                         weights=weights)
         self.event_types = ["authentication", "authorization", "network", "malware", "data_access", "system"]
         self.severities = ["low", "medium", "high", "critical"]
         self.attack_types = ["brute_force", "sql_injection", "xss", "csrf", "malware", "phishing", "ddos"]
+        self.severity_dist = self._weighted("event.severity", self.severities, [40, 35, 20, 5])
+        self.login_success_dist = self._weighted("authentication.success", [True, False], [70, 30])
+        self.malicious_dist = self._weighted("network.malicious", [True, False], [20, 80])
     
     def generate_entry(self):
-        event_type = random.choice(self.event_types)
-        timestamp = self.random_timestamp()
+        event_type = self.random.choice(self.event_types)
+        timestamp = self.random_epoch_ms()
         
         base_event = {
-            "@timestamp": timestamp.isoformat() + "Z",
+            "@timestamp": format_ms(timestamp),
             "event.type": event_type,  
-            "event.id": fake.uuid4(),
-            "event.severity": random.choices(self.severities, weights=[40, 35, 20, 5])[0],
-            "source.ip": fake.ipv4(),
-            "destination.ip": fake.ipv4(),
-            "user.name": fake.user_name(),
-            "host.name": fake.hostname(),
+            "event.id": self.ids.uuid4(),
+            "event.severity": self.severity_dist.draw(self.random),
+            "source.ip": self._pool("ipv4"),
+            "destination.ip": self._pool("ipv4"),
+            "user.name": self._pool("user_name"),
+            "host.name": self._pool("hostname"),
             "agent.name": "security-agent",
-            "agent.version": f"{fake.random_int(1, 3)}.{fake.random_int(0, 9)}.{fake.random_int(0, 9)}"
+            "agent.version": f"{self.random.randint(1, 3)}.{self.random.randint(0, 9)}.{self.random.randint(0, 9)}"
         }
         
         if event_type == "authentication":
@@ -371,29 +960,97 @@ class SecurityEventsGenerator(DataTypeGenerator):
             base_event.update(self._generate_generic_security_event(event_type))
         
         return base_event
-    
+
+    def generate_columns(self, n):
+        event_types = self._batch_choice(self.event_types, n)
+        batch = ColumnBatch({
+            "@timestamp": format_ms_batch(self._batch_epoch_ms(n)),
+            "event.type": event_types,
+            "event.id": self.ids.batch("uuid4", n),
+            "event.severity": self.severity_dist.draw_batch(self.rng, n),
+            "source.ip": self._batch_pool("ipv4", n),
+            "destination.ip": self._batch_pool("ipv4", n),
+            "user.name": self._batch_pool("user_name", n),
+            "host.name": self._batch_pool("hostname", n),
+            "agent.name": ["security-agent"] * n,
+            "agent.version": self._batch_versions(3, n),
+        })
+        groups = {"authentication": [], "network": [], "malware": [], "other": []}
+        for i, t in enumerate(event_types):
+            groups[t if t in groups else "other"].append(i)
+
+        idx = groups["authentication"]
+        k = len(idx)
+        success = self.login_success_dist.draw_batch(self.rng, k)
+        batch.fill(idx, {
+            "event.action": ["login_attempt"] * k,
+            "event.outcome": ["success" if s else "failure" for s in success],
+            "authentication.method": self._batch_choice(["password", "mfa", "sso", "api_key"], k),
+            "source.port": self._batch_randint(1024, 65535, k),
+            "user.agent": self._batch_pool("user_agent", k),
+            "geo.country": self._batch_pool("country_code", k),
+            "geo.city": self._batch_pool("city", k),
+            "message": [f"{'Successful' if s else 'Failed'} login attempt for user" for s in success],
+        })
+
+        idx = groups["network"]
+        k = len(idx)
+        malicious = self.malicious_dist.draw_batch(self.rng, k)
+        indicators = self._batch_choice(self.attack_types, k)
+        batch.fill(idx, {
+            "event.action": ["network_connection"] * k,
+            "network.protocol": self._batch_choice(["tcp", "udp", "icmp"], k),
+            "source.port": self._batch_randint(1024, 65535, k),
+            "destination.port": self._batch_choice([80, 443, 22, 3389, 1433, 3306], k),
+            "network.bytes": self._batch_randint(100, 1000000, k),
+            "threat.indicator": [t if m else None for t, m in zip(indicators, malicious)],
+            "event.severity": ["high" if m else "low" for m in malicious],
+            "message": [f"Network connection {'blocked - malicious' if m else 'allowed'}" for m in malicious],
+        })
+
+        idx = groups["malware"]
+        k = len(idx)
+        families = self._batch_choice(['Trojan', 'Virus', 'Worm', 'Ransomware'], k)
+        batch.fill(idx, {
+            "event.action": ["malware_detection"] * k,
+            "file.name": self._batch_pool("file_name", k),
+            "file.path": self._batch_pool("file_path", k),
+            "file.hash.sha256": self._batch_pool("sha256", k),
+            "malware.name": [f"{f}.{w.title()}" for f, w in zip(families, self._batch_pool("word", k))],
+            "event.severity": ["critical"] * k,
+            "event.outcome": self._batch_choice(["quarantined", "deleted", "blocked"], k),
+            "message": ["Malware detected and quarantined"] * k,
+        })
+
+        idx = groups["other"]
+        batch.fill(idx, {
+            "event.action": [f"{event_types[i]}_event" for i in idx],
+            "message": [f"Security event of type {event_types[i]} detected" for i in idx],
+        })
+        return batch
+
     def _generate_auth_event(self):
-        success = random.choices([True, False], weights=[70, 30])[0]
+        success = self.login_success_dist.draw(self.random)
         return {
             "event.action": "login_attempt",
             "event.outcome": "success" if success else "failure",
-            "authentication.method": random.choice(["password", "mfa", "sso", "api_key"]),
-            "source.port": fake.random_int(1024, 65535),
-            "user.agent": fake.user_agent(),
-            "geo.country": fake.country_code(),
-            "geo.city": fake.city(),
+            "authentication.method": self.random.choice(["password", "mfa", "sso", "api_key"]),
+            "source.port": self.random.randint(1024, 65535),
+            "user.agent": self._pool("user_agent"),
+            "geo.country": self._pool("country_code"),
+            "geo.city": self._pool("city"),
             "message": f"{'Successful' if success else 'Failed'} login attempt for user"
         }
     
     def _generate_network_event(self):
-        is_malicious = random.choices([True, False], weights=[20, 80])[0]
+        is_malicious = self.malicious_dist.draw(self.random)
         return {
             "event.action": "network_connection",
-            "network.protocol": random.choice(["tcp", "udp", "icmp"]),
-            "source.port": fake.random_int(1024, 65535),
-            "destination.port": random.choice([80, 443, 22, 3389, 1433, 3306]),
-            "network.bytes": fake.random_int(100, 1000000),
-            "threat.indicator": random.choice(self.attack_types) if is_malicious else None,
+            "network.protocol": self.random.choice(["tcp", "udp", "icmp"]),
+            "source.port": self.random.randint(1024, 65535),
+            "destination.port": self.random.choice([80, 443, 22, 3389, 1433, 3306]),
+            "network.bytes": self.random.randint(100, 1000000),
+            "threat.indicator": self.random.choice(self.attack_types) if is_malicious else None,
             "event.severity": "high" if is_malicious else "low",
             "message": f"Network connection {'blocked - malicious' if is_malicious else 'allowed'}"
         }
@@ -401,12 +1058,12 @@ class SecurityEventsGenerator(DataTypeGenerator):
     def _generate_malware_event(self):
         return {
             "event.action": "malware_detection",
-            "file.name": fake.file_name(),
-            "file.path": fake.file_path(),
-            "file.hash.sha256": fake.sha256(),
-            "malware.name": f"{random.choice(['Trojan', 'Virus', 'Worm', 'Ransomware'])}.{fake.word().title()}",
+            "file.name": self._pool("file_name"),
+            "file.path": self._pool("file_path"),
+            "file.hash.sha256": self._pool("sha256"),
+            "malware.name": f"{self.random.choice(['Trojan', 'Virus', 'Worm', 'Ransomware'])}.{self._pool('word').title()}",
             "event.severity": "critical",
-            "event.outcome": random.choice(["quarantined", "deleted", "blocked"]),
+            "event.outcome": self.random.choice(["quarantined", "deleted", "blocked"]),
             "message": "Malware detected and quarantined"
         }
     
@@ -418,9 +1075,39 @@ class SecurityEventsGenerator(DataTypeGenerator):
 
 class AlertsGenerator(DataTypeGenerator):
     """Alert manager style alerts"""
-    
-    def __init__(self, start_date=None, end_date=None):
-        super().__init__(start_date=start_date, end_date=end_date)
+
+    SCHEMA = Schema([
+        ("@timestamp", "date"),
+        ("alert.name", "keyword"),
+        ("alert.state", "keyword"),
+        ("alert.severity", "keyword"),
+        ("alert.id", "keyword"),
+        ("alert.started_at", "date"),
+        ("alert.resolved_at", "date"),
+        (("labels", "service"), "keyword"),
+        (("labels", "environment"), "keyword"),
+        (("labels", "team"), "keyword"),
+        (("labels", "instance"), "keyword"),
+        (("labels", "host"), "keyword"),       # set by the security_incident scenario
+        (("labels", "source_ip"), "keyword"),  # set by the security_incident scenario
+        (("annotations", "summary"), "text"),
+        (("annotations", "description"), "text"),
+        (("annotations", "runbook_url"), "keyword"),
+        ("metric.value", "double"),
+        ("metric.threshold", "double"),
+    ])
+
+    METRIC_RANGES = [
+        # (substring of alert name, value range, threshold)
+        ("CPU", (80, 100), 85),
+        ("Memory", (85, 98), 90),
+        ("Disk", (90, 98), 95),
+        ("ErrorRate", (5, 25), 5),
+    ]
+
+    def __init__(self, start_date=None, end_date=None, seed=None, ordered=False, weights=None):
+        super().__init__(start_date=start_date, end_date=end_date, seed=seed, ordered=ordered,
+                         weights=weights)
         self.alert_names = [
             "HighCPUUsage", "HighMemoryUsage", "DiskSpaceLow", "ServiceDown",
             "HighErrorRate", "SlowResponseTime", "DatabaseConnectionFailed",
@@ -428,23 +1115,24 @@ class AlertsGenerator(DataTypeGenerator):
         ]
         self.severities = ["warning", "critical"]
         self.states = ["firing", "resolved"]
+        self.state_dist = self._weighted("alert.state", self.states, [30, 70])  # More resolved than firing
     
     def generate_entry(self):
-        alert_name = random.choice(self.alert_names)
-        state = random.choices(self.states, weights=[30, 70])[0]  # More resolved than firing
-        timestamp = self.random_timestamp()
+        alert_name = self.random.choice(self.alert_names)
+        state = self.state_dist.draw(self.random)
+        timestamp = self.random_epoch_ms()
         
         alert = {
-            "@timestamp": timestamp.isoformat() + "Z",
+            "@timestamp": format_ms(timestamp),
             "alert.name": alert_name,
             "alert.state": state,
-            "alert.severity": random.choice(self.severities),
-            "alert.id": fake.uuid4(),
+            "alert.severity": self.random.choice(self.severities),
+            "alert.id": self.ids.uuid4(),
             "labels": {
-                "service": random.choice(["frontend", "backend", "database", "cache", "queue"]),
-                "environment": random.choice(["production", "staging", "development"]),
-                "team": random.choice(["platform", "backend", "frontend", "devops", "security"]),
-                "instance": fake.hostname()
+                "service": self.random.choice(["frontend", "backend", "database", "cache", "queue"]),
+                "environment": self.random.choice(["production", "staging", "development"]),
+                "team": self.random.choice(["platform", "backend", "frontend", "devops", "security"]),
+                "instance": self._pool("hostname")
             },
             "annotations": {
                 "summary": self._generate_summary(alert_name, state),
@@ -454,27 +1142,70 @@ class AlertsGenerator(DataTypeGenerator):
         }
         
         if state == "firing":
-            alert["alert.started_at"] = (timestamp - datetime.timedelta(minutes=fake.random_int(1, 60))).isoformat() + "Z"
+            alert["alert.started_at"] = format_ms(timestamp - self.random.randint(1, 60) * 60_000)
         else:
-            alert["alert.started_at"] = (timestamp - datetime.timedelta(minutes=fake.random_int(5, 120))).isoformat() + "Z"
-            alert["alert.resolved_at"] = timestamp.isoformat() + "Z"
+            alert["alert.started_at"] = format_ms(timestamp - self.random.randint(5, 120) * 60_000)
+            alert["alert.resolved_at"] = alert["@timestamp"]
         
         # Add metric-specific values
         if "CPU" in alert_name:
-            alert["metric.value"] = fake.random_int(80, 100)
+            alert["metric.value"] = self.random.randint(80, 100)
             alert["metric.threshold"] = 85
         elif "Memory" in alert_name:
-            alert["metric.value"] = fake.random_int(85, 98)
+            alert["metric.value"] = self.random.randint(85, 98)
             alert["metric.threshold"] = 90
         elif "Disk" in alert_name:
-            alert["metric.value"] = fake.random_int(90, 98)
+            alert["metric.value"] = self.random.randint(90, 98)
             alert["metric.threshold"] = 95
         elif "ErrorRate" in alert_name:
-            alert["metric.value"] = fake.random_int(5, 25)
+            alert["metric.value"] = self.random.randint(5, 25)
             alert["metric.threshold"] = 5
         
         return alert
-    
+
+    def generate_columns(self, n):
+        names = self._batch_choice(self.alert_names, n)
+        states = self.state_dist.draw_batch(self.rng, n)
+        timestamps = self._batch_epoch_ms(n)
+        ts_iso = format_ms_batch(timestamps)
+
+        firing = np.array([s == "firing" for s in states], dtype=bool)
+        lead_minutes = np.where(firing, self.rng.integers(1, 60, n, endpoint=True),
+                                self.rng.integers(5, 120, n, endpoint=True))
+        started = format_ms_batch(timestamps - lead_minutes * 60_000)
+
+        batch = ColumnBatch({
+            "@timestamp": ts_iso,
+            "alert.name": names,
+            "alert.state": states,
+            "alert.severity": self._batch_choice(self.severities, n),
+            "alert.id": self.ids.batch("uuid4", n),
+            "labels": ColumnBatch({
+                "service": self._batch_choice(["frontend", "backend", "database", "cache", "queue"], n),
+                "environment": self._batch_choice(["production", "staging", "development"], n),
+                "team": self._batch_choice(["platform", "backend", "frontend", "devops", "security"], n),
+                "instance": self._batch_pool("hostname", n),
+            }),
+            "annotations": ColumnBatch({
+                "summary": [self._generate_summary(a, s) for a, s in zip(names, states)],
+                "description": [self._generate_description(a) for a in names],
+                "runbook_url": [f"https://runbooks.company.com/{a.lower()}" for a in names],
+            }),
+            "alert.started_at": started,
+        })
+        resolved_idx = np.flatnonzero(~firing).tolist()
+        batch.fill(resolved_idx, {"alert.resolved_at": [ts_iso[i] for i in resolved_idx]})
+
+        claimed = set()
+        for needle, (low, high), threshold in self.METRIC_RANGES:
+            idx = [i for i, a in enumerate(names) if needle in a and i not in claimed]
+            claimed.update(idx)
+            batch.fill(idx, {
+                "metric.value": self._batch_randint(low, high, len(idx)),
+                "metric.threshold": [threshold] * len(idx),
+            })
+        return batch
+
     def _generate_summary(self, alert_name, state):
         summaries = {
             "HighCPUUsage": f"CPU usage is {'above' if state == 'firing' else 'below'} threshold",
@@ -495,117 +1226,279 @@ class AlertsGenerator(DataTypeGenerator):
 
 class NetworkTrafficGenerator(DataTypeGenerator):
     """Network flow and traffic data"""
+
+    SCHEMA = Schema([
+        ("@timestamp", "date"),
+        ("flow.id", "keyword"),
+        ("flow.duration_ms", "integer"),
+        ("network.protocol", "keyword"),
+        ("network.transport", "keyword"),
+        ("network.direction", "keyword"),
+        ("network.bytes", "long"),
+        ("network.packets", "integer"),
+        ("source.ip", "ip"),
+        ("source.port", "integer"),
+        ("destination.ip", "ip"),
+        ("destination.port", "integer"),
+        ("event.action", "keyword"),
+        ("geo.source.country", "keyword"),
+        ("geo.destination.country", "keyword"),
+        ("http.method", "keyword"),
+        ("http.status_code", "integer"),
+        ("user.agent", "keyword"),
+        ("url.domain", "keyword"),
+    ])
     
-    def __init__(self, start_date=None, end_date=None):
-        super().__init__(start_date=start_date, end_date=end_date)
+    def __init__(self, start_date=None, end_date=None, seed=None, ordered=False, weights=None):
+        super().__init__(start_date=start_date, end_date=end_date, seed=seed, ordered=ordered,
+                         weights=weights)
         self.protocols = ["TCP", "UDP", "ICMP"]
         self.common_ports = [80, 443, 22, 21, 25, 53, 110, 143, 993, 995, 3389, 1433, 3306, 5432, 6379]
+        self.status_dist = self._weighted("http.status_code", [200, 404, 500, 403], [70, 15, 10, 5])
     
     def generate_entry(self):
-        timestamp = self.random_timestamp()
-        protocol = random.choice(self.protocols)
+        timestamp = self.random_epoch_ms()
+        protocol = self.random.choice(self.protocols)
         
         # Generate realistic internal/external IPs
         source_ip = self._generate_ip()
         dest_ip = self._generate_ip()
         
         flow = {
-            "@timestamp": timestamp.isoformat() + "Z",
-            "flow.id": fake.uuid4(),
+            "@timestamp": format_ms(timestamp),
+            "flow.id": self.ids.uuid4(),
             "network.protocol": protocol.lower(),
             "source.ip": source_ip,
             "destination.ip": dest_ip,
-            "source.port": fake.random_int(1024, 65535),
-            "destination.port": random.choice(self.common_ports + [fake.random_int(1024, 65535)]),
-            "network.bytes": fake.random_int(64, 1000000),
-            "network.packets": fake.random_int(1, 1000),
-            "flow.duration_ms": fake.random_int(100, 30000),
-            "network.direction": random.choice(["inbound", "outbound", "internal"]),
-            "event.action": random.choice(["allowed", "blocked", "monitored"]),
-            "geo.source.country": fake.country_code(),
-            "geo.destination.country": fake.country_code(),
+            "source.port": self.random.randint(1024, 65535),
+            "destination.port": self.random.choice(self.common_ports + [self.random.randint(1024, 65535)]),
+            "network.bytes": self.random.randint(64, 1000000),
+            "network.packets": self.random.randint(1, 1000),
+            "flow.duration_ms": self.random.randint(100, 30000),
+            "network.direction": self.random.choice(["inbound", "outbound", "internal"]),
+            "event.action": self.random.choice(["allowed", "blocked", "monitored"]),
+            "geo.source.country": self._pool("country_code"),
+            "geo.destination.country": self._pool("country_code"),
             "network.transport": protocol.lower()
         }
         
         # Add application layer info for HTTP/HTTPS
         if flow["destination.port"] in [80, 443]:
-            flow["http.method"] = random.choice(["GET", "POST", "PUT", "DELETE"])
-            flow["http.status_code"] = random.choices([200, 404, 500, 403], weights=[70, 15, 10, 5])[0]
-            flow["user.agent"] = fake.user_agent()
-            flow["url.domain"] = fake.domain_name()
+            flow["http.method"] = self.random.choice(["GET", "POST", "PUT", "DELETE"])
+            flow["http.status_code"] = self.status_dist.draw(self.random)
+            flow["user.agent"] = self._pool("user_agent")
+            flow["url.domain"] = self._pool("domain_name")
         
         return flow
-    
+
+    def generate_columns(self, n):
+        protocols = [p.lower() for p in self._batch_choice(self.protocols, n)]
+        # Picking from common_ports + [random port]: the last slot is an ephemeral port
+        slot = self.rng.integers(0, len(self.common_ports) + 1, n).tolist()
+        ephemeral = self._batch_randint(1024, 65535, n)
+        dest_ports = [self.common_ports[s] if s < len(self.common_ports) else e
+                      for s, e in zip(slot, ephemeral)]
+        batch = ColumnBatch({
+            "@timestamp": format_ms_batch(self._batch_epoch_ms(n)),
+            "flow.id": self.ids.batch("uuid4", n),
+            "network.protocol": protocols,
+            "source.ip": self._batch_ips(n),
+            "destination.ip": self._batch_ips(n),
+            "source.port": self._batch_randint(1024, 65535, n),
+            "destination.port": dest_ports,
+            "network.bytes": self._batch_randint(64, 1000000, n),
+            "network.packets": self._batch_randint(1, 1000, n),
+            "flow.duration_ms": self._batch_randint(100, 30000, n),
+            "network.direction": self._batch_choice(["inbound", "outbound", "internal"], n),
+            "event.action": self._batch_choice(["allowed", "blocked", "monitored"], n),
+            "geo.source.country": self._batch_pool("country_code", n),
+            "geo.destination.country": self._batch_pool("country_code", n),
+            "network.transport": protocols,
+        })
+
+        idx = [i for i, p in enumerate(dest_ports) if p in (80, 443)]
+        k = len(idx)
+        batch.fill(idx, {
+            "http.method": self._batch_choice(["GET", "POST", "PUT", "DELETE"], k),
+            "http.status_code": self.status_dist.draw_batch(self.rng, k),
+            "user.agent": self._batch_pool("user_agent", k),
+            "url.domain": self._batch_pool("domain_name", k),
+        })
+        return batch
+
+    def _batch_ips(self, n):
+        rng = self.rng
+        a = rng.integers(0, 256, n).tolist()
+        b = rng.integers(0, 256, n).tolist()
+        hosts = rng.integers(1, 255, n).tolist()
+        second_172 = rng.integers(16, 32, n).tolist()
+        kind = rng.integers(0, 3, n).tolist()
+        internal = (rng.random(n) < 0.4).tolist()  # 40% internal IPs
+        ext = self._batch_pool("ipv4", n)
+        ips = []
+        for i, is_internal in enumerate(internal):
+            if not is_internal:
+                ips.append(ext[i])
+            elif kind[i] == 0:
+                ips.append(f"10.{a[i]}.{b[i]}.{hosts[i]}")
+            elif kind[i] == 1:
+                ips.append(f"192.168.{a[i]}.{hosts[i]}")
+            else:
+                ips.append(f"172.{second_172[i]}.{a[i]}.{hosts[i]}")
+        return ips
+
     def _generate_ip(self):
         # Mix of internal and external IPs
-        if random.random() < 0.4:  # 40% internal IPs
-            return random.choice([
-                f"10.{fake.random_int(0, 255)}.{fake.random_int(0, 255)}.{fake.random_int(1, 254)}",
-                f"192.168.{fake.random_int(0, 255)}.{fake.random_int(1, 254)}",
-                f"172.{fake.random_int(16, 31)}.{fake.random_int(0, 255)}.{fake.random_int(1, 254)}"
+        if self.random.random() < 0.4:  # 40% internal IPs
+            return self.random.choice([
+                f"10.{self.random.randint(0, 255)}.{self.random.randint(0, 255)}.{self.random.randint(1, 254)}",
+                f"192.168.{self.random.randint(0, 255)}.{self.random.randint(1, 254)}",
+                f"172.{self.random.randint(16, 31)}.{self.random.randint(0, 255)}.{self.random.randint(1, 254)}"
             ])
         else:  # 60% external IPs
-            return fake.ipv4()
+            return self._pool("ipv4")
 
 class APMDataGenerator(DataTypeGenerator):
     """Application Performance Monitoring data"""
+
+    SCHEMA = Schema([
+        ("@timestamp", "date"),
+        ("transaction.id", "keyword"),
+        ("transaction.type", "keyword"),
+        ("transaction.name", "keyword"),
+        ("transaction.duration.ms", "integer"),
+        ("transaction.result", "keyword"),
+        ("service.name", "keyword"),
+        ("service.version", "keyword"),
+        ("user.id", "keyword"),
+        ("trace.id", "keyword"),
+        ("span.id", "keyword"),
+        ("host.name", "keyword"),
+        ("container.id", "keyword"),
+        ("kubernetes.pod.name", "keyword"),
+        ("kubernetes.namespace", "keyword"),
+        ("http.method", "keyword"),
+        ("http.status_code", "integer"),
+        ("http.url", "keyword"),
+        ("user.agent", "keyword"),
+        ("db.type", "keyword"),
+        ("db.statement", "keyword"),
+        ("db.rows_affected", "integer"),
+        ("error.type", "keyword"),
+        ("error.message", "text"),
+        ("error.stack_trace", "text"),
+    ])
     
-    def __init__(self, start_date=None, end_date=None):
-        super().__init__(start_date=start_date, end_date=end_date)
+    def __init__(self, start_date=None, end_date=None, seed=None, ordered=False, weights=None):
+        super().__init__(start_date=start_date, end_date=end_date, seed=seed, ordered=ordered,
+                         weights=weights)
         self.transaction_types = ["request", "task", "background_job", "database_query"]
         self.services = ["web-app", "api-service", "worker", "database"]
+        self.success_dist = self._weighted("transaction.success", [True, False], [85, 15])
+        self.status_dist = self._weighted("http.status_code", [200, 201, 204], [80, 15, 5])
     
     def generate_entry(self):
-        transaction_type = random.choice(self.transaction_types)
-        service = random.choice(self.services)
-        timestamp = self.random_timestamp()
+        transaction_type = self.random.choice(self.transaction_types)
+        service = self.random.choice(self.services)
+        timestamp = self.random_epoch_ms()
         
-        duration_ms = fake.random_int(10, 5000)
-        success = random.choices([True, False], weights=[85, 15])[0]
+        duration_ms = self.random.randint(10, 5000)
+        success = self.success_dist.draw(self.random)
         
         apm_data = {
-            "@timestamp": timestamp.isoformat() + "Z",
-            "transaction.id": fake.uuid4(),
+            "@timestamp": format_ms(timestamp),
+            "transaction.id": self.ids.uuid4(),
             "transaction.type": transaction_type,
             "transaction.name": self._generate_transaction_name(transaction_type),
             "service.name": service,
-            "service.version": f"{fake.random_int(1, 3)}.{fake.random_int(0, 9)}.{fake.random_int(0, 9)}",
+            "service.version": f"{self.random.randint(1, 3)}.{self.random.randint(0, 9)}.{self.random.randint(0, 9)}",
             "transaction.duration.ms": duration_ms,
             "transaction.result": "success" if success else "error",
-            "user.id": fake.uuid4(),
-            "trace.id": fake.uuid4(),
-            "span.id": fake.uuid4()[:16],
-            "host.name": fake.hostname(),
-            "container.id": fake.uuid4()[:12],
-            "kubernetes.pod.name": f"{service}-{fake.uuid4()[:8]}",
-            "kubernetes.namespace": random.choice(["production", "staging", "development"])
+            "user.id": self.ids.uuid4(),
+            "trace.id": self.ids.trace_id(),
+            "span.id": self.ids.span_id(),
+            "host.name": self._pool("hostname"),
+            "container.id": self.ids.new("container"),
+            "kubernetes.pod.name": f"{service}-{self.ids.new('short')}",
+            "kubernetes.namespace": self.random.choice(["production", "staging", "development"])
         }
         
         # Add transaction-specific data
         if transaction_type == "request":
             apm_data.update({
-                "http.method": random.choice(["GET", "POST", "PUT", "DELETE"]),
-                "http.status_code": 500 if not success else random.choices([200, 201, 204], weights=[80, 15, 5])[0],
-                "http.url": f"https://api.company.com/{fake.uri_path()}",
-                "user.agent": fake.user_agent()
+                "http.method": self.random.choice(["GET", "POST", "PUT", "DELETE"]),
+                "http.status_code": 500 if not success else self.status_dist.draw(self.random),
+                "http.url": f"https://api.company.com/{self._pool('uri_path')}",
+                "user.agent": self._pool("user_agent")
             })
         elif transaction_type == "database_query":
             apm_data.update({
-                "db.type": random.choice(["postgresql", "mysql", "mongodb", "redis"]),
+                "db.type": self.random.choice(["postgresql", "mysql", "mongodb", "redis"]),
                 "db.statement": self._generate_db_statement(),
-                "db.rows_affected": fake.random_int(0, 1000) if success else 0
+                "db.rows_affected": self.random.randint(0, 1000) if success else 0
             })
         
         # Add error details if transaction failed
         if not success:
             apm_data.update({
-                "error.type": random.choice(["DatabaseError", "TimeoutError", "ValidationError", "AuthenticationError"]),
-                "error.message": fake.sentence(),
+                "error.type": self.random.choice(["DatabaseError", "TimeoutError", "ValidationError", "AuthenticationError"]),
+                "error.message": self._pool("sentence"),
                 "error.stack_trace": self._generate_stack_trace()
             })
         
         return apm_data
-    
+
+    def generate_columns(self, n):
+        transaction_types = self._batch_choice(self.transaction_types, n)
+        services = self._batch_choice(self.services, n)
+        success = self.success_dist.draw_batch(self.rng, n)
+        pod_suffixes = self.ids.batch("short", n)
+        batch = ColumnBatch({
+            "@timestamp": format_ms_batch(self._batch_epoch_ms(n)),
+            "transaction.id": self.ids.batch("uuid4", n),
+            "transaction.type": transaction_types,
+            "transaction.name": [self._generate_transaction_name(t) for t in transaction_types],
+            "service.name": services,
+            "service.version": self._batch_versions(3, n),
+            "transaction.duration.ms": self._batch_randint(10, 5000, n),
+            "transaction.result": ["success" if s else "error" for s in success],
+            "user.id": self.ids.batch("uuid4", n),
+            "trace.id": self.ids.batch("trace", n),
+            "span.id": self.ids.batch("span", n),
+            "host.name": self._batch_pool("hostname", n),
+            "container.id": self.ids.batch("container", n),
+            "kubernetes.pod.name": [f"{s}-{u}" for s, u in zip(services, pod_suffixes)],
+            "kubernetes.namespace": self._batch_choice(["production", "staging", "development"], n),
+        })
+
+        idx = [i for i, t in enumerate(transaction_types) if t == "request"]
+        k = len(idx)
+        ok_codes = self.status_dist.draw_batch(self.rng, k)
+        batch.fill(idx, {
+            "http.method": self._batch_choice(["GET", "POST", "PUT", "DELETE"], k),
+            "http.status_code": [c if success[i] else 500 for i, c in zip(idx, ok_codes)],
+            "http.url": [f"https://api.company.com/{p}" for p in self._batch_pool("uri_path", k)],
+            "user.agent": self._batch_pool("user_agent", k),
+        })
+
+        idx = [i for i, t in enumerate(transaction_types) if t == "database_query"]
+        k = len(idx)
+        rows_affected = self._batch_randint(0, 1000, k)
+        batch.fill(idx, {
+            "db.type": self._batch_choice(["postgresql", "mysql", "mongodb", "redis"], k),
+            "db.statement": [self._generate_db_statement() for _ in idx],
+            "db.rows_affected": [r if success[i] else 0 for i, r in zip(idx, rows_affected)],
+        })
+
+        idx = [i for i, s in enumerate(success) if not s]
+        k = len(idx)
+        batch.fill(idx, {
+            "error.type": self._batch_choice(["DatabaseError", "TimeoutError", "ValidationError", "AuthenticationError"], k),
+            "error.message": self._batch_pool("sentence", k),
+            "error.stack_trace": [self._generate_stack_trace() for _ in idx],
+        })
+        return batch
+
     def _generate_transaction_name(self, transaction_type):
         names = {
             "request": [f"{method} /api/{endpoint}" for method in ["GET", "POST", "PUT", "DELETE"] 
@@ -614,7 +1507,7 @@ class APMDataGenerator(DataTypeGenerator):
             "background_job": ["data_sync", "cache_refresh", "log_rotation", "backup_database"],
             "database_query": ["SELECT users", "UPDATE orders", "INSERT products", "DELETE sessions"]
         }
-        return random.choice(names[transaction_type])
+        return self.random.choice(names[transaction_type])
     
     def _generate_db_statement(self):
         statements = [
@@ -623,13 +1516,13 @@ class APMDataGenerator(DataTypeGenerator):
             "INSERT INTO products (name, price) VALUES ($1, $2)",
             "DELETE FROM sessions WHERE expires_at < NOW()"
         ]
-        return random.choice(statements)
+        return self.random.choice(statements)
     
     def _generate_stack_trace(self):
         return "\n".join([
-            f"  at {fake.word()}.{fake.word()}({fake.file_name()}:{fake.random_int(1, 100)})",
-            f"  at {fake.word()}.{fake.word()}({fake.file_name()}:{fake.random_int(1, 100)})",
-            f"  at {fake.word()}.{fake.word()}({fake.file_name()}:{fake.random_int(1, 100)})"
+            f"  at {self._pool('word')}.{self._pool('word')}({self._pool('file_name')}:{self.random.randint(1, 100)})",
+            f"  at {self._pool('word')}.{self._pool('word')}({self._pool('file_name')}:{self.random.randint(1, 100)})",
+            f"  at {self._pool('word')}.{self._pool('word')}({self._pool('file_name')}:{self.random.randint(1, 100)})"
         ])
 
 # Registry of all available data generators
@@ -653,7 +1546,8 @@ DATA_GENERATORS = {
         "description": "OpenTelemetry-style tracing data showing request flows across services", 
         "generator": DistributedTracesGenerator,
         "icon": "fas fa-project-diagram",
-        "index_pattern": "traces"
+        "index_pattern": "traces",
+        "options": {"full_traces": "full_traces"}
     },
     "metrics": {
         "name": "Metrics & Time Series",
@@ -691,3 +1585,23 @@ DATA_GENERATORS = {
         "index_pattern": "apm"
     }
 }
+
+
+def generator_options(data_type, config):
+    """Constructor keyword arguments for ``data_type`` read from ``config['log_generation']``.
+
+    A type's ``options`` entry maps constructor argument -> config key;
+    ``weights[data_type]`` overrides the type's weighted distributions.
+    """
+    gen_cfg = (config or {}).get("log_generation", {})
+    options = DATA_GENERATORS[data_type].get("options", {})
+    kwargs = {arg: gen_cfg[key] for arg, key in options.items() if key in gen_cfg}
+    weights = (gen_cfg.get("weights") or {}).get(data_type)
+    if weights:
+        kwargs["weights"] = weights
+    return kwargs
+
+
+def schema_for(data_type):
+    """The field Schema published by ``data_type``'s generator."""
+    return DATA_GENERATORS[data_type]["generator"].SCHEMA
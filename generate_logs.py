@@ -1,11 +1,14 @@
+import bisect
 import csv
 import random
 import datetime
 import os
 import json
-import requests
 from faker import Faker
 
+from connections import get_session
+from serializers import bulk_body
+
 fake = Faker()
 
 # ------------------------------------------------------------------------------
@@ -22,6 +25,8 @@ KIBANA_PASS = "changeme"
 # 1) Generate Logs -> CSV
 # ------------------------------------------------------------------------------
 log_levels_list = ["INFO", "WARN", "ERROR", "DEBUG"]
+# Cumulative form of the 0.7/0.1/0.1/0.1 level weights, so choices() need not rebuild it per entry
+LEVEL_CUM_WEIGHTS = [0.7, 0.8, 0.9, 1.0]
 sources = ["AuthService", "PaymentService", "DatabaseService", "NotificationService", "CacheService"]
 
 messages = {
@@ -65,35 +70,85 @@ messages = {
     # Additional definitions for DatabaseService, NotificationService, CacheService can be added similarly.
 }
 
-def random_timestamp(start, end):
-    return start + datetime.timedelta(seconds=random.randint(0, int((end - start).total_seconds())))
+def random_timestamp(start, end, rnd=random):
+    return start + datetime.timedelta(seconds=rnd.randint(0, int((end - start).total_seconds())))
+
+def ascending_fractions(n, rnd=random):
+    """Yield ``n`` ascending floats in [0, 1) distributed like ``n`` sorted uniforms.
+
+    Walks the order statistics from the top (the largest of k uniforms below
+    ``top`` is ``top * U ** (1 / k)``) and mirrors them, so values come out in
+    order one at a time without generating and sorting the whole list.
+    """
+    top = 1.0
+    for k in range(n, 0, -1):
+        top *= rnd.random() ** (1.0 / k)
+        yield 1.0 - top
+
+
+def spike_mixture_offsets(n, total_secs, spike_starts, rnd=random, spike_share=0.10):
+    """Yield ``(offset_secs, is_spike)`` in ascending time order.
 
-def generate_logs(num_entries=1000):
+    Offsets follow the mixture the generator always used — ``spike_share`` of
+    entries inside one of the one-hour error spikes, the rest uniform over the
+    range — drawn through its piecewise-linear inverse CDF. ``is_spike`` is
+    decided with the probability that an entry at that time came from a spike.
+    """
+    def mass(x):
+        uniform = min(max(x / total_secs, 0.0), 1.0)
+        spikes = sum(min(max((x - s) / 3600, 0.0), 1.0) for s in spike_starts) / len(spike_starts)
+        return (1 - spike_share) * uniform + spike_share * spikes
+
+    points = sorted({0.0, total_secs, *spike_starts, *(s + 3600 for s in spike_starts)})
+    cdf = [mass(x) for x in points]
+    for q in ascending_fractions(n, rnd):
+        j = min(max(bisect.bisect_right(cdf, q), 1), len(cdf) - 1)
+        width = cdf[j] - cdf[j - 1]
+        offset = points[j - 1] + ((q - cdf[j - 1]) / width if width else 0.0) * (points[j] - points[j - 1])
+        covering = sum(s <= offset <= s + 3600 for s in spike_starts)
+        spike_density = spike_share * covering / (len(spike_starts) * 3600)
+        uniform_density = (1 - spike_share) / total_secs if offset <= total_secs else 0.0
+        yield offset, rnd.random() * (spike_density + uniform_density) < spike_density
+
+
+def generate_logs(num_entries=1000, seed=None):
     """
     Generates log docs in memory, writes them to CSV,
     and returns a list of doc dicts for ingestion.
+    Pass a seed to get the same field values on every run.
     """
+    rnd = random.Random(seed)
+    faker = fake
+    if seed is not None:
+        faker = Faker()
+        faker.seed_instance(seed)
     entries = []
     start_date = datetime.datetime.now() - datetime.timedelta(days=365)
     end_date = datetime.datetime.now()
     error_spike_dates = [start_date + datetime.timedelta(days=30 * i) for i in range(1, 13)]
 
-    for _ in range(num_entries):
-        if random.random() < 0.10:
-            timestamp = random.choice(error_spike_dates) + datetime.timedelta(seconds=random.randint(0, 3600))
+    # Timestamps are drawn in ascending order, so entries need no sorting
+    offsets = spike_mixture_offsets(
+        num_entries,
+        (end_date - start_date).total_seconds(),
+        [(d - start_date).total_seconds() for d in error_spike_dates],
+        rnd,
+    )
+    for offset, is_spike in offsets:
+        timestamp = start_date + datetime.timedelta(seconds=int(offset))
+        if is_spike:
             level = "ERROR"
         else:
-            timestamp = random_timestamp(start_date, end_date)
-            level = random.choices(log_levels_list, weights=[0.7, 0.1, 0.1, 0.1])[0]
+            level = rnd.choices(log_levels_list, cum_weights=LEVEL_CUM_WEIGHTS)[0]
 
-        source = random.choice(sources)
+        source = rnd.choice(sources)
         tmpl_list = messages.get(source, {}).get(level, ["Generic log message"])
-        tmpl = random.choice(tmpl_list)
+        tmpl = rnd.choice(tmpl_list)
 
         msg_data = {
-            "user": fake.user_name(),
-            "ip_address": fake.ipv4(),
-            "session_id": fake.uuid4()
+            "user": faker.user_name(),
+            "ip_address": faker.ipv4(),
+            "session_id": faker.uuid4()
         }
 
         try:
@@ -109,15 +164,13 @@ def generate_logs(num_entries=1000):
         }
         entries.append(doc)
 
-    entries.sort(key=lambda x: x["@timestamp"])
     os.makedirs("output_csv", exist_ok=True)
     csv_path = os.path.join("output_csv", "unstructured-logs-001.csv")
     with open(csv_path, "w", newline="", encoding="utf-8") as f:
         fieldnames = ["@timestamp", "log.level", "source", "message"]
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for e in entries:
-            writer.writerow(e)
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        writer.writerows([e[k] for k in fieldnames] for e in entries)
     print(f"Generated logs -> {csv_path}")
     return entries
 
@@ -125,10 +178,10 @@ def generate_logs(num_entries=1000):
 # 2) Ingest Logs into Elasticsearch
 # ------------------------------------------------------------------------------
 def ingest_logs_to_es(docs):
+    es = get_session(ELASTICSEARCH_HOST, ELASTICSEARCH_USER, ELASTICSEARCH_PASS)
     index_url = f"{ELASTICSEARCH_HOST}/unstructured-logs"
-    resp = requests.put(
+    resp = es.put(
         index_url,
-        auth=(ELASTICSEARCH_USER, ELASTICSEARCH_PASS),
         headers={"Content-Type": "application/json"},
         json={
             "settings": {
@@ -150,17 +203,10 @@ def ingest_logs_to_es(docs):
     else:
         print("Index 'unstructured-logs' created or exists.")
     
-    bulk_data = []
-    for d in docs:
-        bulk_data.append(json.dumps({"index": {}}))
-        bulk_data.append(json.dumps(d))
-    bulk_body = "\n".join(bulk_data) + "\n"
-    
-    resp2 = requests.post(
+    resp2 = es.post(
         f"{index_url}/_bulk",
-        auth=(ELASTICSEARCH_USER, ELASTICSEARCH_PASS),
         headers={"Content-Type": "application/x-ndjson"},
-        data=bulk_body
+        data=bulk_body(docs)
     )
     if resp2.status_code == 200:
         print("Logs successfully ingested into 'unstructured-logs'.")
@@ -396,6 +442,7 @@ def write_and_import_so(data_view_obj, discover_objs):
     print(f"Saved objects NDJSON written to {ndjson_path}")
     
     # Import into Kibana with correct headers and format
+    kibana = get_session(KIBANA_HOST, KIBANA_USER, KIBANA_PASS)
     try:
         with open(ndjson_path, "rb") as f:
             files = {
@@ -406,9 +453,8 @@ def write_and_import_so(data_view_obj, discover_objs):
                 "kbn-version": "8.0.0"  # Add version header for compatibility
             }
             
-            resp = requests.post(
+            resp = kibana.post(
                 f"{KIBANA_HOST}/api/saved_objects/_import?overwrite=true",
-                auth=(KIBANA_USER, KIBANA_PASS),
                 headers=headers,
                 files=files
             )
@@ -432,9 +478,8 @@ def write_and_import_so(data_view_obj, discover_objs):
                 }
                 headers = {"kbn-xsrf": "true"}
                 
-                resp2 = requests.post(
+                resp2 = kibana.post(
                     f"{KIBANA_HOST}/api/saved_objects/_import?overwrite=true",
-                    auth=(KIBANA_USER, KIBANA_PASS),
                     headers=headers,
                     files=files
                 )
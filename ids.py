@@ -0,0 +1,103 @@
+"""Bulk ID generation from one shared random byte buffer.
+
+Generators need several IDs per document (trace, span, user, request,
+container …). Building each one with ``fake.uuid4()`` constructs a UUID object
+and formats it, and callers then sliced it for shorter IDs, leaving dashes in
+the wrong places. IdFactory instead hex-encodes slices of a large random buffer,
+so a whole batch of IDs costs one ``hex()`` call plus string slicing.
+
+Formats are pluggable: each is a byte width plus a renderer that turns the hex
+string for ``n`` IDs into a list of ``n`` strings. Built-in formats:
+
+    trace      32 hex chars, W3C trace-context trace-id (never all zeros)
+    span       16 hex chars, W3C trace-context parent-id / span-id
+    uuid4      RFC 4122 version 4 UUID with dashes
+    container  12 hex chars, like a short Docker container ID
+    short       8 hex chars, e.g. Kubernetes pod name suffixes
+"""
+
+import os
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+_VARIANT = {c: "89ab"[int(c, 16) & 3] for c in "0123456789abcdef"}
+
+
+def _render_hex(width):
+    zero = "0" * width
+    nonzero = zero[:-1] + "1"
+
+    def render(hex_str, n):
+        ids = [hex_str[i:i + width] for i in range(0, n * width, width)]
+        if zero in ids:  # all-zero IDs are invalid in W3C trace context
+            ids = [nonzero if i == zero else i for i in ids]
+        return ids
+    return render
+
+
+def _render_uuid4(hex_str, n):
+    variant = _VARIANT
+    return [
+        f"{h[0:8]}-{h[8:12]}-4{h[13:16]}-{variant[h[16]]}{h[17:20]}-{h[20:32]}"
+        for h in (hex_str[i:i + 32] for i in range(0, n * 32, 32))
+    ]
+
+
+# name -> (bytes per ID, renderer)
+ID_FORMATS = {
+    "trace": (16, _render_hex(32)),
+    "span": (8, _render_hex(16)),
+    "uuid4": (16, _render_uuid4),
+    "container": (6, _render_hex(12)),
+    "short": (4, _render_hex(8)),
+}
+
+
+def register_id_format(name, nbytes, render):
+    """Add or replace an ID format.
+
+    ``render(hex_str, n)`` receives ``2 * nbytes * n`` lowercase hex chars and
+    must return a list of ``n`` ID strings.
+    """
+    ID_FORMATS[name] = (nbytes, render)
+
+
+class IdFactory:
+    """Produces IDs in bulk from a refillable random buffer.
+
+    ``random_bytes`` is any callable returning that many random bytes — e.g.
+    ``os.urandom`` or a NumPy ``Generator.bytes`` for reproducible output.
+    """
+
+    def __init__(self, random_bytes=None, buffer_size=DEFAULT_BUFFER_SIZE):
+        self._random_bytes = random_bytes or os.urandom
+        self._buffer_size = buffer_size
+        self._buf = memoryview(b"")
+        self._pos = 0
+
+    def _take(self, nbytes):
+        if self._pos + nbytes > len(self._buf):
+            self._buf = memoryview(self._random_bytes(max(self._buffer_size, nbytes)))
+            self._pos = 0
+        chunk = self._buf[self._pos:self._pos + nbytes]
+        self._pos += nbytes
+        return chunk
+
+    def batch(self, fmt, n):
+        """Return ``n`` IDs in format ``fmt``."""
+        if n <= 0:
+            return []
+        nbytes, render = ID_FORMATS[fmt]
+        return render(self._take(nbytes * n).hex(), n)
+
+    def new(self, fmt):
+        return self.batch(fmt, 1)[0]
+
+    def trace_id(self):
+        return self.new("trace")
+
+    def span_id(self):
+        return self.new("span")
+
+    def uuid4(self):
+        return self.new("uuid4")
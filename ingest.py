@@ -0,0 +1,588 @@
+"""Concurrent Elasticsearch ``_bulk`` ingestion.
+
+A BulkIndexer runs a pool of sender threads that post bulk bodies over the
+shared pooled session (connections.py), so up to ``senders`` requests are in
+flight at once while the caller keeps generating. The caller submits
+ready-made bodies into a bounded queue; once every sender is busy and the
+queue is full, ``submit()`` blocks until Elasticsearch catches up, so memory
+stays bounded at about ``senders + queue_size`` bodies.
+
+Requests are sized in bytes, not documents: the submitted bodies (one per
+generated shard) are joined or cut at document boundaries into bodies of about
+``bulk_mb``, since 5,000 metrics documents and 5,000 APM documents with stack
+traces differ in size tenfold. With ``bulk_adaptive`` a BulkSizer moves that
+target between ``bulk_min_mb`` and ``bulk_max_mb``: it halves after a 429
+rejection, shrinks while requests take longer than ``bulk_target_latency``
+and grows while full-size requests come back in under half of it.
+
+Documents are never dropped silently (BulkSender): when a request fails to
+connect or times out, or it or some of its items are rejected with 429 or 503,
+only those documents are resent, after an exponential backoff with full
+jitter. The retries of a job share a budget (past a few retries, at most
+``bulk_retry_budget`` resent documents per document sent), so an overloaded
+cluster is waited out but a dead one fails the job. Documents Elasticsearch
+rejects for good (e.g. mapping errors), or that are still rejected after
+``bulk_max_retries``, are appended to ``<dead_letter_dir>/<index>-dead-letter.ndjson``
+and the job carries on. The default directory, ``output_csv/dead-letter``, is
+out of reach of the output cleanup.
+
+Settings come from ``log_generation`` in the config:
+
+    ==================  =======  ==============================================
+    key                 default  meaning
+    ==================  =======  ==============================================
+    ingest_senders      4        bulk requests in flight at once
+    ingest_queue_size   0        bodies waiting for a sender (0 = 2 x senders)
+    ingest_engine       threads  ``asyncio`` sends from one shared event loop
+                                 instead of sender threads (async_ingest.py)
+    bulk_mb             5        target size of a bulk request body
+    bulk_adaptive       false    adapt the target to latency and rejections
+    bulk_min_mb         1        adaptive lower bound
+    bulk_max_mb         32       adaptive upper bound
+    bulk_target_latency 2.0      seconds; slower requests shrink the target
+    bulk_max_retries    8        resends of one document before dead-lettering
+    bulk_retry_base     0.5      seconds; backoff before the first resend
+    bulk_retry_max      30       seconds; longest backoff
+    bulk_retry_budget   0.2      resent documents allowed per document sent
+    dead_letter_dir     (above)  where dead-letter files go
+    ==================  =======  ==============================================
+
+Keep ``http.pool_maxsize`` at least ``ingest_senders``, or the extra senders
+open a fresh connection per request.
+"""
+
+import datetime
+import itertools
+import json
+import os
+import queue
+import random
+import threading
+import time
+
+import numpy as np
+import requests
+
+from connections import es_session
+from serializers import dumps
+from sinks import DEAD_LETTER_SUFFIX, OUTPUT_DIR
+
+DEFAULT_SENDERS = 4
+DEFAULT_QUEUE_SIZE = 0  # 0 = twice the number of senders
+ENGINES = ("threads", "asyncio")
+DEFAULT_ENGINE = "threads"
+
+DEFAULT_BULK_MB = 5
+DEFAULT_BULK_MIN_MB = 1
+DEFAULT_BULK_MAX_MB = 32
+DEFAULT_BULK_TARGET_LATENCY = 2.0  # seconds
+MB = 1024 * 1024
+
+RETRY_STATUSES = frozenset({429, 503})
+DEFAULT_MAX_RETRIES = 8
+DEFAULT_RETRY_BASE = 0.5  # seconds
+DEFAULT_RETRY_MAX = 30.0  # seconds
+DEFAULT_RETRY_BUDGET = 0.2  # resent documents per document sent
+MIN_RETRY_BUDGET = 10  # retries every job may make before the budget applies
+DEFAULT_DEAD_LETTER_DIR = os.path.join(OUTPUT_DIR, "dead-letter")
+
+NDJSON_HEADERS = {"Content-Type": "application/x-ndjson"}
+
+
+def ingest_options(config):
+    """``(senders, queue_size)`` from ``log_generation`` config."""
+    opts = (config or {}).get("log_generation", {})
+    senders = max(1, int(opts.get("ingest_senders") or DEFAULT_SENDERS))
+    queue_size = int(opts.get("ingest_queue_size") or DEFAULT_QUEUE_SIZE) or 2 * senders
+    return senders, queue_size
+
+
+def ingest_engine(config):
+    """``log_generation.ingest_engine``, validated."""
+    engine = (config or {}).get("log_generation", {}).get("ingest_engine") or DEFAULT_ENGINE
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown ingest engine {engine!r}; choose from {', '.join(ENGINES)}")
+    return engine
+
+
+def bulk_sizer(config):
+    """A BulkSizer set up from ``log_generation`` config."""
+    opts = (config or {}).get("log_generation", {})
+    return BulkSizer(
+        float(opts.get("bulk_mb") or DEFAULT_BULK_MB) * MB,
+        adaptive=bool(opts.get("bulk_adaptive", False)),
+        min_bytes=float(opts.get("bulk_min_mb") or DEFAULT_BULK_MIN_MB) * MB,
+        max_bytes=float(opts.get("bulk_max_mb") or DEFAULT_BULK_MAX_MB) * MB,
+        target_latency=float(opts.get("bulk_target_latency") or DEFAULT_BULK_TARGET_LATENCY),
+    )
+
+
+def retry_policy(config):
+    """A RetryPolicy set up from ``log_generation`` config."""
+    opts = (config or {}).get("log_generation", {})
+    return RetryPolicy(
+        max_retries=int(opts.get("bulk_max_retries", DEFAULT_MAX_RETRIES)),
+        base=float(opts.get("bulk_retry_base") or DEFAULT_RETRY_BASE),
+        cap=float(opts.get("bulk_retry_max") or DEFAULT_RETRY_MAX),
+        budget=float(opts.get("bulk_retry_budget", DEFAULT_RETRY_BUDGET)),
+    )
+
+
+def dead_letter_path(config, index):
+    """The dead-letter file for ``index``."""
+    directory = ((config or {}).get("log_generation", {}).get("dead_letter_dir")
+                 or DEFAULT_DEAD_LETTER_DIR)
+    return os.path.join(directory, index + DEAD_LETTER_SUFFIX)
+
+
+def open_indexer(config, index, on_ack=None):
+    """A BulkIndexer, or a LoopIndexer with the asyncio engine, set up from config."""
+    senders, queue_size = ingest_options(config)
+    sender = BulkSender(config, index)
+    if ingest_engine(config) == "asyncio":
+        from async_ingest import LoopIndexer
+        return LoopIndexer(config, sender, senders, queue_size, on_ack=on_ack)
+    return BulkIndexer(sender, senders, queue_size, on_ack=on_ack)
+
+
+def plan_bodies(ends, max_bytes, max_docs=None):
+    """``[(start, end, docs)]`` byte ranges of about ``max_bytes`` (and at most ``max_docs``),
+    given the offsets just past each document (a sorted int array)."""
+    plan = []
+    start, i = 0, 0
+    while i < len(ends):
+        j = int(np.searchsorted(ends, start + max_bytes, side="right"))
+        if max_docs:
+            j = min(j, i + max_docs)
+        j = max(j, i + 1)
+        end = int(ends[j - 1])
+        plan.append((start, end, j - i))
+        start, i = end, j
+    return plan
+
+
+def split_body(body, max_bytes, docs=None):
+    """Cut a bulk body (an action and a source line per document) into
+    ``[(body, docs)]`` of about ``max_bytes``; a larger document goes alone."""
+    if len(body) <= max_bytes:
+        if docs is None:
+            docs = body.count(b"\n") // 2
+        return [(body, docs)] if body else []
+    ends = np.flatnonzero(np.frombuffer(body, dtype=np.uint8) == 10)[1::2] + 1
+    return [(body[start:end], docs) for start, end, docs in plan_bodies(ends, max_bytes)]
+
+
+def is_rejection(status, content):
+    """True if a ``_bulk`` response says the cluster is overloaded (HTTP or item 429)."""
+    if status == 429:
+        return True
+    return b'"errors":false' not in content[:64] and b'"status":429' in content
+
+
+def bulk_outcome(status, content, body, docs):
+    """Sort the documents of ``body`` by a ``_bulk`` response to it.
+
+    Returns ``(accepted, retry, failed)``: the number of documents accepted,
+    ``(body, docs)`` of those to resend (or None), and ``[(status, error,
+    source line)]`` of those rejected for good. A non-retryable HTTP error
+    fails the whole request and raises.
+    """
+    if status is None or status in RETRY_STATUSES:  # None: no response at all
+        return 0, (body, docs), []
+    if status != 200:
+        raise Exception(f"Bulk ingest HTTP error: {content[:500].decode(errors='replace')}")
+    # "errors" comes first or second in every _bulk response; skip the JSON parse when false
+    if b'"errors":false' in content[:64]:
+        return docs, None, []
+    result = json.loads(content)
+    if not result.get("errors"):
+        return docs, None, []
+    lines = bytes(body).split(b"\n")
+    retry, failed = [], []
+    for i, item in enumerate(result.get("items", [])):
+        info = next(iter(item.values()), {})
+        if not info.get("error"):
+            continue
+        if info.get("status") in RETRY_STATUSES:
+            retry += lines[2 * i:2 * i + 2]
+        else:
+            failed.append((info.get("status"), info["error"], lines[2 * i + 1]))
+    accepted = docs - len(retry) // 2 - len(failed)
+    return accepted, ((b"\n".join(retry) + b"\n", len(retry) // 2) if retry else None), failed
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, and a retry budget shared by every
+    request of a job: past MIN_RETRY_BUDGET retries, the documents resent may
+    be at most ``budget`` times the documents sent. Safe to share between
+    sender threads."""
+
+    def __init__(self, max_retries=DEFAULT_MAX_RETRIES, base=DEFAULT_RETRY_BASE,
+                 cap=DEFAULT_RETRY_MAX, budget=DEFAULT_RETRY_BUDGET):
+        self.max_retries = max_retries
+        self.base = base
+        self.cap = cap
+        self.budget = budget
+        self.docs = 0
+        self.retries = 0
+        self.retried_docs = 0
+        self._lock = threading.Lock()
+
+    def sent(self, docs):
+        """Count a new body (not a retry) of ``docs`` documents towards the budget."""
+        with self._lock:
+            self.docs += docs
+
+    def backoff(self, attempt, docs):
+        """Seconds to wait before resending ``docs`` documents for the ``attempt + 1``-th
+        time, or None once they have had ``max_retries``. Raises when the budget is spent."""
+        if attempt >= self.max_retries:
+            return None
+        with self._lock:
+            if (self.retries >= MIN_RETRY_BUDGET
+                    and self.retried_docs + docs > self.budget * self.docs):
+                raise Exception(f"Bulk ingest: retry budget exhausted ({self.retried_docs} of "
+                                f"{self.docs} documents resent); the cluster keeps rejecting")
+            self.retries += 1
+            self.retried_docs += docs
+        return random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+
+
+class DeadLetterFile:
+    """Appends the documents Elasticsearch rejected for good to an NDJSON file,
+    one ``{"@timestamp", "index", "status", "error", "document"}`` object per
+    line. The file is created on the first failure."""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def write(self, index, failures):
+        """Append ``[(status, error, source line)]`` rejected by ``index``."""
+        stamp = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="milliseconds")
+        head = b'{"@timestamp":' + dumps(stamp) + b',"index":' + dumps(index)
+        data = b"".join(head + b',"status":' + dumps(status) + b',"error":' + dumps(error)
+                        + b',"document":' + bytes(source) + b"}\n"
+                        for status, error, source in failures)
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "ab") as f:
+                f.write(data)
+            self.count += len(failures)
+
+
+class BulkSender:
+    """Sends bulk bodies to one index and sees every document through: accepted,
+    resent after a backoff (429 / 503), or written to the dead-letter file.
+
+    Shared by the senders of an indexer, so the sizer, the retry budget and
+    the dead-letter file are per job. The retry loop itself is ``attempts()``,
+    whatever the transport: ``send()`` runs it over the pooled requests session
+    (or any ``request`` callable, as replay does), async_ingest.send() over aiohttp.
+    """
+
+    def __init__(self, config, index, sizer=None, retry=None, dead_letter=None, timeout=None):
+        self.config = config
+        self.index = index
+        self.url = f"{config['elasticsearch']['host']}/{index}/_bulk"
+        self.sizer = sizer or bulk_sizer(config)
+        self.retry = retry or retry_policy(config)
+        self.dead_letter = dead_letter or DeadLetterFile(dead_letter_path(config, index))
+        self.timeout = timeout
+
+    def send(self, body, docs, stop=None, request=None):
+        """POST ``body`` until each document is accepted or dead-lettered; returns
+        the number accepted. ``stop`` (a threading.Event) cuts a backoff short,
+        leaving the rest unsent. ``request(body) -> (status, content)`` replaces
+        the pooled session (``status`` None when there was no response)."""
+        request = request or self.post
+        steps = self.attempts(body, docs)
+        reply = None
+        while True:
+            try:
+                action, value = steps.send(reply)
+            except StopIteration as done:
+                return done.value
+            if action == "post":
+                reply = request(value)
+            elif stop is None:
+                time.sleep(value)
+                reply = True
+            else:
+                reply = not stop.wait(value)
+
+    def post(self, body):
+        """One POST over the pooled session: ``(status, content)``, or ``(None, b"")``
+        when the connection failed or timed out."""
+        kwargs = {"timeout": self.timeout} if self.timeout else {}
+        try:
+            resp = es_session(self.config).post(self.url, headers=NDJSON_HEADERS, data=body,
+                                                **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            return None, b""
+        return resp.status_code, resp.content
+
+    def attempts(self, body, docs):
+        """The retry loop, as a generator driven by a transport.
+
+        It yields ``("post", body)`` and must be sent that request's ``(status,
+        content)``; between attempts it yields ``("wait", seconds)`` and must be
+        sent True once the backoff is over, or False to stop there. Returns the
+        number of documents accepted.
+        """
+        accepted = 0
+        self.retry.sent(docs)
+        for attempt in itertools.count():
+            started = time.monotonic()
+            status, content = yield "post", body
+            done, retry = self.outcome(body, docs, status, content, time.monotonic() - started)
+            accepted += done
+            if retry is None:
+                return accepted
+            body, docs = retry
+            delay = self.retry.backoff(attempt, docs)
+            if delay is None:
+                self.give_up(body, attempt + 1)
+                return accepted
+            if not (yield "wait", delay):
+                return accepted
+
+    def outcome(self, body, docs, status, content, seconds):
+        """``(accepted, retry)`` for one response (``status`` None: the connection
+        failed or timed out, so all of it is retried); dead-letters the permanent failures."""
+        if status is not None:
+            self.sizer.observe(len(body), docs, seconds, rejected=is_rejection(status, content))
+        accepted, retry, failed = bulk_outcome(status, content, body, docs)
+        if failed:
+            self.dead_letter.write(self.index, failed)
+        return accepted, retry
+
+    def give_up(self, body, attempts):
+        """Dead-letter the documents of ``body``, still rejected after ``attempts``."""
+        error = {"type": "retries_exhausted",
+                 "reason": f"still rejected after {attempts} attempts"}
+        self.dead_letter.write(self.index, [(None, error, source)
+                                            for source in bytes(body).split(b"\n")[1::2]])
+
+    def stats(self):
+        """The sizer's ``stats()`` plus the retry and dead-letter counts, for job status."""
+        return {**self.sizer.stats(), "retries": self.retry.retries,
+                "retried_docs": self.retry.retried_docs,
+                "dead_lettered": self.dead_letter.count}
+
+    def describe(self):
+        """``stats()`` as a short phrase for progress messages."""
+        text = self.sizer.describe()
+        if self.retry.retries:
+            text += f", {self.retry.retries} retries"
+        if self.dead_letter.count:
+            text += f", {self.dead_letter.count} dead-lettered"
+        return text
+
+
+class BulkSizer:
+    """The target size of a bulk request body, fixed or (``adaptive``) steered
+    by ``observe()``-d responses. Safe to share between sender threads."""
+
+    def __init__(self, target_bytes=DEFAULT_BULK_MB * MB, adaptive=False,
+                 min_bytes=DEFAULT_BULK_MIN_MB * MB, max_bytes=DEFAULT_BULK_MAX_MB * MB,
+                 target_latency=DEFAULT_BULK_TARGET_LATENCY):
+        self.adaptive = adaptive
+        self.min_bytes = int(min(min_bytes, target_bytes))
+        self.max_bytes = int(max(max_bytes, target_bytes))
+        self.target = int(target_bytes)
+        self.target_latency = target_latency
+        self.last = None  # (bytes, docs, seconds) of the latest response
+        self._lock = threading.Lock()
+
+    def observe(self, nbytes, docs, seconds, rejected=False):
+        """Record a response to a ``nbytes`` body and adapt the target."""
+        with self._lock:
+            self.last = (nbytes, docs, seconds)
+            if not self.adaptive:
+                return
+            if rejected:
+                self.target = max(self.min_bytes, self.target // 2)
+            elif seconds > self.target_latency:
+                self.target = max(self.min_bytes, int(self.target * 0.8))
+            elif seconds < self.target_latency / 2 and nbytes >= self.target * 0.9:
+                self.target = min(self.max_bytes, int(self.target * 1.2))
+
+    def stats(self):
+        """The target and the latest request, for job status."""
+        with self._lock:
+            nbytes, docs, seconds = self.last or (0, 0, 0.0)
+            return {
+                "target_mb": round(self.target / MB, 2),
+                "adaptive": self.adaptive,
+                "last_mb": round(nbytes / MB, 2),
+                "last_docs": docs,
+                "last_ms": int(seconds * 1000),
+            }
+
+    def describe(self):
+        """``stats()`` as a short phrase for progress messages."""
+        s = self.stats()
+        text = f"bulk target {s['target_mb']} MB"
+        if s["last_docs"]:
+            text += f", last {s['last_mb']} MB / {s['last_docs']} docs in {s['last_ms']} ms"
+        return text
+
+
+class BulkBatcher:
+    """Regroups submitted bulk bodies into bodies of about the sizer's target."""
+
+    def __init__(self, sizer):
+        self.sizer = sizer
+        self._pending = []
+        self._pending_bytes = 0
+        self._pending_docs = 0
+
+    def feed(self, body, docs):
+        """Take ``body``; returns the ``[(body, docs)]`` now ready to send."""
+        self._pending.append(body)
+        self._pending_bytes += len(body)
+        self._pending_docs += docs
+        if self._pending_bytes < self.sizer.target:
+            return []
+        ready = self.flush()
+        if ready and len(ready[-1][0]) < self.sizer.target:
+            last, last_docs = ready.pop()  # a short tail waits for the next body
+            self._pending = [last]
+            self._pending_bytes, self._pending_docs = len(last), last_docs
+        return ready
+
+    def flush(self):
+        """Everything still pending, cut to size."""
+        if not self._pending:
+            return []
+        body = self._pending[0] if len(self._pending) == 1 else b"".join(self._pending)
+        docs = self._pending_docs
+        self._pending, self._pending_bytes, self._pending_docs = [], 0, 0
+        return split_body(body, self.sizer.target, docs)
+
+
+def create_index(config, index, mapping):
+    """Create ``index`` with ``mapping``; an index that already exists is fine."""
+    resp = es_session(config).put(
+        f"{config['elasticsearch']['host']}/{index}",
+        headers={"Content-Type": "application/json"},
+        json={"settings": {"number_of_shards": 1, "number_of_replicas": 0},
+              "mappings": mapping},
+        timeout=30,
+    )
+    if resp.status_code == 200:
+        return
+    if resp.status_code == 400:
+        try:
+            error = resp.json().get("error", {})
+            error_type = error.get("type") if isinstance(error, dict) else None
+            if not error_type:
+                root_cause = error.get("root_cause", []) if isinstance(error, dict) else []
+                if root_cause and isinstance(root_cause[0], dict):
+                    error_type = root_cause[0].get("type")
+            if error_type in ("resource_already_exists_exception", "index_already_exists_exception"):
+                return
+        except ValueError:
+            pass
+    raise Exception(f"Index creation error: {resp.text[:300]}")
+
+
+class BulkIndexer:
+    """Posts bulk bodies through ``sender`` (a BulkSender) from ``senders`` threads.
+
+    Submitted bodies are regrouped to the sender's target size (see
+    BulkBatcher). ``acked`` counts the documents Elasticsearch has accepted so
+    far, and ``on_ack(acked)`` (if given) is called after each body is done,
+    one call at a time. A request that fails for good (an HTTP error other than
+    429 / 503, or the retry budget running out) stops the indexer: bodies still
+    queued are dropped, and the error is raised from the next ``submit()`` or
+    from ``close()``.
+    """
+
+    def __init__(self, sender, senders=DEFAULT_SENDERS, queue_size=None, on_ack=None):
+        self.sender = sender
+        self.on_ack = on_ack
+        self.acked = 0
+        self.error = None
+        self._batcher = BulkBatcher(sender.sizer)
+        self._queue = queue.Queue(maxsize=queue_size or 2 * senders)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._finished = False
+        self._threads = [threading.Thread(target=self._send_loop, daemon=True,
+                                          name=f"bulk-sender-{i}")
+                         for i in range(senders)]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def sizer(self):
+        return self.sender.sizer
+
+    def submit(self, body, docs):
+        """Queue ``body`` (``docs`` documents); blocks while the queue is full."""
+        if self._stopped.is_set():
+            self._raise()
+            raise RuntimeError("BulkIndexer has been aborted")
+        for item in self._batcher.feed(body, docs):
+            self._queue.put(item)
+
+    def close(self):
+        """Wait for every queued body to be acknowledged; returns ``acked``."""
+        if not self._stopped.is_set():
+            for item in self._batcher.flush():
+                self._queue.put(item)
+        self._finish()
+        self._raise()
+        return self.acked
+
+    def abort(self):
+        """Drop queued bodies and stop once the requests in flight return."""
+        self._stopped.set()
+        self._finish()
+
+    def _finish(self):
+        if self._finished:
+            return
+        self._finished = True
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def _raise(self):
+        if self.error is not None:
+            raise self.error
+
+    def _send_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self._stopped.is_set():
+                continue
+            body, docs = item
+            try:
+                accepted = self.sender.send(body, docs, stop=self._stopped)
+            except Exception as exc:
+                with self._lock:
+                    if self.error is None:
+                        self.error = exc
+                self._stopped.set()
+                continue
+            with self._lock:
+                self.acked += accepted
+                if self.on_ack:
+                    self.on_ack(self.acked)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
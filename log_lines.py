@@ -0,0 +1,161 @@
+"""Rendering generated entries as plain-text log lines.
+
+File-based shippers (Filebeat, Elastic Agent) read text files, so this turns
+the columns of a shard into one line per document, in one of three styles:
+
+``log``
+    ``<timestamp> <level> <source> <message>``, e.g.
+    ``2025-01-01T12:00:00.000Z ERROR PaymentService Payment declined ...``.
+    Types without a ``message`` field put their other fields in the message
+    as ``key=value`` pairs.
+``syslog``
+    RFC 5424: ``<PRI>1 <timestamp> <host> <app> <procid> - - <message>``, with
+    the priority taken from the level (facility "user").
+``access``
+    Apache / nginx "combined" access log lines, for the data types with HTTP
+    fields (``network_traffic``, ``apm_data``). Documents without an HTTP
+    request (e.g. a DNS flow) have no access log line and are skipped.
+
+The level, source, host and message come from the first field of a list of
+candidates that the data type's Schema declares, so every type renders
+without per-type code. Values never span lines: newlines in messages are
+escaped.
+"""
+
+import json
+
+# Output styles; each is an output format of its own in sinks.FORMATS
+LOG_STYLES = ("log", "syslog", "access")
+
+LEVEL_FIELDS = ("log.level", "alert.severity", "event.severity")
+SOURCE_FIELDS = ("source", "service.name", "labels.service", "agent.name")
+HOST_FIELDS = ("host.name", "labels.host", "labels.instance",
+               "resource.attributes.host.name")
+MESSAGE_FIELDS = ("message", "annotations.summary")
+PROCESS_FIELDS = ("process.pid",)
+CLIENT_FIELDS = ("source.ip",)
+USER_FIELDS = ("user.name", "user.id")
+URL_FIELDS = ("http.url",)
+BYTES_FIELDS = ("network.bytes",)
+
+# RFC 5424 severities by (lower-cased) level / severity value
+SYSLOG_SEVERITY = {
+    "emergency": 0, "alert": 1, "critical": 2, "fatal": 2,
+    "error": 3, "high": 3, "warn": 4, "warning": 4, "medium": 4,
+    "notice": 5, "low": 5, "info": 6, "debug": 7,
+}
+SYSLOG_FACILITY = 1  # user-level messages
+
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun",
+           "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+def supports_style(schema, style):
+    """True if documents of ``schema`` can be rendered in ``style``."""
+    return style != "access" or "http.method" in schema
+
+
+def line_renderer(schema, style="log"):
+    """A function turning columns in ``schema`` order into ``(text, lines)``.
+
+    ``text`` holds one newline-terminated line per rendered document; absent
+    values are ``None``, as in RollingSink's columns.
+    """
+    if style not in LOG_STYLES:
+        raise ValueError(f"Unknown log style {style!r}; choose from {', '.join(LOG_STYLES)}")
+    if not supports_style(schema, style):
+        raise ValueError("Access log lines need a data type with HTTP fields "
+                         "(network_traffic or apm_data)")
+    index = {name: i for i, name in enumerate(schema.names)}
+
+    def pick(candidates):
+        return next((index[name] for name in candidates if name in index), None)
+
+    if style == "access":
+        return _access_renderer(index, pick)
+
+    time_i = index.get("@timestamp")
+    level_i = pick(LEVEL_FIELDS)
+    error_i = index.get("error.type")
+    source_i = pick(SOURCE_FIELDS)
+    message_i = pick(MESSAGE_FIELDS)
+    used = {time_i, level_i, source_i}
+    extra = [(name + "=", i) for name, i in index.items() if i not in used]
+
+    def fields(row):
+        if level_i is not None and row[level_i] is not None:
+            level = str(row[level_i]).upper()
+        else:
+            level = "ERROR" if error_i is not None and row[error_i] is not None else "INFO"
+        source = row[source_i] if source_i is not None and row[source_i] is not None else "-"
+        if message_i is not None and row[message_i] is not None:
+            message = str(row[message_i])
+            if "\n" in message:
+                message = message.replace("\n", "\\n")
+        else:
+            message = " ".join(key + _logfmt(row[i]) for key, i in extra if row[i] is not None)
+        stamp = row[time_i] if time_i is not None else "-"
+        return stamp, level, str(source).replace(" ", "_"), message
+
+    if style == "log":
+        def render(columns):
+            lines = [f"{stamp} {level} {source} {message}\n"
+                     for stamp, level, source, message in map(fields, zip(*columns))]
+            return "".join(lines), len(lines)
+        return render
+
+    host_i = pick(HOST_FIELDS)
+    pid_i = pick(PROCESS_FIELDS)
+
+    def render(columns):
+        lines = []
+        for row in zip(*columns):
+            stamp, level, app, message = fields(row)
+            pri = SYSLOG_FACILITY * 8 + SYSLOG_SEVERITY.get(level.lower(), 6)
+            host = row[host_i] if host_i is not None and row[host_i] is not None else "-"
+            pid = row[pid_i] if pid_i is not None and row[pid_i] is not None else "-"
+            lines.append(f"<{pri}>1 {stamp} {host} {app[:48]} {pid} - - {message}\n")
+        return "".join(lines), len(lines)
+    return render
+
+
+def _access_renderer(index, pick):
+    time_i = index["@timestamp"]
+    method_i = index["http.method"]
+    status_i = index.get("http.status_code")
+    agent_i = index.get("user.agent")
+    client_i = pick(CLIENT_FIELDS)
+    user_i = pick(USER_FIELDS)
+    url_i = pick(URL_FIELDS)
+    bytes_i = pick(BYTES_FIELDS)
+
+    def value(row, i):
+        return row[i] if i is not None and row[i] is not None else "-"
+
+    def render(columns):
+        lines = []
+        for row in zip(*columns):
+            method = row[method_i]
+            if method is None:
+                continue
+            url = value(row, url_i)
+            path = "/" + url.split("://", 1)[-1].partition("/")[2] if url != "-" else "/"
+            lines.append(
+                f'{value(row, client_i)} - {value(row, user_i)} [{_clf_time(row[time_i])}] '
+                f'"{method} {path} HTTP/1.1" {value(row, status_i)} {value(row, bytes_i)} '
+                f'"-" "{value(row, agent_i)}"\n'
+            )
+        return "".join(lines), len(lines)
+    return render
+
+
+def _clf_time(stamp):
+    """``2025-01-02T03:04:05.000Z`` -> ``02/Jan/2025:03:04:05 +0000``."""
+    return f"{stamp[8:10]}/{_MONTHS[int(stamp[5:7]) - 1]}/{stamp[:4]}:{stamp[11:19]} +0000"
+
+
+def _logfmt(value):
+    text = value if isinstance(value, str) else json.dumps(value)
+    if not text or any(c in text for c in ' "=\n'):
+        return json.dumps(text)
+    return text
@@ -0,0 +1,94 @@
+"""Pre-compiled message templates with lazily produced placeholder values.
+
+Log message templates such as ``"User '{user}' logged in from {ip_address}"``
+are parsed once into literal segments and placeholder names. Rendering then
+asks a producer for each placeholder the template actually references, so a
+template that uses only ``{user}`` never pays for generating an IP address,
+two UUIDs and a handful of random numbers it would throw away.
+
+Producers are plain callables keyed by placeholder name: zero-argument for
+render_with(), or ``producer(n) -> list`` for render_batch().
+"""
+
+import string
+
+_FORMATTER = string.Formatter()
+_CONVERSIONS = {"r": repr, "s": str, "a": ascii}
+
+
+class MessageTemplate:
+    """A ``str.format``-style template compiled into (literal, field, spec, conversion) segments."""
+
+    __slots__ = ("source", "segments", "fields")
+
+    def __init__(self, source, segments=None):
+        self.source = source
+        if segments is None:
+            segments = [
+                (literal, field, spec or "", conversion)
+                for literal, field, spec, conversion in _FORMATTER.parse(source)
+            ]
+        self.segments = tuple(segments)
+        self.fields = tuple(dict.fromkeys(f for _, f, _, _ in self.segments if f is not None))
+
+    def __repr__(self):
+        return f"MessageTemplate({self.source!r})"
+
+    def partial(self, **values):
+        """Return a new template with ``values`` folded into its literal text."""
+        segments = []
+        pending = ""
+        for literal, field, spec, conversion in self.segments:
+            pending += literal
+            if field is not None and field in values:
+                pending += _format_value(values[field], spec, conversion)
+                continue
+            segments.append((pending, field, spec, conversion))
+            pending = ""
+        if pending:
+            segments.append((pending, None, "", None))
+        return MessageTemplate(self.source, segments)
+
+    def render(self, values):
+        """Render with a mapping holding at least every name in ``fields``."""
+        if not self.fields:
+            return "".join(literal for literal, _, _, _ in self.segments)
+        out = []
+        for literal, field, spec, conversion in self.segments:
+            out.append(literal)
+            if field is not None:
+                value = values[field]
+                out.append(_format_value(value, spec, conversion)
+                           if spec or conversion else str(value))
+        return "".join(out)
+
+    def render_with(self, producers):
+        """Render calling ``producers[name]()`` once for each referenced placeholder."""
+        return self.render({f: producers[f]() for f in self.fields})
+
+    def render_batch(self, batch_producers, n):
+        """Render ``n`` messages, drawing each referenced placeholder as one column."""
+        if not self.fields:
+            return [self.render({})] * n
+        columns = [batch_producers[f](n) for f in self.fields]
+        fields = self.fields
+        return [self.render(dict(zip(fields, values))) for values in zip(*columns)]
+
+    def missing(self, available):
+        """Placeholder names not present in ``available``."""
+        return [f for f in self.fields if f not in available]
+
+
+def _format_value(value, spec, conversion):
+    if conversion:
+        value = _CONVERSIONS[conversion](value)
+    return format(value, spec)
+
+
+def compile_templates(tree):
+    """Compile every string in a nested dict/list structure of templates."""
+    if isinstance(tree, dict):
+        return {k: compile_templates(v) for k, v in tree.items()}
+    if isinstance(tree, (list, tuple)):
+        return [compile_templates(v) for v in tree]
+    return MessageTemplate(tree)
@@ -0,0 +1,187 @@
+"""Pre-generated Faker value pools.
+
+Faker providers are slow (tens of microseconds per call), and generators used
+to call them several times per document. A pool holds a large list of values
+for one provider, and every draw is a single random index pick. Slots are
+filled the first time they are picked, so a small job (or a freshly spawned
+worker) only pays for the values it draws rather than for the whole pool.
+
+Pool size bounds the cardinality of a field (e.g. how many distinct host names
+appear in a dataset); ``refresh_every`` rebuilds a pool after that many draws
+so very long runs keep introducing new values.
+
+Seeded generators use seeded pools: the values are a function of (seed,
+provider, epoch), where the epoch is the position in the job divided by
+``refresh_every``, so refreshes land in the same place however the job is
+sharded across processes. Each slot of a seeded pool is generated from its
+own seed, so its value does not depend on the order in which slots are filled.
+"""
+
+import random
+import threading
+
+from faker import Faker
+
+from seeding import seed_int
+
+DEFAULT_POOL_SIZE = 10_000
+DEFAULT_REFRESH_EVERY = 0  # draws between rebuilds; 0 = never refresh
+MAX_SEEDED_POOLS = 64      # seeded (provider, seed, epoch) pools kept per process
+
+_EMPTY = object()  # a slot not generated yet
+
+# Providers served from pools. Anything that must be unique per document
+# (IDs, UUIDs) deliberately stays out of this list.
+POOLED_PROVIDERS = (
+    "user_name",
+    "ipv4",
+    "hostname",
+    "user_agent",
+    "city",
+    "email",
+    "sentence",
+    "country_code",
+    "domain_name",
+    "uri_path",
+    "file_name",
+    "file_path",
+    "word",
+    "sha256",
+)
+
+
+class FakerPool:
+    """A fixed-size pool of values for one Faker provider, filled as it is drawn from."""
+
+    def __init__(self, provider, size=DEFAULT_POOL_SIZE, refresh_every=DEFAULT_REFRESH_EVERY,
+                 faker=None, seed=None):
+        self.provider = provider
+        self.size = max(1, int(size))
+        self.refresh_every = max(0, int(refresh_every))
+        self.seed = seed
+        self._faker = faker or Faker()
+        self._make = getattr(self._faker, provider)
+        self._lock = threading.Lock()
+        self._draws = 0
+        self.filled = 0
+        self.values = []
+        self.refresh()
+
+    def refresh(self):
+        """Drop the values; slots are generated again as they are drawn."""
+        self.values = [_EMPTY] * self.size
+        self.filled = 0
+        self._draws = 0
+
+    def fill(self):
+        """Generate every slot now rather than on first draw."""
+        for i in range(self.size):
+            if self.values[i] is _EMPTY:
+                self._generate(i)
+
+    def _generate(self, i):
+        with self._lock:  # a seeded Faker must not be reseeded mid-call
+            values = self.values
+            value = values[i]
+            if value is _EMPTY:
+                if self.seed is not None:
+                    self._faker.seed_instance(self.seed + i)
+                value = values[i] = self._make()
+                self.filled += 1
+        return value
+
+    def _count(self, n):
+        self._draws += n
+        if self.refresh_every and self._draws >= self.refresh_every:
+            self.refresh()
+
+    def draw(self, rnd=random):
+        """Return one value; ``rnd`` is any object with ``randrange`` (default: random module)."""
+        i = rnd.randrange(self.size)
+        value = self.values[i]
+        if value is _EMPTY:
+            value = self._generate(i)
+        self._count(1)
+        return value
+
+    def draw_batch(self, n, rng):
+        """Return ``n`` values picked with a NumPy ``Generator``."""
+        values = self.values
+        picks = rng.integers(0, self.size, n).tolist()
+        if self.filled < self.size:
+            picks = [v if v is not _EMPTY else self._generate(i)
+                     for v, i in zip([values[i] for i in picks], picks)]
+        else:
+            picks = [values[i] for i in picks]
+        self._count(n)
+        return picks
+
+
+class FakerPools:
+    """Lazily-built collection of FakerPool objects, one per provider."""
+
+    def __init__(self, size=DEFAULT_POOL_SIZE, refresh_every=DEFAULT_REFRESH_EVERY, faker=None):
+        self.size = size
+        self.refresh_every = refresh_every
+        self._faker = faker or Faker()
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def configure(self, size=None, refresh_every=None):
+        """Change pool settings; existing pools are dropped and rebuilt on next use."""
+        with self._lock:
+            if size is not None:
+                self.size = int(size)
+            if refresh_every is not None:
+                self.refresh_every = int(refresh_every)
+            self._pools = {}
+
+    def warm(self, providers=POOLED_PROVIDERS):
+        """Build and fill the pools for ``providers`` up front instead of on first draw."""
+        for provider in providers:
+            self.pool(provider).fill()
+
+    def epoch_at(self, position):
+        """Seeded-pool epoch for the entry at ``position`` in a job."""
+        return position // self.refresh_every if self.refresh_every else 0
+
+    def pool(self, provider, seed=None, epoch=0):
+        """The shared pool for ``provider``, or the seeded one for (seed, epoch)."""
+        key = provider if seed is None else (provider, seed, epoch)
+        pool = self._pools.get(key)
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(key)
+                if pool is None:
+                    if seed is None:
+                        pool = FakerPool(provider, self.size, self.refresh_every, self._faker)
+                    else:
+                        self._evict_seeded()
+                        pool = FakerPool(provider, self.size, 0, Faker(),
+                                         seed=seed_int(seed, provider, epoch))
+                    self._pools[key] = pool
+        return pool
+
+    def _evict_seeded(self):
+        seeded = [k for k in self._pools if isinstance(k, tuple)]
+        for key in seeded[:max(0, len(seeded) - MAX_SEEDED_POOLS + 1)]:
+            del self._pools[key]
+
+    def draw(self, provider, rnd=random, seed=None, epoch=0):
+        return self.pool(provider, seed, epoch).draw(rnd)
+
+    def draw_batch(self, provider, n, rng, seed=None, epoch=0):
+        return self.pool(provider, seed, epoch).draw_batch(n, rng)
+
+
+# Shared by every generator in the process
+POOLS = FakerPools()
+
+
+def configure_pools(config):
+    """Apply ``log_generation.pool_size`` / ``pool_refresh_every`` from an app config dict."""
+    gen_cfg = (config or {}).get("log_generation", {})
+    size = gen_cfg.get("pool_size", DEFAULT_POOL_SIZE)
+    refresh_every = gen_cfg.get("pool_refresh_every", DEFAULT_REFRESH_EVERY)
+    if size != POOLS.size or refresh_every != POOLS.refresh_every:
+        POOLS.configure(size=size, refresh_every=refresh_every)
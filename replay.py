@@ -0,0 +1,326 @@
+"""Replaying stored ``_bulk`` NDJSON datasets into Elasticsearch.
+
+Datasets written with ``output_format: "bulk"`` (see sinks.BulkSink) are
+already in the ``_bulk`` wire format, so replaying one is only file I/O and
+HTTP: the files are cut into request bodies on document boundaries (an
+action line plus a document line), and posted as bytes. No document is
+decoded, and the ES response is only parsed when it reports errors. This
+separates ingest benchmarks from generation cost, and the same dataset can
+be loaded again into any index.
+
+Uncompressed files are memory-mapped: the document boundaries are found with
+NumPy, and each body is a ``memoryview`` slice of the mapping that goes
+straight to the socket (requests would iterate a memoryview byte by byte, so
+the bodies are posted with http.client over one keep-alive connection that
+follows the ``http`` TLS and timeout settings of connections.py).
+Compressed files are decompressed block by block instead. Plain NDJSON (one
+document per line, no action lines) is accepted too; it gets an
+``{"index":{}}`` line per document, which costs one copy of each body.
+
+A dataset is given either as its ``<name>.manifest.json`` (all parts, in
+order, and the data type, so the index and its mapping can be created) or
+as a single ``.ndjson`` / ``.ndjson.gz`` / ``.ndjson.zst`` file. It can be
+sent several times over (``loops``) and paced to a target rate in docs/s.
+
+Responses go through the same ingest.BulkSender as live ingestion: documents
+rejected with 429 / 503 (or all of a body that times out) are resent after a
+backoff under the job's retry budget, and those rejected for good are
+dead-lettered, so a load test rides out an overloaded cluster.
+"""
+
+import base64
+import http.client
+import json
+import mmap
+import os
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from connections import http_options, ssl_context
+from data_generators import DATA_GENERATORS, schema_for
+from ingest import (DEFAULT_BULK_MB, MB, NDJSON_HEADERS, BulkSender, BulkSizer, bulk_sizer,
+                    create_index, plan_bodies)
+from serializers import BULK_INDEX_ACTION
+from sinks import FORMATS, MANIFEST_SUFFIX, OUTPUT_DIR, STREAM_SUFFIXES, open_input
+
+DEFAULT_BULK_BYTES = DEFAULT_BULK_MB * MB  # target size of one _bulk request body
+_SCAN_BYTES = 64 * 1024 * 1024  # newline scan window for memory-mapped files
+
+
+def load_dataset(path):
+    """``(files, manifest)`` for a manifest or a single bulk file (manifest is {} then)."""
+    if path.endswith(MANIFEST_SUFFIX):
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format") != "bulk":
+            raise ValueError(f"{path} is a {manifest.get('format')!r} dataset, not 'bulk'")
+        directory = os.path.dirname(path)
+        return [os.path.join(directory, part["file"]) for part in manifest["parts"]], manifest
+    if not is_bulk_file(path):
+        raise ValueError(f"{path} is neither a manifest nor a .ndjson bulk file")
+    return [path], {}
+
+
+def list_datasets(directory=OUTPUT_DIR):
+    """Manifests of the complete bulk datasets in ``directory``, newest first."""
+    if not os.path.isdir(directory):
+        return []
+    datasets = []
+    for fname in os.listdir(directory):
+        if not fname.endswith(MANIFEST_SUFFIX):
+            continue
+        path = os.path.join(directory, fname)
+        try:
+            with open(path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            continue  # a job still running (empty placeholder) or a foreign file
+        if manifest.get("format") == "bulk" and manifest.get("complete"):
+            datasets.append({
+                "manifest": path,
+                "name": manifest["name"],
+                "data_type": manifest.get("data_type"),
+                "rows": manifest["rows"],
+                "parts": len(manifest["parts"]),
+                "mtime": os.path.getmtime(path),
+            })
+    return sorted(datasets, key=lambda d: d["mtime"], reverse=True)
+
+
+def is_bulk_file(path):
+    """True for ``.ndjson`` files, compressed or not."""
+    for suffix in STREAM_SUFFIXES.values():
+        if path.endswith(suffix):
+            path = path[:-len(suffix)]
+    return path.endswith(FORMATS["bulk"])
+
+
+def is_compressed(path):
+    return path.endswith(tuple(STREAM_SUFFIXES.values()))
+
+
+def _is_action_line(line):
+    try:
+        action = json.loads(line)
+    except ValueError:
+        return False
+    return (isinstance(action, dict) and len(action) == 1
+            and next(iter(action)) in ("index", "create"))
+
+
+def _with_actions(lines):
+    """A ``_bulk`` body for plain NDJSON ``lines`` (newline-terminated)."""
+    body = BULK_INDEX_ACTION + bytes(lines).replace(b"\n", b"\n" + BULK_INDEX_ACTION)
+    return body[:-len(BULK_INDEX_ACTION)]
+
+
+def iter_bodies(fileobj, max_bytes=DEFAULT_BULK_BYTES):
+    """Yield ``(body, docs)`` from a binary NDJSON stream, each body about ``max_bytes``.
+
+    Bodies end on a document boundary, so no document is separated from its
+    action line. Whether the stream has action lines is decided by its first
+    line. A document larger than ``max_bytes`` is sent in a body of its own.
+    """
+    carry = b""
+    lines_per_doc = None
+    while True:
+        block = fileobj.read(max_bytes)
+        if not block:
+            break
+        buf = carry + block if carry else block
+        if lines_per_doc is None:
+            first = buf.find(b"\n")
+            if first < 0:
+                carry = buf
+                continue
+            lines_per_doc = 2 if _is_action_line(buf[:first]) else 1
+        cut = buf.rfind(b"\n") + 1
+        lines = buf.count(b"\n", 0, cut)
+        if lines % lines_per_doc:
+            cut = buf.rfind(b"\n", 0, cut - 1) + 1
+            lines -= 1
+        if not lines:
+            carry = buf
+            continue
+        carry = buf[cut:]
+        body = buf[:cut]
+        yield (body if lines_per_doc == 2 else _with_actions(body)), lines // lines_per_doc
+    if carry.strip():
+        if not carry.endswith(b"\n"):
+            carry += b"\n"
+        if lines_per_doc is None:
+            lines_per_doc = 2 if _is_action_line(carry[:carry.find(b"\n")]) else 1
+        docs = carry.count(b"\n") // lines_per_doc
+        yield (carry if lines_per_doc == 2 else _with_actions(carry)), docs
+
+
+def _doc_ends(buf, lines_per_doc):
+    """Offsets just past each document in ``buf`` (an int64 array)."""
+    data = np.frombuffer(buf, dtype=np.uint8)
+    ends = []
+    phase = 0  # lines of an unfinished document carried into the next window
+    try:
+        for start in range(0, len(data), _SCAN_BYTES):
+            newlines = np.flatnonzero(data[start:start + _SCAN_BYTES] == 10) + (start + 1)
+            ends.append(newlines[(lines_per_doc - 1 - phase) % lines_per_doc::lines_per_doc])
+            phase = (phase + len(newlines)) % lines_per_doc
+    finally:
+        del data  # the array holds a buffer export; the mapping cannot close while it lives
+    if len(buf) and buf[-1] != ord("\n") and phase == lines_per_doc - 1:
+        ends.append(np.array([len(buf)]))  # last document without a final newline
+    return np.concatenate(ends) if ends else np.empty(0, dtype=np.int64)
+
+
+def send_mapped(path, send, max_bytes=DEFAULT_BULK_BYTES, max_docs=None):
+    """Memory-map an uncompressed NDJSON file and call ``send(body, docs)`` per body.
+
+    Bodies of ``_bulk`` files are memoryview slices of the mapping and are only
+    valid during the call.
+    """
+    with open(path, "rb") as f:
+        if not os.fstat(f.fileno()).st_size:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            first = mm.find(b"\n")
+            lines_per_doc = 2 if _is_action_line(mm[:first if first >= 0 else len(mm)]) else 1
+            ends = _doc_ends(mm, lines_per_doc)
+            tail = int(ends[-1]) if len(ends) else 0
+            if mm[tail:].strip():
+                raise ValueError(f"{path} ends with an incomplete document")
+            if hasattr(mm, "madvise"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            with memoryview(mm) as view:
+                for start, end, docs in plan_bodies(ends, max_bytes, max_docs):
+                    with view[start:end] as body:
+                        if lines_per_doc == 1:
+                            send(_with_actions(body if body[-1] == ord("\n") else bytes(body) + b"\n"), docs)
+                        elif body[-1] != ord("\n"):
+                            send(bytes(body) + b"\n", docs)
+                        else:
+                            send(body, docs)
+
+
+class BulkConnection:
+    """One keep-alive HTTP connection posting raw bodies (bytes or memoryviews) to
+    ``_bulk``, retrying and dead-lettering through ``sender`` (an ingest.BulkSender)."""
+
+    def __init__(self, config, index, sender=None):
+        es = config["elasticsearch"]
+        options = http_options(config)
+        url = urlsplit(es["host"])
+        self._connection_options = {"timeout": options["timeout"]}
+        if url.scheme == "https":
+            self._connection_class = http.client.HTTPSConnection
+            self._connection_options["context"] = ssl_context(options)
+        else:
+            self._connection_class = http.client.HTTPConnection
+        self._host, self._port = url.hostname, url.port
+        self._path = f"{url.path.rstrip('/')}/{index}/_bulk"
+        self._headers = dict(NDJSON_HEADERS)
+        if es.get("username"):
+            token = base64.b64encode(f"{es['username']}:{es['password']}".encode()).decode()
+            self._headers["Authorization"] = f"Basic {token}"
+        self._conn = None
+        self.sender = sender or BulkSender(config, index)
+
+    def post(self, body, docs):
+        """POST ``body`` until each document is accepted or dead-lettered, through
+        BulkSender.send(); returns the number accepted."""
+        return self.sender.send(body, docs, request=self._request)
+
+    def _request(self, body):
+        try:
+            return self._exchange(body)
+        except (OSError, http.client.HTTPException):  # refused, reset, timed out
+            self.close()
+            return None, b""
+
+    def _exchange(self, body):
+        for attempt in range(2):
+            if self._conn is None:
+                self._conn = self._connection_class(self._host, self._port,
+                                                    **self._connection_options)
+            try:
+                self._conn.request("POST", self._path, body=body, headers=self._headers)
+                resp = self._conn.getresponse()
+                return resp.status, resp.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # the server closed an idle keep-alive connection; reconnect once
+                self.close()
+                if attempt:
+                    raise
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def replay(path, config, index=None, max_bytes=None, progress=None,
+           loops=1, rate=None):
+    """Send a stored bulk dataset to Elasticsearch.
+
+    Returns ``(accepted, dead_letter)``: the number of documents Elasticsearch
+    accepted, and the ingest.DeadLetterFile holding those it rejected.
+
+    ``index`` defaults to the data type's index from the manifest, which is
+    created with its mapping first. Bodies are about ``max_bytes`` (default:
+    ``log_generation.bulk_mb``). The dataset is sent ``loops`` times (0 =
+    until interrupted); ``rate`` caps the pace in docs/s. Memory-mapped files
+    are then cut into bodies of at most ``rate`` docs, so requests go out
+    about once a second rather than in bursts.
+    ``progress(sent, total)`` is called after every request, with the documents
+    sent so far whatever their outcome (``total`` is None for a bare file or
+    endless loops).
+    """
+    files, manifest = load_dataset(path)
+    data_type = manifest.get("data_type")
+    if index is None:
+        if data_type not in DATA_GENERATORS:
+            raise ValueError("No index given and the dataset does not name its data type")
+        index = DATA_GENERATORS[data_type]["index_pattern"]
+    if data_type in DATA_GENERATORS:
+        create_index(config, index, schema_for(data_type).mapping())
+
+    if max_bytes is None:
+        max_bytes = bulk_sizer(config).target
+    total = manifest["rows"] * loops if manifest.get("rows") is not None and loops else None
+    max_docs = max(1, int(rate)) if rate else None
+    sent = accepted = 0
+    started = time.monotonic()
+    sender = BulkSender(config, index, sizer=BulkSizer(max_bytes))
+
+    with BulkConnection(config, index, sender) as conn:
+        def send(body, docs):
+            nonlocal sent, accepted
+            if rate:
+                ahead = sent / rate - (time.monotonic() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+            accepted += conn.post(body, docs)
+            sent += docs
+            if progress:
+                progress(sent, total)
+
+        loop = 0
+        while not loops or loop < loops:
+            before = sent
+            for file_path in files:
+                if is_compressed(file_path):
+                    with open_input(file_path) as f:
+                        for body, docs in iter_bodies(f, max_bytes):
+                            send(body, docs)
+                else:
+                    send_mapped(file_path, send, max_bytes, max_docs)
+            if sent == before:
+                break  # nothing to send; do not spin on an empty dataset
+            loop += 1
+    return accepted, sender.dead_letter
@@ -0,0 +1,84 @@
+"""Weighted sampling with precomputed alias tables.
+
+``random.choices(options, weights=...)`` rebuilds the cumulative weights on
+every call, and NumPy's ``choice(p=...)`` re-validates and re-normalises ``p``.
+Generators build one WeightedChoice per distribution instead, which turns the
+weights into a Walker/Vose alias table once: a draw is then one uniform, one
+index and one comparison, whether it is a single value or a whole column.
+"""
+
+import numpy as np
+
+
+def _alias_table(weights):
+    """Vose's alias method: ``(prob, alias)`` lists for the given weights."""
+    k = len(weights)
+    total = float(sum(weights))
+    scaled = [w * k / total for w in weights]
+    prob = [1.0] * k
+    alias = list(range(k))
+    small = [i for i, s in enumerate(scaled) if s < 1.0]
+    large = [i for i, s in enumerate(scaled) if s >= 1.0]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        prob[s], alias[s] = scaled[s], l
+        scaled[l] += scaled[s] - 1.0
+        (small if scaled[l] < 1.0 else large).append(l)
+    return prob, alias
+
+
+class WeightedChoice:
+    """A fixed discrete distribution over ``options``.
+
+    Use draw() with a ``random.Random`` for single values and draw_batch()
+    with a NumPy ``Generator`` for columns.
+    """
+
+    __slots__ = ("options", "weights", "_k", "_prob", "_alias", "_prob_arr", "_alias_arr")
+
+    def __init__(self, options, weights):
+        options, weights = list(options), [float(w) for w in weights]
+        if not options or len(options) != len(weights):
+            raise ValueError("WeightedChoice needs one weight per option")
+        if any(w < 0 for w in weights) or sum(weights) <= 0:
+            raise ValueError("Weights must be non-negative and not all zero")
+        self.options = options
+        self.weights = weights
+        self._k = len(options)
+        self._prob, self._alias = _alias_table(weights)
+        self._prob_arr = np.array(self._prob)
+        self._alias_arr = np.array(self._alias, dtype=np.int64)
+
+    def __repr__(self):
+        return f"WeightedChoice({self.options!r}, {self.weights!r})"
+
+    def draw(self, rnd):
+        """One option, using a single ``rnd.random()`` call."""
+        u = rnd.random() * self._k
+        i = int(u)
+        return self.options[i] if u - i < self._prob[i] else self.options[self._alias[i]]
+
+    def draw_batch(self, rng, n):
+        """A list of ``n`` options drawn with ``rng`` (a NumPy Generator)."""
+        u = rng.random(n) * self._k
+        i = u.astype(np.int64)
+        idx = np.where(u - i < self._prob_arr[i], i, self._alias_arr[i])
+        return [self.options[j] for j in idx.tolist()]
+
+    def reweighted(self, overrides):
+        """A copy with the weights of the options named in ``overrides`` replaced.
+
+        Keys may be the options themselves or their string form (as read from
+        JSON, where ``true`` / ``false`` are accepted for booleans).
+        """
+        by_name = {}
+        for option in self.options:
+            by_name[str(option)] = option
+            if isinstance(option, bool):
+                by_name[str(option).lower()] = option
+        weights = dict(zip(self.options, self.weights))
+        for key, weight in overrides.items():
+            if str(key) not in by_name:
+                raise ValueError(f"Unknown option {key!r}; expected one of {self.options!r}")
+            weights[by_name[str(key)]] = weight
+        return WeightedChoice(self.options, [weights[o] for o in self.options])
@@ -6,8 +6,11 @@ that causes metric spikes, error logs, and alert firing simultaneously.
 """
 
 import datetime
-import random
-from faker import Faker
+
+from message_templates import MessageTemplate, compile_templates
+from sampling import WeightedChoice
+from seeding import child_sequence, python_random, seed_sequence
+from timestamps import parse_iso_ms, to_epoch_ms
 
 from data_generators import (
     DATA_GENERATORS,
@@ -20,8 +23,6 @@ from data_generators import (
     DistributedTracesGenerator,
 )
 
-fake = Faker()
-
 # ---------------------------------------------------------------------------
 # Scenario registry
 # ---------------------------------------------------------------------------
@@ -68,12 +69,19 @@ SCENARIOS = {
 # ---------------------------------------------------------------------------
 
 class _BaseScenario:
-    def __init__(self, start_date=None, end_date=None):
+    def __init__(self, start_date=None, end_date=None, seed=None):
         now = datetime.datetime.now()
         self.end_date = end_date or now
         self.start_date = start_date or (now - datetime.timedelta(hours=6))
+        self.seed = seed
+        self.random = python_random(seed_sequence(seed))
         self._init_incident_window()
 
+    def _generator(self, gen_class, name):
+        """Build a data generator on its own child stream of the scenario seed."""
+        seed = None if self.seed is None else child_sequence(self.seed, name)
+        return gen_class(self.start_date, self.end_date, seed=seed)
+
     def _incident_window(self, frac_start: float, duration_hours: float):
         total = (self.end_date - self.start_date).total_seconds()
         w_start = self.start_date + datetime.timedelta(seconds=total * frac_start)
@@ -81,13 +89,18 @@ class _BaseScenario:
         return w_start, w_end
 
     def _init_incident_window(self):
-        self.incident_start, self.incident_end = self._incident_window(0.3, 2.0)
+        self._set_incident_window(*self._incident_window(0.3, 2.0))
+
+    def _set_incident_window(self, start: datetime.datetime, end: datetime.datetime) -> None:
+        self.incident_start, self.incident_end = start, end
+        self.incident_start_ms, self.incident_end_ms = to_epoch_ms(start), to_epoch_ms(end)
 
-    def _in_incident(self, ts: datetime.datetime) -> bool:
-        return self.incident_start <= ts <= self.incident_end
+    def _in_incident(self, ts_ms: int) -> bool:
+        return self.incident_start_ms <= ts_ms <= self.incident_end_ms
 
-    def _parse_ts(self, entry: dict) -> datetime.datetime:
-        return datetime.datetime.fromisoformat(entry["@timestamp"].rstrip("Z"))
+    def _parse_ts(self, entry: dict) -> int:
+        """Epoch milliseconds of an entry's @timestamp."""
+        return parse_iso_ms(entry["@timestamp"])
 
 
 # ---------------------------------------------------------------------------
@@ -96,53 +109,61 @@ class _BaseScenario:
 
 class DeploymentFailureScenario(_BaseScenario):
     FAILING_SERVICES = ["order-service", "payment-service", "inventory-service"]
-
-    def __init__(self, start_date=None, end_date=None):
-        super().__init__(start_date, end_date)
-        self.failing_service = random.choice(self.FAILING_SERVICES)
-        self._struct_gen = StructuredLogsGenerator(self.start_date, self.end_date)
-        self._metrics_gen = MetricsGenerator(self.start_date, self.end_date)
-        self._alerts_gen = AlertsGenerator(self.start_date, self.end_date)
-        self._apm_gen = APMDataGenerator(self.start_date, self.end_date)
+    FAILURE_MESSAGES = compile_templates([
+        "Deployment rollout failed: OutOfMemoryError in {service}",
+        "Health check failed for {service}: connection refused",
+        "Circuit breaker OPEN for downstream {service}",
+    ])
+    ALERT_SUMMARY = MessageTemplate("Deployment failure detected in {service}")
+    UPSTREAM_ERROR = MessageTemplate("Upstream {service} unavailable")
+
+    def __init__(self, start_date=None, end_date=None, seed=None):
+        super().__init__(start_date, end_date, seed)
+        self.failing_service = self.random.choice(self.FAILING_SERVICES)
+        # The failing service is fixed per scenario, so these render once
+        service = {"service": self.failing_service}
+        self._failure_messages = [t.render(service) for t in self.FAILURE_MESSAGES]
+        self._alert_name = f"DeploymentFailure_{self.failing_service.replace('-', '_')}"
+        self._alert_summary = self.ALERT_SUMMARY.render(service)
+        self._upstream_error = self.UPSTREAM_ERROR.render(service)
+        self._struct_gen = self._generator(StructuredLogsGenerator, "structured_logs")
+        self._metrics_gen = self._generator(MetricsGenerator, "metrics")
+        self._alerts_gen = self._generator(AlertsGenerator, "alerts")
+        self._apm_gen = self._generator(APMDataGenerator, "apm_data")
 
     def generate_structured_log(self) -> dict:
         entry = self._struct_gen.generate_entry()
         ts = self._parse_ts(entry)
         if self._in_incident(ts) and entry.get("service.name") == self.failing_service:
             entry["log.level"] = "ERROR"
-            entry["http.status_code"] = random.choice([500, 502, 503])
-            entry["http.response_time_ms"] = random.randint(3_000, 12_000)
-            entry["message"] = random.choice([
-                f"Deployment rollout failed: OutOfMemoryError in {self.failing_service}",
-                f"Health check failed for {self.failing_service}: connection refused",
-                f"Circuit breaker OPEN for downstream {self.failing_service}",
-            ])
+            entry["http.status_code"] = self.random.choice([500, 502, 503])
+            entry["http.response_time_ms"] = self.random.randint(3_000, 12_000)
+            entry["message"] = self.random.choice(self._failure_messages)
         return entry
 
     def generate_metric(self) -> dict:
         entry = self._metrics_gen.generate_entry()
         ts = self._parse_ts(entry)
         if self._in_incident(ts) and entry.get("service.name") == self.failing_service:
-            entry["metric.name"] = random.choice(["cpu_usage_percent", "error_rate", "active_connections"])
+            entry["metric.name"] = self.random.choice(["cpu_usage_percent", "error_rate", "active_connections"])
             entry["metric.type"] = "gauge"
-            entry["metric.value"] = random.uniform(85.0, 100.0)
+            entry["metric.value"] = self.random.uniform(85.0, 100.0)
         return entry
 
     def generate_alert(self) -> dict:
         entry = self._alerts_gen.generate_entry()
         ts = self._parse_ts(entry)
         if self._in_incident(ts):
-            svc = self.failing_service.replace("-", "_")
             entry["alert.state"] = "firing"
             entry["alert.severity"] = "critical"
-            entry["alert.name"] = f"DeploymentFailure_{svc}"
+            entry["alert.name"] = self._alert_name
             entry["labels"] = {
                 "service": self.failing_service,
                 "environment": "production",
                 "team": "platform",
             }
             entry["annotations"] = {
-                "summary": f"Deployment failure detected in {self.failing_service}",
+                "summary": self._alert_summary,
                 "description": "Error rate > 50 % and P99 latency > 10 s for more than 5 min",
                 "runbook_url": "https://wiki.internal/runbooks/deployment-failure",
             }
@@ -154,9 +175,9 @@ class DeploymentFailureScenario(_BaseScenario):
         apm_affected = {"web-app", "api-service"}
         if self._in_incident(ts) and entry.get("service.name") in apm_affected:
             entry["transaction.result"] = "error"
-            entry["transaction.duration.ms"] = random.randint(5_000, 20_000)
+            entry["transaction.duration.ms"] = self.random.randint(5_000, 20_000)
             entry["error.type"] = "ServiceUnavailableError"
-            entry["error.message"] = f"Upstream {self.failing_service} unavailable"
+            entry["error.message"] = self._upstream_error
         return entry
 
 
@@ -167,48 +188,53 @@ class DeploymentFailureScenario(_BaseScenario):
 class SecurityIncidentScenario(_BaseScenario):
     TARGET_USERS = ["admin", "root", "elasticsearch", "kibana", "ubuntu", "deploy"]
     TARGET_HOST = "auth-server-prod-01"
+    BRUTE_FORCE_MESSAGE = MessageTemplate("Brute-force login attempt for user '{user}' from {source_ip}")
+    AUTH_FAILURE_MESSAGE = MessageTemplate("Authentication failure from {source_ip} for user '{user}'")
+    ALERT_SUMMARY = MessageTemplate("Brute-force attack from {source_ip}")
 
-    def __init__(self, start_date=None, end_date=None):
-        super().__init__(start_date, end_date)
+    def __init__(self, start_date=None, end_date=None, seed=None):
+        super().__init__(start_date, end_date, seed)
         # Single attacker IP for the whole scenario
         self.attacker_ip = (
-            f"185.{random.randint(1,254)}.{random.randint(1,254)}.{random.randint(1,254)}"
+            f"185.{self.random.randint(1,254)}.{self.random.randint(1,254)}."
+            f"{self.random.randint(1,254)}"
         )
+        # Fold the attacker IP in now; only {user} is left to fill per entry
+        self._brute_force_message = self.BRUTE_FORCE_MESSAGE.partial(source_ip=self.attacker_ip)
+        self._auth_failure_message = self.AUTH_FAILURE_MESSAGE.partial(source_ip=self.attacker_ip)
+        self._alert_summary = self.ALERT_SUMMARY.render({"source_ip": self.attacker_ip})
         self._init_incident_window()
-        self._sec_gen = SecurityEventsGenerator(self.start_date, self.end_date)
-        self._net_gen = NetworkTrafficGenerator(self.start_date, self.end_date)
-        self._alerts_gen = AlertsGenerator(self.start_date, self.end_date)
-        self._struct_gen = StructuredLogsGenerator(self.start_date, self.end_date)
+        self._sec_gen = self._generator(SecurityEventsGenerator, "security_events")
+        self._net_gen = self._generator(NetworkTrafficGenerator, "network_traffic")
+        self._alerts_gen = self._generator(AlertsGenerator, "alerts")
+        self._struct_gen = self._generator(StructuredLogsGenerator, "structured_logs")
 
     def _init_incident_window(self):
-        self.incident_start, self.incident_end = self._incident_window(0.2, 3.0)
+        self._set_incident_window(*self._incident_window(0.2, 3.0))
 
     def generate_security_event(self) -> dict:
         entry = self._sec_gen.generate_entry()
         ts = self._parse_ts(entry)
-        if self._in_incident(ts) and random.random() < 0.65:
+        if self._in_incident(ts) and self.random.random() < 0.65:
             entry["event.type"] = "authentication"
             entry["event.action"] = "login_attempt"
             entry["event.outcome"] = "failure"
-            entry["event.severity"] = random.choice(["high", "critical"])
+            entry["event.severity"] = self.random.choice(["high", "critical"])
             entry["source.ip"] = self.attacker_ip
-            entry["user.name"] = random.choice(self.TARGET_USERS)
+            entry["user.name"] = self.random.choice(self.TARGET_USERS)
             entry["host.name"] = self.TARGET_HOST
-            entry["message"] = (
-                f"Brute-force login attempt for user '{entry['user.name']}' "
-                f"from {self.attacker_ip}"
-            )
+            entry["message"] = self._brute_force_message.render({"user": entry["user.name"]})
         return entry
 
     def generate_network_event(self) -> dict:
         entry = self._net_gen.generate_entry()
         ts = self._parse_ts(entry)
-        if self._in_incident(ts) and random.random() < 0.55:
+        if self._in_incident(ts) and self.random.random() < 0.55:
             entry["source.ip"] = self.attacker_ip
-            entry["destination.port"] = random.choice([22, 443, 9200, 5601, 3306])
+            entry["destination.port"] = self.random.choice([22, 443, 9200, 5601, 3306])
             entry["event.action"] = "blocked"
-            entry["network.packets"] = random.randint(500, 5_000)
-            entry["network.bytes"] = entry["network.packets"] * random.randint(64, 512)
+            entry["network.packets"] = self.random.randint(500, 5_000)
+            entry["network.bytes"] = entry["network.packets"] * self.random.randint(64, 512)
         return entry
 
     def generate_alert(self) -> dict:
@@ -224,7 +250,7 @@ class SecurityIncidentScenario(_BaseScenario):
                 "environment": "production",
             }
             entry["annotations"] = {
-                "summary": f"Brute-force attack from {self.attacker_ip}",
+                "summary": self._alert_summary,
                 "description": "> 200 failed logins in 5 min from a single source IP",
                 "runbook_url": "https://wiki.internal/runbooks/brute-force",
             }
@@ -233,13 +259,12 @@ class SecurityIncidentScenario(_BaseScenario):
     def generate_structured_log(self) -> dict:
         entry = self._struct_gen.generate_entry()
         ts = self._parse_ts(entry)
-        if self._in_incident(ts) and random.random() < 0.45:
+        if self._in_incident(ts) and self.random.random() < 0.45:
             entry["log.level"] = "WARN"
             entry["service.name"] = "user-api"
             entry["http.status_code"] = 401
-            entry["message"] = (
-                f"Authentication failure from {self.attacker_ip} for user "
-                f"'{random.choice(self.TARGET_USERS)}'"
+            entry["message"] = self._auth_failure_message.render(
+                {"user": self.random.choice(self.TARGET_USERS)}
             )
         return entry
 
@@ -256,17 +281,18 @@ class DatabaseSlowdownScenario(_BaseScenario):
         "UPDATE inventory SET quantity = quantity - 1 WHERE product_id IN (SELECT id FROM products WHERE category = 'electronics')",
         "DELETE FROM sessions WHERE expires_at < NOW() - INTERVAL '30 days'",
     ]
+    INCIDENT_LEVEL = WeightedChoice(["WARN", "ERROR"], [60, 40])
 
-    def __init__(self, start_date=None, end_date=None):
-        super().__init__(start_date, end_date)
+    def __init__(self, start_date=None, end_date=None, seed=None):
+        super().__init__(start_date, end_date, seed)
         self._init_incident_window()
-        self._apm_gen = APMDataGenerator(self.start_date, self.end_date)
-        self._metrics_gen = MetricsGenerator(self.start_date, self.end_date)
-        self._struct_gen = StructuredLogsGenerator(self.start_date, self.end_date)
-        self._traces_gen = DistributedTracesGenerator(self.start_date, self.end_date)
+        self._apm_gen = self._generator(APMDataGenerator, "apm_data")
+        self._metrics_gen = self._generator(MetricsGenerator, "metrics")
+        self._struct_gen = self._generator(StructuredLogsGenerator, "structured_logs")
+        self._traces_gen = self._generator(DistributedTracesGenerator, "distributed_traces")
 
     def _init_incident_window(self):
-        self.incident_start, self.incident_end = self._incident_window(0.25, 2.5)
+        self._set_incident_window(*self._incident_window(0.25, 2.5))
 
     def generate_apm(self) -> dict:
         entry = self._apm_gen.generate_entry()
@@ -274,12 +300,12 @@ class DatabaseSlowdownScenario(_BaseScenario):
         if self._in_incident(ts):
             if entry.get("service.name") in self.AFFECTED_SERVICES:
                 # Upstream services become slow waiting on DB
-                entry["transaction.duration.ms"] = random.randint(2_000, 8_000)
+                entry["transaction.duration.ms"] = self.random.randint(2_000, 8_000)
             if entry.get("transaction.type") == "database_query":
-                entry["transaction.duration.ms"] = random.randint(8_000, 30_000)
-                entry["db.statement"] = random.choice(self.SLOW_STATEMENTS)
+                entry["transaction.duration.ms"] = self.random.randint(8_000, 30_000)
+                entry["db.statement"] = self.random.choice(self.SLOW_STATEMENTS)
                 entry["db.type"] = "postgresql"
-                entry["transaction.result"] = random.choice(["error", "error", "success"])
+                entry["transaction.result"] = self.random.choice(["error", "error", "success"])
         return entry
 
     def generate_metric(self) -> dict:
@@ -287,20 +313,20 @@ class DatabaseSlowdownScenario(_BaseScenario):
         ts = self._parse_ts(entry)
         if self._in_incident(ts) and entry.get("service.name") == self.DB_SERVICE:
             entry["metric.type"] = "gauge"
-            entry["metric.name"] = random.choice(["active_connections", "cpu_usage_percent"])
+            entry["metric.name"] = self.random.choice(["active_connections", "cpu_usage_percent"])
             if entry["metric.name"] == "active_connections":
-                entry["metric.value"] = random.randint(450, 500)
+                entry["metric.value"] = self.random.randint(450, 500)
             else:
-                entry["metric.value"] = random.uniform(88.0, 100.0)
+                entry["metric.value"] = self.random.uniform(88.0, 100.0)
         return entry
 
     def generate_structured_log(self) -> dict:
         entry = self._struct_gen.generate_entry()
         ts = self._parse_ts(entry)
         if self._in_incident(ts) and entry.get("service.name") in self.AFFECTED_SERVICES:
-            entry["log.level"] = random.choices(["WARN", "ERROR"], weights=[60, 40])[0]
-            entry["http.response_time_ms"] = random.randint(5_000, 20_000)
-            entry["message"] = random.choice([
+            entry["log.level"] = self.INCIDENT_LEVEL.draw(self.random)
+            entry["http.response_time_ms"] = self.random.randint(5_000, 20_000)
+            entry["message"] = self.random.choice([
                 "Database query exceeded 5 s threshold — connection pool exhausted",
                 "Slow query detected: acquiring connection took > 3 s",
                 "Database connection timeout after 10 s",
@@ -312,8 +338,8 @@ class DatabaseSlowdownScenario(_BaseScenario):
         ts = self._parse_ts(entry)
         op = entry.get("operation.name", "")
         if self._in_incident(ts) and any(kw in op for kw in ("query", "select", "update", "insert")):
-            entry["duration.ms"] = random.randint(8_000, 30_000)
-            entry["span.status"] = random.choice(["TIMEOUT", "ERROR"])
+            entry["duration.ms"] = self.random.randint(8_000, 30_000)
+            entry["span.status"] = self.random.choice(["TIMEOUT", "ERROR"])
         return entry
 
 
@@ -344,13 +370,18 @@ def generate_scenario_entries(
     num_entries_per_type: int,
     start_date=None,
     end_date=None,
+    seed=None,
 ) -> dict[str, list[dict]]:
-    """Return {data_type: [entries]} for every type in the scenario."""
+    """Return {data_type: [entries]} for every type in the scenario.
+
+    The same ``seed`` and dates always produce the same entries.
+    """
     if scenario_name not in _SCENARIO_CLASSES:
         raise ValueError(f"Unknown scenario '{scenario_name}'. "
                          f"Choose from: {list(_SCENARIO_CLASSES)}")
 
-    scenario_obj = _SCENARIO_CLASSES[scenario_name](start_date=start_date, end_date=end_date)
+    scenario_obj = _SCENARIO_CLASSES[scenario_name](start_date=start_date, end_date=end_date,
+                                                    seed=seed)
     types = SCENARIOS[scenario_name]["types"]
 
     results: dict[str, list[dict]] = {}
@@ -0,0 +1,90 @@
+"""Declarative field schemas for the generated data types.
+
+Every generator class publishes a ``SCHEMA`` listing each field it can emit,
+including fields only some entries carry, with its Elasticsearch type. The
+index mapping, the CSV header and fixed column layouts are all derived from
+it, so nothing has to be inferred from whichever entries happen to come
+first. Schema.flattener() compiles the schema into a function that turns a
+document into a CSV row tuple in one pass.
+
+A field is named by its path through the document: ``"log.level"`` is the
+top-level key ``"log.level"``, while ``("resource.attributes", "host.name")``
+is ``doc["resource.attributes"]["host.name"]``. Flat (CSV / mapping) names are
+paths joined with dots.
+"""
+
+from collections import namedtuple
+
+from columns import MISSING
+
+Field = namedtuple("Field", "path type")
+
+
+class Schema:
+    """An ordered, typed list of document fields."""
+
+    def __init__(self, fields):
+        self.fields = tuple(
+            Field(path if isinstance(path, tuple) else (path,), es_type)
+            for path, es_type in fields
+        )
+        self.names = [".".join(f.path) for f in self.fields]
+        self.paths = [f.path for f in self.fields]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("Schema field names must be unique")
+        self._flattener = None
+
+    def __len__(self):
+        return len(self.fields)
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def mapping(self):
+        """Elasticsearch ``mappings`` body for an index of these documents."""
+        return {"properties": {name: {"type": f.type} for name, f in zip(self.names, self.fields)}}
+
+    def flattener(self):
+        """A function turning one document into a row tuple in ``names`` order.
+
+        It is generated once per schema: each nested group is looked up once
+        per row, each field is a single ``.get``, and fields a document lacks
+        come out as ``""``, as csv.DictWriter wrote them.
+        """
+        if self._flattener is None:
+            self._flattener = _compile_flattener(self.paths)
+        return self._flattener
+
+    def empty_columns(self, n):
+        """``{flat name: [MISSING] * n}`` in schema order, ready to be filled."""
+        return {name: [MISSING] * n for name in self.names}
+
+    def unknown(self, names):
+        """Names in ``names`` that the schema does not declare."""
+        known = set(self.names)
+        return [name for name in names if name not in known]
+
+
+def _compile_flattener(paths):
+    lines = ["def flatten(doc):", "    get = doc.get"]
+    parents = {(): "doc"}
+
+    def parent(prefix):
+        if prefix not in parents:
+            outer = parent(prefix[:-1])
+            name = parents[prefix] = f"p{len(parents)}"
+            lines.append(f"    {name} = {outer}.get({prefix[-1]!r}) or _EMPTY")
+        return parents[prefix]
+
+    items = []
+    for path in paths:
+        owner = parent(path[:-1])
+        getter = "get" if owner == "doc" else f"{owner}.get"
+        items.append(f"{getter}({path[-1]!r}, '')")
+    lines.append(f"    return ({''.join(item + ', ' for item in items)})")
+    namespace = {"_EMPTY": {}}
+    exec("\n".join(lines), namespace)
+    return namespace["flatten"]
@@ -0,0 +1,71 @@
+"""Turning generated entries into CSV rows and Elasticsearch bulk bodies.
+
+Kept free of Flask and the web app so generation workers can import it
+cheaply and hand the parent process output that is already serialized.
+
+JSON is encoded by orjson when it is installed (``pip install orjson``) and
+by the standard library otherwise; set ``LDG_JSON=json`` to force the
+latter. Both write compact UTF-8 JSON that Elasticsearch reads the same
+way, but not always the same bytes (floats differ, e.g. ``1e16`` against
+``1e+16``), so byte-identical bulk/NDJSON output for a seed needs the same
+backend. Bulk bodies are bytes assembled in one bytearray, with the action
+line encoded once rather than per document.
+"""
+
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BULK_INDEX_ACTION = b'{"index":{}}\n'
+
+
+def _default(value):
+    """Fallback for values JSON has no type for (NumPy scalars, datetimes, …)."""
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+_stdlib_encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False,
+                                  default=_default).encode
+
+
+def _stdlib_dumps(obj):
+    return _stdlib_encode(obj).encode("utf-8")
+
+
+def _orjson_dumps(obj):
+    return orjson.dumps(obj, default=_default)
+
+
+# dumps(obj) -> compact UTF-8 JSON bytes, from whichever backend is in use
+JSON_BACKEND = "orjson" if orjson is not None and os.environ.get("LDG_JSON") != "json" else "json"
+dumps = _orjson_dumps if JSON_BACKEND == "orjson" else _stdlib_dumps
+
+
+def flatten_dict(d, parent_key='', sep='.'):
+    """Flatten nested dictionaries for CSV output"""
+    items = []
+    for k, v in d.items():
+        new_key = f"{parent_key}{sep}{k}" if parent_key else k
+        if isinstance(v, dict):
+            items.extend(flatten_dict(v, new_key, sep=sep).items())
+        elif isinstance(v, list):
+            # Convert lists to JSON strings for CSV
+            items.append((new_key, json.dumps(v)))
+        else:
+            items.append((new_key, v))
+    return dict(items)
+
+
+def bulk_body(entries):
+    """NDJSON ``_bulk`` request body (bytes) indexing every entry into the URL's index."""
+    encode = dumps
+    body = bytearray()
+    for entry in entries:
+        body += BULK_INDEX_ACTION
+        body += encode(entry)
+        body += b"\n"
+    return bytes(body)
@@ -0,0 +1,161 @@
+"""Sharded, optionally multi-process entry generation.
+
+A generation job is split into fixed-size shards. In serial mode every shard
+is generated in-process; with ``workers > 1`` shards are handed to a process
+pool, so a large job is no longer limited to one core by the GIL. Each worker
+builds its own generator once and returns every shard as flat columns
+and/or an encoded Elasticsearch bulk body, leaving the parent process little
+to do but write. Shards are generated column-wise (see columns.py), so
+pickling a shard back to the parent moves a few dozen lists rather than
+thousands of dicts.
+
+Results are always yielded in shard order, so output files and bulk requests
+receive entries in the same sequence whatever the worker count. Each shard
+reseeds its generator from ``child_sequence(seed, "shard", index)``, so for a
+given seed, dates and shard size the output is byte-identical for any number
+of workers.
+
+With ``log_generation.ordered`` set, shard k is also given the slice of the
+time range that holds its share of the entries (see
+DataTypeGenerator.time_slice), so the job comes out in ascending time order
+with no sort and with memory bounded by the shard size.
+"""
+
+import multiprocessing
+import os
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from data_generators import DATA_GENERATORS, generator_options, schema_for
+from pools import POOLS, configure_pools
+from seeding import child_sequence, seed_sequence
+from serializers import bulk_body
+
+DEFAULT_WORKERS = 1  # 0 = one worker per CPU core
+
+# index: shard position; columns: value lists in schema field order, None where
+# a document has no value (the file sink layout); bulk: NDJSON _bulk body;
+# timestamps: each document's @timestamp, alongside bulk (for the sink's time range)
+ShardResult = namedtuple("ShardResult", "index count columns bulk timestamps")
+TIMESTAMP_PATH = ("@timestamp",)
+
+# Per-process state set up by _init_worker()
+_worker = {}
+
+
+def resolve_workers(workers):
+    """Normalise a ``workers`` setting; 0 or less means one per CPU core."""
+    workers = DEFAULT_WORKERS if workers is None else int(workers)
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def plan_shards(num_entries, shard_size):
+    """Split a job into ``[(index, count), ...]`` shards of at most ``shard_size``."""
+    return [
+        (index, min(shard_size, num_entries - start))
+        for index, start in enumerate(range(0, num_entries, shard_size))
+    ]
+
+
+def _make_generator(data_type, start_date, end_date, config, seed):
+    configure_pools(config)
+    gen_class = DATA_GENERATORS[data_type]['generator']
+    ordered = bool((config or {}).get('log_generation', {}).get('ordered', False))
+    return gen_class(start_date=start_date, end_date=end_date, seed=seed, ordered=ordered,
+                     **generator_options(data_type, config))
+
+
+def _generate(gen, root, shard_size, total, index, count):
+    """Generate one shard on its own stream, independent of earlier shards."""
+    first = index * shard_size
+    gen.reseed(child_sequence(root, "shard", index), POOLS.epoch_at(first))
+    gen.time_slice = (first / total, (first + count) / total)
+    return gen.generate_columns(count)
+
+
+def _serialize(index, batch, paths, bulk):
+    return ShardResult(
+        index,
+        len(batch),
+        batch.select(paths, missing=None) if paths else None,
+        bulk_body(batch.to_rows()) if bulk else None,
+        batch.select([TIMESTAMP_PATH], missing=None)[0] if bulk else None,
+    )
+
+
+def _init_worker(data_type, start_date, end_date, config, seed, root, shard_size, total,
+                 columns, bulk):
+    _worker.update(
+        gen=_make_generator(data_type, start_date, end_date, config, seed),
+        root=root,
+        shard_size=shard_size,
+        total=total,
+        paths=schema_for(data_type).paths if columns else None,
+        bulk=bulk,
+    )
+
+
+def _generate_shard(index, count):
+    w = _worker
+    batch = _generate(w['gen'], w['root'], w['shard_size'], w['total'], index, count)
+    return _serialize(index, batch, w['paths'], w['bulk'])
+
+
+def iter_batches(data_type, num_entries, start_date, end_date, config, shard_size, seed=None):
+    """Yield a ColumnBatch per shard, in-process (same streams as generate_shards)."""
+    root = seed_sequence(seed)
+    gen = _make_generator(data_type, start_date, end_date, config, seed)
+    for index, count in plan_shards(num_entries, shard_size):
+        yield _generate(gen, root, shard_size, num_entries, index, count)
+
+
+def iter_chunks(data_type, num_entries, start_date, end_date, config, shard_size, seed=None):
+    """Like iter_batches(), but yield each shard as a list of entries."""
+    for batch in iter_batches(data_type, num_entries, start_date, end_date, config,
+                              shard_size, seed):
+        yield batch.to_rows()
+
+
+def generate_shards(data_type, num_entries, start_date, end_date, config, shard_size,
+                    workers=DEFAULT_WORKERS, columns=False, bulk=False, seed=None):
+    """Yield a ShardResult for every shard of a generation job, in shard order.
+
+    ``columns`` / ``bulk`` select which serialized forms each shard carries. At
+    most ``2 * workers`` shards are in flight, so memory stays bounded even
+    when the consumer (e.g. Elasticsearch) is slower than generation.
+    """
+    shards = plan_shards(num_entries, shard_size)
+    workers = min(resolve_workers(workers), len(shards))
+
+    if workers <= 1:
+        paths = schema_for(data_type).paths if columns else None
+        batches = iter_batches(data_type, num_entries, start_date, end_date, config,
+                               shard_size, seed)
+        for (index, _), batch in zip(shards, batches):
+            yield _serialize(index, batch, paths, bulk)
+        return
+
+    # Unseeded jobs still share one root so workers draw independent streams
+    root = seed_sequence(seed)
+
+    # spawn rather than fork: the web app calls this from a background thread,
+    # and forking a threaded process can copy locks in a held state.
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(data_type, start_date, end_date, config, seed, root, shard_size, num_entries,
+                  columns, bulk),
+    )
+    try:
+        pending = deque()
+        for index, count in shards:
+            pending.append(pool.submit(_generate_shard, index, count))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
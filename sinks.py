@@ -0,0 +1,809 @@
+"""File sinks for generated data: CSV, Parquet, Arrow IPC, ``_bulk`` NDJSON and text logs.
+
+A sink is opened once per output file and fed one shard at a time, either as
+columns in schema order (what sharding.generate_shards() produces) or as
+document dicts (scenarios). Nothing is held beyond the current row group, so a
+multi-GB job streams to disk with memory bounded by ``row_group_size``.
+
+CSV writes every value as text. The columnar formats keep the types declared
+in the data type's Schema, so numbers stay numbers and ``@timestamp`` is a
+real UTC timestamp for DuckDB, Spark or pandas:
+
+    ============  =======================
+    Schema type   Arrow type
+    ============  =======================
+    date          timestamp[ms, tz=UTC]
+    integer       int32
+    long          int64
+    float/double  float64
+    boolean       bool
+    anything else string
+    ============  =======================
+
+The ``bulk`` format stores the ready-to-send Elasticsearch ``_bulk`` bodies
+(action line + document line per entry) as ``.ndjson`` files, so a dataset
+can be replayed into any index later without generating it again (see
+replay.py).
+
+The ``log``, ``syslog`` and ``access`` formats write plain-text log lines
+(see log_lines.py) as ``.log`` files for Filebeat or Elastic Agent to pick
+up. A TextSink can also append to a fixed path through a RotatingLogFile,
+which rotates it logrotate-style (``app.log`` -> ``app.log.1`` -> …) so a
+shipper can tail it while it grows.
+
+Every sink takes a ``compression``. The columnar formats use it as their
+internal codec (compressed pages / buffers, zstd by default). CSV and bulk
+files, and text logs, are compressed as a whole (``.csv.gz``, ``.ndjson.zst``, …) by CompressedFile,
+which hands 1 MiB chunks to a small thread pool: zlib and zstandard release
+the GIL, so compression overlaps with generation instead of running after
+it. Each chunk becomes its own gzip member / zstd frame; concatenated members
+and frames are a valid stream for every standard reader.
+
+Jobs write through a RollingSink, which can start a new part file every N
+rows or N MB. Each part is written under a ``.tmp`` name and renamed into
+place when complete, so a loader never sees a half-written file, and a
+``<name>.manifest.json`` lists the parts with their row counts, sizes and
+``@timestamp`` ranges. Job names are claimed by creating the manifest with
+O_EXCL, so concurrent jobs for the same data type never share a name.
+
+Parquet and Arrow output need the optional ``pyarrow`` package, zstd-compressed
+CSV / NDJSON the optional ``zstandard`` package.
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from columns import ColumnBatch
+from log_lines import LOG_STYLES, line_renderer
+from serializers import bulk_body
+from timestamps import parse_iso_ms
+
+OUTPUT_DIR = "output_csv"
+
+# format name -> file suffix
+FORMATS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow", "bulk": ".ndjson",
+           "log": ".log", "syslog": ".log", "access": ".log"}
+DEFAULT_FORMAT = "csv"
+DEFAULT_ROW_GROUP_SIZE = 100_000
+
+# Codecs each format accepts and uses when none is configured; "none" writes
+# uncompressed
+COMPRESSIONS = {
+    "csv": ("none", "gzip", "zstd"),
+    "parquet": ("none", "snappy", "gzip", "brotli", "zstd", "lz4"),
+    "arrow": ("none", "zstd", "lz4"),
+    "bulk": ("none", "gzip", "zstd"),
+    **{style: ("none", "gzip", "zstd") for style in LOG_STYLES},
+}
+DEFAULT_COMPRESSION = {"csv": "none", "parquet": "zstd", "arrow": "zstd", "bulk": "none",
+                       **{style: "none" for style in LOG_STYLES}}
+
+# Formats compressed as a whole file rather than internally
+STREAM_FORMATS = ("csv", "bulk") + LOG_STYLES
+
+# Suffixes of in-progress parts and of job manifests
+TEMP_SUFFIX = ".tmp"
+MANIFEST_SUFFIX = ".manifest.json"
+DEAD_LETTER_SUFFIX = "-dead-letter.ndjson"  # ingest.DeadLetterFile; never output data
+
+# Whole-file compression -> file name suffix
+STREAM_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+DEFAULT_COMPRESSION_THREADS = 2
+COMPRESSION_CHUNK_BYTES = 1 << 20
+
+# Rotated copies a RotatingLogFile keeps (app.log.1 … app.log.N)
+DEFAULT_LOG_BACKUPS = 5
+LOG_BUFFER_BYTES = 1 << 20
+
+
+def is_output_file(fname):
+    """True for files this project writes to OUTPUT_DIR: data, parts in progress, manifests.
+
+    Dead-letter files are not output, so cleanup keeps them even when
+    ``dead_letter_dir`` points at OUTPUT_DIR.
+    """
+    if fname.endswith(DEAD_LETTER_SUFFIX):
+        return False
+    if fname.endswith(MANIFEST_SUFFIX):
+        return True
+    if fname.endswith(TEMP_SUFFIX):
+        fname = fname[:-len(TEMP_SUFFIX)]
+    for suffix in STREAM_SUFFIXES.values():
+        if fname.endswith(suffix):
+            fname = fname[:-len(suffix)]
+            break
+    return fname.endswith(tuple(FORMATS.values()))
+
+
+def resolve_compression(fmt, compression=None):
+    """Validate ``compression`` for ``fmt``; ``None`` picks the format's default."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown output format {fmt!r}; expected one of {list(FORMATS)}")
+    compression = compression or DEFAULT_COMPRESSION[fmt]
+    if compression not in COMPRESSIONS[fmt]:
+        raise ValueError(f"{fmt} does not support {compression!r} compression; "
+                         f"expected one of {list(COMPRESSIONS[fmt])}")
+    return compression
+
+
+def file_suffix(fmt, compression=None):
+    """``.csv``, ``.csv.gz``, ``.parquet``, …: columnar codecs do not change the name."""
+    suffix = FORMATS[fmt]
+    if fmt in STREAM_FORMATS:
+        suffix += STREAM_SUFFIXES.get(resolve_compression(fmt, compression), "")
+    return suffix
+
+
+def claim_name(prefix, directory=OUTPUT_DIR):
+    """Reserve the next free job name ``prefix-NNN`` in ``directory``.
+
+    The name is claimed by creating its (empty) manifest with O_EXCL, so two
+    jobs racing for the same prefix get different numbers. Numbers continue
+    after the highest one in use, whatever the format of earlier outputs.
+    """
+    os.makedirs(directory, exist_ok=True)
+    numbered = re.compile(re.escape(prefix) + r"-(\d+)(?![^.-])")
+    used = [int(m.group(1)) for m in map(numbered.match, os.listdir(directory)) if m]
+    number = max(used, default=0) + 1
+    while True:
+        name = f"{prefix}-{number:03d}"
+        try:
+            os.close(os.open(os.path.join(directory, name + MANIFEST_SUFFIX),
+                             os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return name
+        except FileExistsError:
+            number += 1
+
+
+def rolling_options(config):
+    """``(max_rows, max_bytes)`` per part file from ``log_generation`` config (0 = no limit)."""
+    opts = (config or {}).get("log_generation", {})
+    return (
+        int(opts.get("max_file_rows") or 0),
+        int(float(opts.get("max_file_mb") or 0) * 1024 * 1024),
+    )
+
+
+def output_options(config):
+    """``(format, compression, row_group_size)`` from ``log_generation`` config.
+
+    ``compression`` is ``None`` unless configured, i.e. the format's default.
+    """
+    opts = (config or {}).get("log_generation", {})
+    return (
+        opts.get("output_format") or DEFAULT_FORMAT,
+        opts.get("compression") or None,
+        int(opts.get("row_group_size") or DEFAULT_ROW_GROUP_SIZE),
+    )
+
+
+def open_sink(path, schema, fmt=DEFAULT_FORMAT, compression=None,
+              row_group_size=DEFAULT_ROW_GROUP_SIZE):
+    """Open a sink of format ``fmt`` writing ``schema``'s fields to ``path``."""
+    compression = resolve_compression(fmt, compression)
+    if fmt == "csv":
+        return CsvSink(path, schema, compression)
+    if fmt == "bulk":
+        return BulkSink(path, schema, compression)
+    if fmt in LOG_STYLES:
+        return TextSink(path, schema, fmt, compression)
+    sink_class = ParquetSink if fmt == "parquet" else ArrowSink
+    return sink_class(path, schema, compression, row_group_size)
+
+
+def open_output(path, compression="none", text=False,
+                threads=DEFAULT_COMPRESSION_THREADS):
+    """Open ``path`` for writing, compressed in the background unless ``compression`` is "none".
+
+    Returns a binary file, or with ``text`` a UTF-8 text file (``newline=""``,
+    as the csv module expects).
+    """
+    if compression in (None, "none"):
+        if text:
+            return open(path, "w", newline="", encoding="utf-8")
+        return open(path, "wb")
+    raw = io.BufferedWriter(CompressedFile(path, compression, threads),
+                            buffer_size=COMPRESSION_CHUNK_BYTES)
+    if text:
+        return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+    return raw
+
+
+def open_input(path):
+    """Open a file written by open_output() for binary reading, by its suffix."""
+    if path.endswith(STREAM_SUFFIXES["gzip"]):
+        return gzip.open(path, "rb")
+    if path.endswith(STREAM_SUFFIXES["zstd"]):
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError("Reading .zst files requires zstandard (pip install zstandard)") from e
+        # One frame per compressed chunk, so keep reading past frame ends
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"),
+                                                          read_across_frames=True,
+                                                          closefd=True)
+    return open(path, "rb")
+
+
+def _chunk_compressor(compression):
+    """A thread-safe ``bytes -> bytes`` function producing one gzip member / zstd frame."""
+    if compression == "gzip":
+        # mtime=0 keeps seeded output byte-identical between runs
+        return lambda chunk: gzip.compress(chunk, compresslevel=6, mtime=0)
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError("zstd output requires zstandard (pip install zstandard)") from e
+        # ZstdCompressor objects must not be shared between threads
+        return lambda chunk: zstandard.ZstdCompressor(level=3).compress(chunk)
+    raise ValueError(f"Unknown stream compression {compression!r}; "
+                     f"expected one of {list(STREAM_SUFFIXES)}")
+
+
+class CompressedFile(io.RawIOBase):
+    """Write-only binary file whose chunks are compressed on a thread pool.
+
+    Writes are gathered into COMPRESSION_CHUNK_BYTES chunks and submitted to
+    ``threads`` workers; finished chunks are written in order. At most two
+    chunks per worker are in flight, so a slow disk slows the producer down
+    rather than growing memory.
+    """
+
+    def __init__(self, path, compression, threads=DEFAULT_COMPRESSION_THREADS):
+        super().__init__()
+        self._compress = _chunk_compressor(compression)
+        self._file = open(path, "wb")
+        threads = max(1, int(threads))
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="compress")
+        self._max_pending = 2 * threads
+        self._pending = deque()  # (future, uncompressed length)
+        self._buffer = bytearray()
+        self._raw_written = self._written = 0
+
+    def writable(self):
+        return True
+
+    def size(self):
+        """Estimated compressed size of everything written so far.
+
+        Chunks still buffered or being compressed are counted at the
+        compression ratio achieved so far (waiting for the first chunk if
+        none has finished yet).
+        """
+        while self._pending and (self._pending[0][0].done() or not self._raw_written):
+            self._write_oldest()
+        raw_pending = len(self._buffer) + sum(n for _, n in self._pending)
+        ratio = self._written / self._raw_written if self._raw_written else 1.0
+        return self._written + int(raw_pending * ratio)
+
+    def write(self, data):
+        self._buffer += data
+        if len(self._buffer) >= COMPRESSION_CHUNK_BYTES:
+            self._submit()
+        return len(data)
+
+    def _submit(self):
+        chunk = bytes(self._buffer)
+        self._buffer.clear()
+        self._pending.append((self._pool.submit(self._compress, chunk), len(chunk)))
+        while len(self._pending) > self._max_pending:
+            self._write_oldest()
+
+    def _write_oldest(self):
+        future, raw_length = self._pending.popleft()
+        data = future.result()
+        self._file.write(data)
+        self._raw_written += raw_length
+        self._written += len(data)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._buffer:
+                self._submit()
+            while self._pending:
+                self._write_oldest()
+        finally:
+            self._pool.shutdown(cancel_futures=True)
+            self._file.close()
+            super().close()
+
+
+class FileSink:
+    """Base class: subclasses implement write_columns() and close()."""
+
+    _compressed = None  # CompressedFile underneath, if any
+
+    def __init__(self, path, schema):
+        self.path = path
+        self.schema = schema
+        self.rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write_columns(self, columns):
+        """Append rows given as one list per schema field; ``None`` = no value."""
+        raise NotImplementedError
+
+    def write_rows(self, rows):
+        """Append document dicts (fields outside the schema are dropped)."""
+        if rows:
+            batch = ColumnBatch.from_rows(rows, self.schema.paths)
+            self.write_columns(batch.select(self.schema.paths, missing=None))
+
+    def size(self):
+        """Approximate size of the file so far (used for size-based rolling)."""
+        self.flush()
+        if self._compressed is not None:
+            return self._compressed.size()
+        return os.path.getsize(self.path)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        raise NotImplementedError
+
+
+class CsvSink(FileSink):
+    """Header plus one text row per document; absent values are empty cells."""
+
+    def __init__(self, path, schema, compression="none"):
+        super().__init__(path, schema)
+        self._file = open_output(path, compression, text=True)
+        self._compressed = None if compression == "none" else self._file.buffer.raw
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(schema.names)
+
+    def write_columns(self, columns):
+        self._writer.writerows(zip(*columns))
+        self.rows += len(columns[0]) if columns else 0
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class BulkSink(FileSink):
+    """Elasticsearch ``_bulk`` NDJSON: an ``{"index":{}}`` line before every document.
+
+    Bodies come ready-made from the generation workers (write_body()); the
+    index is left to the URL the file is replayed to.
+    """
+
+    def __init__(self, path, schema, compression="none"):
+        super().__init__(path, schema)
+        self._file = open_output(path, compression)
+        self._compressed = None if compression == "none" else self._file.raw
+
+    def write_body(self, body, count):
+        """Append a ``_bulk`` body (str or bytes) holding ``count`` documents."""
+        self._file.write(body.encode("utf-8") if isinstance(body, str) else body)
+        self.rows += count
+
+    def write_rows(self, rows):
+        if rows:
+            self.write_body(bulk_body(rows), len(rows))
+
+    def write_columns(self, columns):
+        raise TypeError("Bulk files are written from _bulk bodies or documents, not columns")
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class TextSink(FileSink):
+    """Plain-text log lines in one of the log_lines.LOG_STYLES.
+
+    Each shard is rendered into one string and written in one call. ``rows``
+    counts lines, which is fewer than the documents given when the style
+    skips some (access logs have no line for non-HTTP flows). Pass ``fileobj``
+    (e.g. a RotatingLogFile) to write somewhere other than a new ``path``.
+    """
+
+    def __init__(self, path, schema, style="log", compression="none", fileobj=None):
+        super().__init__(path, schema)
+        self._render = line_renderer(schema, style)
+        if fileobj is None:
+            self._file = open_output(path, compression)
+            self._compressed = None if compression == "none" else self._file.raw
+        else:
+            self._file = fileobj
+
+    def write_columns(self, columns):
+        if columns and len(columns[0]):
+            text, lines = self._render(columns)
+            self._file.write(text.encode("utf-8"))
+            self.rows += lines
+
+    def size(self):
+        if isinstance(self._file, RotatingLogFile):
+            return self._file.size
+        return super().size()
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class RotatingLogFile:
+    """An append-only log file rotated logrotate-style once it reaches ``max_bytes``.
+
+    On rotation ``path.N-1`` becomes ``path.N`` (the oldest is dropped), …,
+    ``path`` becomes ``path.1`` and a new ``path`` is started. Writes are
+    buffered in ``buffer_size`` blocks and never split, so a file can exceed
+    ``max_bytes`` by one write. ``max_bytes=0`` never rotates.
+    """
+
+    def __init__(self, path, max_bytes=0, backups=DEFAULT_LOG_BACKUPS,
+                 buffer_size=LOG_BUFFER_BYTES):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max(0, int(max_bytes))
+        self.backups = max(1, int(backups))
+        self.buffer_size = buffer_size
+        self.rotations = 0
+        self._open()
+
+    def _open(self):
+        self._file = open(self.path, "ab", buffering=self.buffer_size)
+        self.size = self._file.tell()
+
+    def write(self, data):
+        if self.max_bytes and self.size and self.size + len(data) > self.max_bytes:
+            self.rotate()
+        self._file.write(data)
+        self.size += len(data)
+
+    def rotate(self):
+        self._file.close()
+        for n in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{n}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{n + 1}")
+        os.replace(self.path, f"{self.path}.1")
+        self.rotations += 1
+        self._open()
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class _ArrowFileSink(FileSink):
+    """Typed columnar output; shards are buffered into ``row_group_size`` groups."""
+
+    def __init__(self, path, schema, compression, row_group_size):
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("Parquet/Arrow output requires pyarrow (pip install pyarrow)") from e
+        super().__init__(path, schema)
+        self._pa = pa
+        self.arrow_schema = arrow_schema(schema)
+        self.compression = None if compression == "none" else compression
+        self.row_group_size = max(1, int(row_group_size))
+        self._pending = []
+        self._pending_rows = 0
+        self._writer = self._open_writer()
+
+    def _open_writer(self):
+        raise NotImplementedError
+
+    def _write_table(self, table):
+        raise NotImplementedError
+
+    def write_columns(self, columns):
+        n = len(columns[0]) if columns else 0
+        if not n:
+            return
+        arrays = [_to_arrow(self._pa, values, field.type)
+                  for values, field in zip(columns, self.arrow_schema)]
+        self._pending.append(self._pa.RecordBatch.from_arrays(arrays, schema=self.arrow_schema))
+        self._pending_rows += n
+        self.rows += n
+        if self._pending_rows >= self.row_group_size:
+            self._flush(final=False)
+
+    def _flush(self, final):
+        if not self._pending:
+            return
+        table = self._pa.Table.from_batches(self._pending, schema=self.arrow_schema)
+        cut = self._pending_rows if final else \
+            self._pending_rows - self._pending_rows % self.row_group_size
+        self._write_table(table.slice(0, cut))
+        rest = table.slice(cut)
+        self._pending = rest.combine_chunks().to_batches() if rest.num_rows else []
+        self._pending_rows = rest.num_rows
+
+    def close(self):
+        if self._writer is None:
+            return
+        try:
+            self._flush(final=True)
+        finally:
+            self._writer.close()
+            self._writer = None
+
+
+class ParquetSink(_ArrowFileSink):
+    """Parquet file written one row group at a time."""
+
+    def _open_writer(self):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(self.path, self.arrow_schema,
+                                compression=self.compression or "none")
+
+    def _write_table(self, table):
+        self._writer.write_table(table, row_group_size=self.row_group_size)
+
+
+class ArrowSink(_ArrowFileSink):
+    """Arrow IPC file (Feather v2), one record batch per row group."""
+
+    def _open_writer(self):
+        options = self._pa.ipc.IpcWriteOptions(compression=self.compression)
+        return self._pa.ipc.new_file(self.path, self.arrow_schema, options=options)
+
+    def _write_table(self, table):
+        self._writer.write_table(table, max_chunksize=self.row_group_size)
+
+
+def arrow_schema(schema):
+    """A ``pyarrow.Schema`` for a Schema, typed as in the module docstring."""
+    import pyarrow as pa
+    types = {
+        "date": pa.timestamp("ms", tz="UTC"),
+        "integer": pa.int32(),
+        "long": pa.int64(),
+        "float": pa.float64(),
+        "double": pa.float64(),
+        "boolean": pa.bool_(),
+    }
+    return pa.schema([pa.field(name, types.get(f.type, pa.string()))
+                      for name, f in zip(schema.names, schema.fields)])
+
+
+def _to_arrow(pa, values, arrow_type):
+    if pa.types.is_timestamp(arrow_type):
+        try:
+            return pa.array(values, pa.string()).cast(arrow_type)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Not all "...Z" strings: parse each one
+            return pa.array([None if v is None else parse_iso_ms(v) for v in values],
+                            pa.int64()).cast(arrow_type)
+    if pa.types.is_string(arrow_type):
+        try:
+            return pa.array(values, arrow_type)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Lists and other non-string values are stored as JSON text
+            return pa.array([v if v is None or isinstance(v, str) else json.dumps(v)
+                             for v in values], arrow_type)
+    return pa.array(values, arrow_type)
+
+
+class RollingSink:
+    """A job's output: one file, or numbered parts of at most ``max_rows`` / ``max_bytes``.
+
+    ``name`` is used as is (see claim_name() for a unique one). With no limits
+    the job is a single ``<name><suffix>`` file; otherwise parts are named
+    ``<name>-part-00001<suffix>``, …. Rows are split exactly at ``max_rows``;
+    ``max_bytes`` is checked between writes against the part's size on disk,
+    so a part can overshoot it by one shard (or, for Parquet/Arrow, by one
+    buffered row group).
+
+    Close it with close() when the job succeeds, or abort() to drop the part
+    in progress; either way the manifest records what was finished, plus
+    anything in ``meta`` (e.g. the data type, which replay uses).
+    """
+
+    def __init__(self, name, schema, fmt=DEFAULT_FORMAT, compression=None,
+                 row_group_size=DEFAULT_ROW_GROUP_SIZE, max_rows=0, max_bytes=0,
+                 directory=OUTPUT_DIR, meta=None):
+        os.makedirs(directory, exist_ok=True)
+        self.name = name
+        self.schema = schema
+        self.format = fmt
+        self.compression = resolve_compression(fmt, compression)
+        if fmt in LOG_STYLES:
+            line_renderer(schema, fmt)
+        self.row_group_size = row_group_size
+        self.max_rows = max(0, int(max_rows))
+        self.max_bytes = max(0, int(max_bytes))
+        self.directory = directory
+        self.meta = dict(meta or {})
+        self.manifest_path = os.path.join(directory, name + MANIFEST_SUFFIX)
+        self.parts = []
+        self.rows = 0
+        self._suffix = file_suffix(fmt, self.compression)
+        self._time_index = schema.names.index("@timestamp") if "@timestamp" in schema else None
+        self._sink = None
+        self._time_range = None
+
+    @classmethod
+    def claim(cls, prefix, schema, fmt=DEFAULT_FORMAT, compression=None,
+              directory=OUTPUT_DIR, **options):
+        """A sink under a newly claimed, unique ``prefix-NNN`` name."""
+        compression = resolve_compression(fmt, compression)  # fail before claiming
+        if fmt in LOG_STYLES:
+            line_renderer(schema, fmt)  # raises for a style the data type cannot render
+        return cls(claim_name(prefix, directory), schema, fmt, compression,
+                   directory=directory, **options)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    @property
+    def rolling(self):
+        return bool(self.max_rows or self.max_bytes)
+
+    @property
+    def path(self):
+        """The single output file, or the manifest when the job has several parts."""
+        if len(self.parts) == 1 and not self.rolling:
+            return os.path.join(self.directory, self.parts[0]["file"])
+        return self.manifest_path
+
+    def write_columns(self, columns):
+        """Append rows given as one list per schema field, rolling parts as they fill."""
+        n = len(columns[0]) if columns else 0
+        start = 0
+        while start < n:
+            if self._sink is None:
+                self._open_part()
+            take = n - start
+            if self.max_rows:
+                take = min(take, self.max_rows - self._sink.rows)
+            part = columns if take == n else [c[start:start + take] for c in columns]
+            self._sink.write_columns(part)
+            self._track_time(part)
+            self.rows += take
+            start += take
+            self._roll_if_full()
+
+    def write_rows(self, rows):
+        """Append document dicts (fields outside the schema are dropped, except in bulk files)."""
+        if not rows:
+            return
+        if self.format == "bulk":
+            self.write_bulk(bulk_body(rows), len(rows),
+                            timestamps=[row.get("@timestamp") for row in rows])
+            return
+        batch = ColumnBatch.from_rows(rows, self.schema.paths)
+        self.write_columns(batch.select(self.schema.paths, missing=None))
+
+    def write_bulk(self, body, count, timestamps=None):
+        """Append a ``_bulk`` body of ``count`` documents (``bulk`` format only).
+
+        ``timestamps``, the documents' ``@timestamp`` values in order, gives the
+        parts their time range; the body itself is never parsed.
+        """
+        start = 0
+        while count:
+            if self._sink is None:
+                self._open_part()
+            take = count
+            if self.max_rows:
+                take = min(take, self.max_rows - self._sink.rows)
+            head, body = (body, None) if take == count else _split_bulk(body, take)
+            self._sink.write_body(head, take)
+            if timestamps is not None:
+                self._track_stamps(timestamps[start:start + take])
+            self.rows += take
+            start += take
+            count -= take
+            self._roll_if_full()
+
+    def _roll_if_full(self):
+        if (self.max_rows and self._sink.rows >= self.max_rows) or \
+                (self.max_bytes and self._sink.size() >= self.max_bytes):
+            self._close_part()
+
+    def _open_part(self):
+        if self.rolling:
+            fname = f"{self.name}-part-{len(self.parts) + 1:05d}{self._suffix}"
+        else:
+            fname = self.name + self._suffix
+        self._sink = open_sink(os.path.join(self.directory, fname + TEMP_SUFFIX), self.schema,
+                               self.format, self.compression, self.row_group_size)
+        self._time_range = None
+
+    def _track_time(self, columns):
+        if self._time_index is not None:
+            self._track_stamps(columns[self._time_index])
+
+    def _track_stamps(self, values):
+        # ISO-8601 strings in one fixed format sort chronologically
+        stamps = [t for t in values if t is not None]
+        if stamps:
+            lo, hi = min(stamps), max(stamps)
+            if self._time_range:
+                lo, hi = min(lo, self._time_range[0]), max(hi, self._time_range[1])
+            self._time_range = (lo, hi)
+
+    def _close_part(self):
+        sink, self._sink = self._sink, None
+        sink.close()
+        final = sink.path[:-len(TEMP_SUFFIX)]
+        os.replace(sink.path, final)
+        self.parts.append({
+            "file": os.path.basename(final),
+            "rows": sink.rows,
+            "bytes": os.path.getsize(final),
+            "time_range": list(self._time_range) if self._time_range else None,
+        })
+
+    def _write_manifest(self, complete):
+        manifest = {
+            "name": self.name,
+            **self.meta,
+            "format": self.format,
+            "compression": self.compression,
+            "fields": self.schema.names,
+            "rows": sum(p["rows"] for p in self.parts),
+            "complete": complete,
+            "parts": self.parts,
+        }
+        tmp = self.manifest_path + TEMP_SUFFIX
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, self.manifest_path)
+
+    def close(self):
+        """Finish the last part and write the manifest."""
+        if self._sink is not None:
+            self._close_part()
+        elif not self.parts:
+            # An empty job still gets its (header-only) file
+            self._open_part()
+            self._close_part()
+        self._write_manifest(complete=True)
+
+    def abort(self):
+        """Drop the part in progress and write a manifest marked incomplete."""
+        if self._sink is not None:
+            sink, self._sink = self._sink, None
+            try:
+                sink.close()
+            finally:
+                if os.path.exists(sink.path):
+                    os.remove(sink.path)
+        self._write_manifest(complete=False)
+
+
+def _split_bulk(body, count):
+    """Split a ``_bulk`` body after its first ``count`` documents (two lines each)."""
+    newline = "\n" if isinstance(body, str) else b"\n"
+    end = -1
+    for _ in range(2 * count):
+        end = body.index(newline, end + 1)
+    return body[:end + 1], body[end + 1:]
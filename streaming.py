@@ -1,11 +1,18 @@
-"""Continuous data streaming — generates and ingests at a configured events-per-minute rate."""
+"""Continuous data streaming — generates and ingests at a configured events-per-minute rate.
 
+The stream runs on its own thread, or with ``log_generation.ingest_engine``
+set to ``"asyncio"`` as a coroutine on the shared ingest loop (async_ingest.py),
+which generates each batch in the loop's executor.
+"""
+
+import asyncio
 import threading
 import time
-import json
 import datetime
-import requests
-from data_generators import DATA_GENERATORS
+from data_generators import DATA_GENERATORS, generator_options
+from ingest import BulkSender, ingest_engine, split_body
+from pools import configure_pools
+from serializers import bulk_body
 
 # ---------------------------------------------------------------------------
 # Module-level state (access via _lock for thread safety)
@@ -18,10 +25,13 @@ _state: dict = {
     "started_at": None,
     "stopped_at": None,
     "last_error": None,
+    "bulk": None,  # BulkSender.stats(): sizes, retries, dead-lettered documents
 }
 _lock = threading.Lock()
 _stop_event = threading.Event()
 _thread: threading.Thread | None = None
+_task = None  # concurrent.futures.Future of the asyncio stream
+_STOP_POLL_SECS = 0.25
 
 
 def get_status() -> dict:
@@ -45,12 +55,20 @@ def get_status() -> dict:
 
 
 def start_streaming(data_type: str, rate_per_min: int, config: dict,
-                    max_events: int = 0) -> tuple[bool, str]:
+                    max_events: int = 0, seed: int | None = None) -> tuple[bool, str]:
     """Spawn the background streaming thread.
 
     Returns (True, '') on success or (False, reason) if already active or invalid.
     """
-    global _thread, _stop_event
+    global _thread, _task, _stop_event
+
+    try:
+        engine = ingest_engine(config)
+        if engine == "asyncio":
+            from async_ingest import get_loop
+            get_loop()
+    except (ValueError, ImportError) as exc:
+        return False, str(exc)
 
     with _lock:
         if _state["active"]:
@@ -69,13 +87,16 @@ def start_streaming(data_type: str, rate_per_min: int, config: dict,
             "started_at": datetime.datetime.now(),
             "stopped_at": None,
             "last_error": None,
+            "bulk": None,
         })
 
-    _thread = threading.Thread(
-        target=_worker,
-        args=(data_type, rate_per_min, config, max_events, _stop_event),
-        daemon=True,
-    )
+    args = (data_type, rate_per_min, config, max_events, _stop_event, seed)
+    if engine == "asyncio":
+        from async_ingest import spawn
+        _task = spawn(_async_worker(*args))
+        return True, ""
+
+    _thread = threading.Thread(target=_worker, args=args, daemon=True)
     _thread.start()
     return True, ""
 
@@ -89,19 +110,40 @@ def stop_streaming() -> tuple[bool, str]:
     return True, ""
 
 
+def _batch_plan(rate_per_min: int) -> tuple[int, float]:
+    """``(batch_size, seconds between batches)``: one batch per second.
+
+    A batch is not capped in documents; its body is cut into ``bulk_mb``
+    requests instead (ingest.split_body).
+    """
+    batch_size = max(1, int(rate_per_min / 60) + 1)
+    return batch_size, batch_size / (rate_per_min / 60.0)
+
+
+def _record(total: int, sender) -> None:
+    """Publish the stream's progress and bulk stats; dead-lettered documents
+    show up as the last error."""
+    with _lock:
+        _state["total_generated"] = total
+        _state["bulk"] = sender.stats()
+        if sender.dead_letter.count:
+            _state["last_error"] = (f"{sender.dead_letter.count} documents rejected, "
+                                    f"see {sender.dead_letter.path}")
+
+
 def _worker(data_type: str, rate_per_min: int, config: dict,
-            max_events: int, stop_event: threading.Event) -> None:
+            max_events: int, stop_event: threading.Event, seed: int | None = None) -> None:
     """Background thread: generate entries and bulk-ingest to ES at the target rate."""
     gen_class = DATA_GENERATORS[data_type]["generator"]
     index_name = DATA_GENERATORS[data_type]["index_pattern"]
-    es_host = config["elasticsearch"]["host"]
-    es_auth = (config["elasticsearch"]["username"], config["elasticsearch"]["password"])
+    # retries rejected documents, dead-letters the rest; pooled session for every batch
+    sender = BulkSender(config, index_name, timeout=15)
 
     # Target: one batch per second. Batch size = events expected in one second.
-    batch_size = max(1, min(int(rate_per_min / 60) + 1, 500))
-    sleep_secs = batch_size / (rate_per_min / 60.0)
+    batch_size, sleep_secs = _batch_plan(rate_per_min)
 
-    gen = gen_class()
+    configure_pools(config)
+    gen = gen_class(seed=seed, **generator_options(data_type, config))
     total = 0
 
     try:
@@ -111,31 +153,15 @@ def _worker(data_type: str, rate_per_min: int, config: dict,
 
             actual_batch = min(batch_size, max_events - total) if max_events else batch_size
 
-            entries = [gen.generate_entry() for _ in range(actual_batch)]
-
-            bulk_lines = []
-            for entry in entries:
-                bulk_lines.append(json.dumps({"index": {}}))
-                bulk_lines.append(json.dumps(entry, default=str))
-
-            try:
-                resp = requests.post(
-                    f"{es_host}/{index_name}/_bulk",
-                    auth=es_auth,
-                    headers={"Content-Type": "application/x-ndjson"},
-                    data="\n".join(bulk_lines) + "\n",
-                    timeout=15,
-                )
-                if resp.status_code == 200:
-                    total += actual_batch
-                    with _lock:
-                        _state["total_generated"] = total
-                else:
+            entries = gen.generate_batch(actual_batch)
+
+            for body, docs in split_body(bulk_body(entries), sender.sizer.target, actual_batch):
+                try:
+                    total += sender.send(body, docs, stop=stop_event)
+                    _record(total, sender)
+                except Exception as exc:
                     with _lock:
-                        _state["last_error"] = f"HTTP {resp.status_code}: {resp.text[:200]}"
-            except Exception as exc:
-                with _lock:
-                    _state["last_error"] = str(exc)[:200]
+                        _state["last_error"] = str(exc)[:200]
 
             # Sleep for the remainder of the batch interval (interruptible)
             stop_event.wait(max(0.0, sleep_secs))
@@ -145,3 +171,51 @@ def _worker(data_type: str, rate_per_min: int, config: dict,
             _state["active"] = False
             _state["stopped_at"] = datetime.datetime.now()
             _state["total_generated"] = total
+
+
+async def _async_worker(data_type: str, rate_per_min: int, config: dict,
+                        max_events: int, stop_event: threading.Event,
+                        seed: int | None = None) -> None:
+    """``_worker`` as a coroutine on the shared ingest loop.
+
+    Batches are generated and encoded in the loop's executor, so the loop only
+    waits on HTTP; the pause between batches is a non-blocking sleep that
+    checks ``stop_event`` a few times a second.
+    """
+    from async_ingest import get_session, in_executor, send
+
+    gen_class = DATA_GENERATORS[data_type]["generator"]
+    sender = BulkSender(config, DATA_GENERATORS[data_type]["index_pattern"])
+    batch_size, sleep_secs = _batch_plan(rate_per_min)
+    total = 0
+
+    try:
+        await in_executor(configure_pools, config)
+        gen = gen_class(seed=seed, **generator_options(data_type, config))
+        session = get_session(config)
+        loop = asyncio.get_running_loop()
+
+        while not stop_event.is_set():
+            if max_events and total >= max_events:
+                break
+            started = loop.time()
+            actual_batch = min(batch_size, max_events - total) if max_events else batch_size
+            body = await in_executor(lambda: bulk_body(gen.generate_batch(actual_batch)))
+
+            for part, docs in split_body(body, sender.sizer.target, actual_batch):
+                try:
+                    total += await send(sender, session, part, docs, timeout=15)
+                    _record(total, sender)
+                except Exception as exc:
+                    with _lock:
+                        _state["last_error"] = str(exc)[:200]
+
+            deadline = started + sleep_secs
+            while not stop_event.is_set() and loop.time() < deadline:
+                await asyncio.sleep(min(_STOP_POLL_SECS, deadline - loop.time()))
+
+    finally:
+        with _lock:
+            _state["active"] = False
+            _state["stopped_at"] = datetime.datetime.now()
+            _state["total_generated"] = total